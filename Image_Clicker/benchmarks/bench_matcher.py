@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark del motor de búsqueda: ruta anterior (pyautogui/pyscreeze) contra
+el motor OpenCV directo con imágenes cacheadas.
+
+No necesita pantalla: la captura se simula con una imagen sintética en la
+que se pega la imagen buscada.
+
+Uso:
+    python benchmarks/bench_matcher.py --size 300 --iterations 200
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import cv2
+import numpy as np
+import pyscreeze
+from PIL import Image
+
+from core.detector import TemplateCache
+from core.matching import OpenCVMatchEngine
+from config import IMAGES_DIR, DETECTION_CONFIG
+
+
+def make_screenshot(needle_path: Path, size: int, seed: int = 0) -> Image.Image:
+    """Crea una captura sintética (PIL, RGB) con la imagen pegada al azar."""
+    rng = np.random.default_rng(seed)
+    screen = rng.integers(0, 256, size=(size, size, 3), dtype=np.uint8)
+    
+    needle = cv2.cvtColor(cv2.imread(str(needle_path), cv2.IMREAD_COLOR), cv2.COLOR_BGR2RGB)
+    h, w = needle.shape[:2]
+    y = int(rng.integers(0, size - h))
+    x = int(rng.integers(0, size - w))
+    screen[y:y + h, x:x + w] = needle
+    
+    return Image.fromarray(screen)
+
+
+def measure(func, iterations: int) -> dict:
+    """Ejecuta func varias veces y retorna estadísticas en milisegundos."""
+    func()  # Calentamiento
+    
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    
+    samples.sort()
+    return {
+        "mean": statistics.fmean(samples),
+        "p50": samples[len(samples) // 2],
+        "p99": samples[min(len(samples) - 1, int(len(samples) * 0.99))],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del motor de búsqueda")
+    parser.add_argument("--image", default="six.png", help="Imagen a buscar dentro de images/")
+    parser.add_argument("--size", type=int, default=300, help="Lado de la captura simulada")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--grayscale", action="store_true")
+    args = parser.parse_args()
+    
+    needle_path = IMAGES_DIR / args.image
+    confidence = DETECTION_CONFIG["confidence"]
+    screenshot = make_screenshot(needle_path, args.size)
+    
+    # Ruta anterior: locateOnScreen relee el archivo y convierte la captura PIL
+    def legacy():
+        pyscreeze.locate(str(needle_path), screenshot, confidence=confidence, grayscale=args.grayscale)
+    
+    # Ruta nueva: imagen cacheada + conversión a buffers reutilizables
+    template = TemplateCache().get(needle_path)
+    needle = template.image(args.grayscale)
+    engine = OpenCVMatchEngine()
+    frame = np.empty((args.size, args.size, 3), dtype=np.uint8)
+    gray = np.empty((args.size, args.size), dtype=np.uint8)
+    
+    def opencv():
+        cv2.cvtColor(np.asarray(screenshot), cv2.COLOR_RGB2BGR, dst=frame)
+        haystack = frame
+        if args.grayscale:
+            haystack = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=gray)
+        return engine.match(haystack, needle, confidence)
+    
+    peak = opencv()
+    print(f"Captura {args.size}x{args.size}, imagen {args.image}, {args.iterations} iteraciones")
+    print(f"Puntaje real del motor OpenCV: {peak.score:.4f}" if peak else "OpenCV: no encontrado")
+    print()
+    print(f"{'ruta':<12}{'media ms':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    
+    results = {"pyautogui": measure(legacy, args.iterations), "opencv": measure(opencv, args.iterations)}
+    for name, stats in results.items():
+        print(f"{name:<12}{stats['mean']:>10.3f}{stats['p50']:>10.3f}{stats['p99']:>10.3f}")
+    
+    print()
+    print(f"Aceleración (p50): {results['pyautogui']['p50'] / results['opencv']['p50']:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""
+Capturas sintéticas para los benchmarks.
+
+Genera pantallas con un fondo texturado (parecido al del juego más que el
+ruido puro) y pega las imágenes de images/ en posiciones, escalas y con
+ruido aleatorios. Guarda dónde quedó cada una para medir precisión.
+"""
+import cv2
+import numpy as np
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+from dataclasses import dataclass, field
+
+from config import IMAGES_DIR
+
+
+# Resoluciones de prueba: desde el cuadrado de búsqueda de main.py hasta 4K
+SIZES: Dict[str, Tuple[int, int]] = {
+    "search": (300, 300),
+    "720p": (1280, 720),
+    "1080p": (1920, 1080),
+    "4k": (3840, 2160),
+}
+
+
+@dataclass
+class Placement:
+    """Posición real de una imagen pegada en una captura."""
+    image: str
+    x: int
+    y: int
+    width: int
+    height: int
+    scale: float = 1.0
+
+
+@dataclass
+class Fixture:
+    """Conjunto de capturas sintéticas de una resolución."""
+    name: str
+    width: int
+    height: int
+    frames: List[np.ndarray] = field(default_factory=list)  # BGR
+    placements: List[List[Placement]] = field(default_factory=list)  # Por captura
+
+
+def make_background(width: int, height: int, rng: np.random.Generator) -> np.ndarray:
+    """Crea un fondo BGR con textura suave."""
+    small = rng.integers(0, 256, size=(height // 8 + 1, width // 8 + 1, 3), dtype=np.uint8)
+    background = cv2.resize(small, (width, height), interpolation=cv2.INTER_CUBIC)
+    detail = rng.integers(0, 32, size=(height, width, 3), dtype=np.uint8)
+    return cv2.add(background, detail)
+
+
+def make_fixture(
+    name: str,
+    size: Tuple[int, int],
+    images: Sequence[str] = ("six.png", "golden_die.png"),
+    count: int = 8,
+    scale_range: Tuple[float, float] = (1.0, 1.0),
+    noise: float = 4.0,
+    seed: int = 0
+) -> Fixture:
+    """
+    Genera capturas sintéticas.
+    
+    Args:
+        name: Nombre del conjunto
+        size: (ancho, alto) de las capturas
+        images: Imágenes de images/ a pegar (se omiten las que no entran)
+        count: Cantidad de capturas distintas
+        scale_range: Escala mínima y máxima de las imágenes pegadas
+        noise: Desvío del ruido gaussiano sumado a la captura
+        seed: Semilla para que los resultados sean reproducibles
+    
+    Returns:
+        Fixture con las capturas y las posiciones reales
+    """
+    rng = np.random.default_rng(seed)
+    width, height = size
+    fixture = Fixture(name=name, width=width, height=height)
+    needles = {image: load_image(IMAGES_DIR / image) for image in images}
+    
+    for _ in range(count):
+        frame = make_background(width, height, rng)
+        placements = []
+        
+        for image, needle in needles.items():
+            scale = float(rng.uniform(*scale_range))
+            if scale != 1.0:
+                needle = cv2.resize(needle, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            
+            h, w = needle.shape[:2]
+            if w >= width or h >= height:
+                continue
+            
+            # Sin superponerse con las ya pegadas (una taparía a la otra)
+            for _ in range(20):
+                x = int(rng.integers(0, width - w))
+                y = int(rng.integers(0, height - h))
+                if not any(overlaps(p, x, y, w, h) for p in placements):
+                    break
+            else:
+                continue
+            
+            frame[y:y + h, x:x + w] = needle
+            placements.append(Placement(image, x, y, w, h, scale))
+        
+        if noise:
+            gaussian = rng.normal(0, noise, size=frame.shape)
+            frame = np.clip(frame + gaussian, 0, 255).astype(np.uint8)
+        
+        fixture.frames.append(frame)
+        fixture.placements.append(placements)
+    
+    return fixture
+
+
+def overlaps(placement: Placement, x: int, y: int, width: int, height: int) -> bool:
+    """Si el rectángulo (x, y, width, height) se superpone con una imagen pegada."""
+    return (
+        x < placement.x + placement.width and placement.x < x + width
+        and y < placement.y + placement.height and placement.y < y + height
+    )
+
+
+def load_image(path: Path) -> np.ndarray:
+    """Lee una imagen BGR desde disco."""
+    image = cv2.imread(str(path), cv2.IMREAD_COLOR)
+    if image is None:
+        raise FileNotFoundError(f"Imagen no encontrada: {path}")
+    return image
+
+
+def is_hit(result, placement: Placement, tolerance: int = 4) -> bool:
+    """Si una detección coincide con la posición real (con tolerancia en píxeles)."""
+    return (
+        result is not None
+        and result.found
+        and abs(result.x - placement.x) <= tolerance
+        and abs(result.y - placement.y) <= tolerance
+    )
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Benchmarks del camino de detección, sin pantalla.
+
+Mide latencia (p50/p99), escaneos por segundo, memoria reservada y precisión
+de ImageDetector, PixelDetector y los distintos motores sobre capturas
+sintéticas (ver fixtures.py), y guarda los resultados en JSON para comparar
+entre commits.
+
+Uso:
+    python benchmarks/run.py                          # todos los casos
+    python benchmarks/run.py --sizes search 1080p --filter detect
+    python benchmarks/run.py --output nuevo.json --compare anterior.json
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import cv2
+import numpy as np
+
+from benchmarks.fixtures import SIZES, Fixture, is_hit, make_fixture
+from core.color_detector import CascadeDetector, ColorBlobDetector
+from core.detector import ImageDetector
+from core.feature_detector import FeatureDetector
+from core.parallel_detector import ParallelDetector
+from core.frame_source import SyntheticFrameSource
+from core.pixel_detector import PixelCondition, PixelDetector
+from config import DETECTION_CONFIG, IMAGES_DIR
+
+
+SIX = IMAGES_DIR / "six.png"
+GOLDEN_DIE = IMAGES_DIR / "golden_die.png"
+CONFIDENCE = 0.8
+GOLDEN_DIE_MIN_PIXELS = 640 * 480  # El dado (327x310) no entra en "search"
+
+
+class Case:
+    """Un caso de benchmark sobre un conjunto de capturas."""
+    
+    def __init__(
+        self,
+        name: str,
+        setup: Callable[[Fixture], Callable[[], object]],
+        check: Optional[Callable[[object, list], bool]] = None,
+        max_pixels: int = None,
+        min_pixels: int = None
+    ):
+        """
+        Args:
+            name: Nombre del caso
+            setup: Recibe el Fixture y retorna la función a medir (una llamada = un escaneo)
+            check: Recibe el resultado de una llamada y las posiciones reales de
+                   esa captura; retorna si fue correcto (para medir precisión)
+            max_pixels: Omitir resoluciones más grandes (para los caminos lentos)
+            min_pixels: Omitir resoluciones más chicas (imágenes que no entran)
+        """
+        self.name = name
+        self.setup = setup
+        self.check = check
+        self.max_pixels = max_pixels
+        self.min_pixels = min_pixels
+
+
+def detector_for(fixture: Fixture, **kwargs) -> ImageDetector:
+    """Detector sobre las capturas sintéticas, sin saltear capturas repetidas."""
+    kwargs.setdefault("confidence", CONFIDENCE)
+    kwargs.setdefault("change_gate", False)
+    return ImageDetector(frame_source=SyntheticFrameSource(fixture.frames), **kwargs)
+
+
+def check_image(name: str, tolerance: int = 4) -> Callable[[object, list], bool]:
+    """Verifica que la detección coincida con la posición real de la imagen."""
+    def check(result, placements) -> bool:
+        truth = [p for p in placements if p.image == name]
+        if not truth:
+            return not result.found
+        return is_hit(result, truth[0], tolerance)
+    return check
+
+
+def many_case(fixture: Fixture) -> Callable[[], object]:
+    """detect_many con todas las imágenes que entran en la captura."""
+    detector = detector_for(fixture)
+    images = [SIX] + [
+        path for path in (GOLDEN_DIE,)
+        if detector.load(path).width <= fixture.width and detector.load(path).height <= fixture.height
+    ]
+    return lambda: detector.detect_many(images)
+
+
+def cascade_case(fixture: Fixture) -> Callable[[], object]:
+    """CascadeDetector: correlación solo alrededor de las manchas doradas."""
+    detector = CascadeDetector(
+        ColorBlobDetector.from_image(GOLDEN_DIE),
+        confidence=CONFIDENCE,
+        change_gate=False,
+        frame_source=SyntheticFrameSource(fixture.frames)
+    )
+    return lambda: detector.detect(GOLDEN_DIE)
+
+
+def pixel_case(count: int) -> Callable[[Fixture], Callable[[], object]]:
+    """PixelDetector.check con count condiciones repartidas por la captura."""
+    def setup(fixture: Fixture):
+        rng = np.random.default_rng(count)
+        xs = rng.integers(0, fixture.width, size=count)
+        ys = rng.integers(0, fixture.height, size=count)
+        conditions = [
+            PixelCondition(int(x), int(y), (200, 180, 40), tolerance=15)
+            for x, y in zip(xs, ys)
+        ]
+        detector = PixelDetector(conditions, frame_source=SyntheticFrameSource(fixture.frames))
+        return lambda: detector.check(require_all=False)
+    return setup
+
+
+CASES: List[Case] = [
+    Case(
+        "detect",
+        lambda f: (lambda d: lambda: d.detect(SIX))(detector_for(f)),
+        check_image("six.png")
+    ),
+    Case(
+        "detect_gray",
+        lambda f: (lambda d: lambda: d.detect(SIX))(detector_for(f, grayscale=True)),
+        check_image("six.png")
+    ),
+    Case(
+        "detect_no_pyramid",
+        lambda f: (lambda d: lambda: d.detect(SIX))(detector_for(f, pyramid_levels=0)),
+        check_image("six.png")
+    ),
+    Case(
+        "detect_pyautogui",
+        lambda f: (lambda d: lambda: d.detect(SIX))(detector_for(f, engine="pyautogui")),
+        check_image("six.png"),
+        max_pixels=1920 * 1080
+    ),
+    Case(
+        "detect_multiscale",
+        lambda f: (lambda d: lambda: d.detect(SIX))(detector_for(f, multiscale=True)),
+        check_image("six.png")
+    ),
+    Case(
+        "detect_orb",
+        lambda f: (lambda d: lambda: d.detect(SIX))(FeatureDetector(frame_source=SyntheticFrameSource(f.frames))),
+        check_image("six.png", tolerance=8)  # La caja sale de la homografía
+    ),
+    Case(
+        "detect_parallel",
+        lambda f: (lambda d: lambda: d.detect(SIX))(
+            ParallelDetector(
+                confidence=CONFIDENCE,
+                change_gate=False,
+                frame_source=SyntheticFrameSource(f.frames)
+            )
+        ),
+        check_image("six.png"),
+        min_pixels=DETECTION_CONFIG["parallel_min_area"]  # En capturas menores no reparte
+    ),
+    Case(
+        "detect_golden",
+        lambda f: (lambda d: lambda: d.detect(GOLDEN_DIE))(detector_for(f)),
+        check_image("golden_die.png"),
+        min_pixels=GOLDEN_DIE_MIN_PIXELS
+    ),
+    Case(
+        "detect_cascade",
+        cascade_case,
+        check_image("golden_die.png"),
+        min_pixels=GOLDEN_DIE_MIN_PIXELS
+    ),
+    Case(
+        "detect_all",
+        lambda f: (lambda d: lambda: d.detect_all(SIX))(detector_for(f)),
+        lambda results, placements: any(check_image("six.png")(r, placements) for r in results)
+    ),
+    Case(
+        "detect_many",
+        many_case,
+        lambda multi, placements: check_image("six.png")(multi.results[0], placements)
+    ),
+    Case("pixel_check_10", pixel_case(10)),
+    Case("pixel_check_1000", pixel_case(1000)),
+]
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    """Percentil de una lista ordenada."""
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+def run_case(case: Case, fixture: Fixture, iterations: int, max_seconds: float) -> Dict:
+    """
+    Mide un caso sobre un conjunto de capturas.
+    
+    Returns:
+        Diccionario con latencias, throughput, memoria y precisión
+    """
+    func = case.setup(fixture)
+    func()  # Calentamiento: carga de imágenes, buffers, pirámides
+    
+    samples = []
+    hits = 0
+    deadline = time.perf_counter() + max_seconds
+    for index in range(iterations):
+        start = time.perf_counter()
+        result = func()
+        samples.append((time.perf_counter() - start) * 1000)
+        
+        if case.check:
+            # La llamada de calentamiento ya consumió la captura 0
+            placements = fixture.placements[(index + 1) % len(fixture.frames)]
+            hits += case.check(result, placements)
+        
+        if time.perf_counter() > deadline:
+            break
+    
+    # Memoria: otra pasada corta con tracemalloc (no se mezcla con los tiempos)
+    alloc_calls = min(len(samples), 20)
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    for _ in range(alloc_calls):
+        func()
+    after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    samples.sort()
+    mean = statistics.fmean(samples)
+    return {
+        "case": case.name,
+        "size": fixture.name,
+        "iterations": len(samples),
+        "mean_ms": round(mean, 4),
+        "p50_ms": round(percentile(samples, 0.50), 4),
+        "p99_ms": round(percentile(samples, 0.99), 4),
+        "throughput_hz": round(1000 / mean, 2) if mean else None,
+        "alloc_peak_kb": round((peak - before) / 1024, 2),
+        "alloc_retained_kb": round((after - before) / 1024, 2),
+        "accuracy": round(hits / len(samples), 4) if case.check else None,
+    }
+
+
+def metadata() -> Dict:
+    """Datos del entorno para poder comparar resultados."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, cwd=Path(__file__).parent
+        ).stdout.strip()
+    except OSError:
+        commit = ""
+    
+    return {
+        "commit": commit,
+        "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "opencv": cv2.__version__,
+        "cv2_threads": cv2.getNumThreads(),
+    }
+
+
+def compare(results: List[Dict], baseline_path: Path) -> None:
+    """Imprime la variación de p50 contra un JSON anterior."""
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    previous = {(r["case"], r["size"]): r for r in baseline["results"]}
+    
+    print()
+    print(f"Comparación con {baseline_path} (commit {baseline['meta'].get('commit', '?')})")
+    print(f"{'caso':<22}{'tamaño':<8}{'antes p50':>11}{'ahora p50':>11}{'cambio':>9}")
+    for result in results:
+        old = previous.get((result["case"], result["size"]))
+        if old is None:
+            continue
+        change = (result["p50_ms"] / old["p50_ms"] - 1) * 100 if old["p50_ms"] else 0.0
+        print(
+            f"{result['case']:<22}{result['size']:<8}"
+            f"{old['p50_ms']:>11.3f}{result['p50_ms']:>11.3f}{change:>+8.1f}%"
+        )
+
+
+def iter_selected(cases: List[Case], sizes: List[str], pattern: str) -> Iterator:
+    """Combinaciones caso x resolución que se van a medir."""
+    for size_name in sizes:
+        width, height = SIZES[size_name]
+        for case in cases:
+            if pattern and pattern not in case.name:
+                continue
+            if case.max_pixels and width * height > case.max_pixels:
+                continue
+            if case.min_pixels and width * height < case.min_pixels:
+                continue
+            yield size_name, case
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks del camino de detección")
+    parser.add_argument("--sizes", nargs="+", default=list(SIZES), choices=list(SIZES))
+    parser.add_argument("--filter", default="", help="Solo casos cuyo nombre contenga este texto")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--max-seconds", type=float, default=5.0, help="Tiempo máximo por caso")
+    parser.add_argument(
+        "--scale", type=float, nargs=2, default=(1.0, 1.0), metavar=("MIN", "MAX"),
+        help="Escala de las imágenes pegadas (p. ej. 0.8 1.3 para simular otro DPI)"
+    )
+    parser.add_argument(
+        "--images", nargs="+", default=["six.png", "golden_die.png"],
+        help="Imágenes a pegar (el dado dorado contiene un 6: con --scale conviene solo six.png)"
+    )
+    parser.add_argument("--output", type=Path, help="Archivo JSON de resultados")
+    parser.add_argument("--compare", type=Path, help="JSON anterior para comparar")
+    args = parser.parse_args()
+    
+    fixtures: Dict[str, Fixture] = {}
+    results = []
+    
+    print(f"{'caso':<22}{'tamaño':<8}{'p50 ms':>9}{'p99 ms':>9}{'scan/s':>9}{'mem KB':>9}{'precisión':>11}")
+    for size_name, case in iter_selected(CASES, args.sizes, args.filter):
+        if size_name not in fixtures:
+            fixtures[size_name] = make_fixture(
+                size_name, SIZES[size_name], scale_range=tuple(args.scale), images=args.images
+            )
+        
+        result = run_case(case, fixtures[size_name], args.iterations, args.max_seconds)
+        results.append(result)
+        
+        accuracy = "-" if result["accuracy"] is None else f"{result['accuracy']:.0%}"
+        print(
+            f"{result['case']:<22}{result['size']:<8}{result['p50_ms']:>9.3f}{result['p99_ms']:>9.3f}"
+            f"{result['throughput_hz']:>9.1f}{result['alloc_peak_kb']:>9.1f}{accuracy:>11}"
+        )
+    
+    if args.output:
+        report = {"meta": metadata(), "results": results}
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"\nResultados guardados en {args.output}")
+    
+    if args.compare:
+        compare(results, args.compare)
+    
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
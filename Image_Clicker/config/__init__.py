@@ -1,6 +1,6 @@
 """
 Módulo de configuración.
 """
-from config.settings import DETECTION_CONFIG, BEHAVIOR_CONFIG, LOGGING_CONFIG, IMAGES_DIR
+from config.settings import DETECTION_CONFIG, CAPTURE_CONFIG, WINDOW_CONFIG, RECORDING_CONFIG, BEHAVIOR_CONFIG, PROFILING_CONFIG, LOGGING_CONFIG, IMAGES_DIR
 
-__all__ = ["DETECTION_CONFIG", "BEHAVIOR_CONFIG", "LOGGING_CONFIG", "IMAGES_DIR"]
+__all__ = ["DETECTION_CONFIG", "CAPTURE_CONFIG", "WINDOW_CONFIG", "RECORDING_CONFIG", "BEHAVIOR_CONFIG", "PROFILING_CONFIG", "LOGGING_CONFIG", "IMAGES_DIR"]
@@ -7,20 +7,95 @@ from pathlib import Path
 PROJECT_ROOT = Path(__file__).parent.parent
 IMAGES_DIR = PROJECT_ROOT / "images"
 LOGS_DIR = PROJECT_ROOT / "logs"
+RECORDINGS_DIR = PROJECT_ROOT / "recordings"
+PROFILES_DIR = PROJECT_ROOT / "profiles"
 
 # Configuración de detección
 DETECTION_CONFIG = {
     "confidence": 0.8,          # Nivel de confianza para detectar la imagen (0.0 - 1.0)
     "grayscale": False,         # Usar escala de grises para búsqueda más rápida
     "region": None,             # Región de pantalla a escanear (x, y, width, height) o None para toda
+    "template_revalidate": True,  # Recargar la imagen si cambia en disco (verifica mtime)
+    "engine": "opencv",         # Motor de búsqueda: "opencv" (directo) o "pyautogui" (anterior)
+    "method": "TM_CCOEFF_NORMED",  # Método de cv2.matchTemplate
+    "pyramid_levels": 2,        # Búsqueda gruesa a fina: 0 = desactivada, 1 = 1/2, 2 = 1/4
+    "pyramid_top_k": 3,         # Candidatos del nivel reducido que se refinan
+    "pyramid_min_area": 500_000,  # Área mínima (píxeles) de la región para usar la pirámide
+    "skip_unchanged": True,     # No volver a buscar una imagen ausente si la captura no cambió
+    "change_tile": 16,          # Lado de los bloques para comparar capturas
+    "change_threshold": 4,      # Diferencia mínima (0-255) para que un bloque cuente como cambiado
+    "roi_margin": 40,           # Píxeles alrededor del último resultado al seguir la ROI
+    "roi_growth": 1.5,          # Factor de agrandamiento de la ROI en cada fallo
+    "roi_max_misses": 5,        # Fallos seguidos antes de volver a la región completa
+    "nms_iou": 0.3,             # detect_all: superposición máxima entre dos resultados
+    "max_results": None,        # detect_all: máximo de resultados (None = sin límite)
+    "multiscale": False,        # Buscar también la imagen reescalada (DPI o ventana redimensionada)
+    "scales": (0.75, 0.9, 1.0, 1.1, 1.25, 1.5),  # Escalas a probar en modo multiescala
+    "rotations": (0.0,),        # Ángulos (grados) a probar en modo multiescala, p. ej. (-5.0, 0.0, 5.0)
+    "orb_features": 1000,       # FeatureDetector: máximo de puntos ORB por captura
+    "orb_patch_size": 15,       # FeatureDetector: lado del parche ORB (chico para imágenes chicas)
+    "orb_ratio": 0.75,          # FeatureDetector: test de Lowe entre los dos mejores descriptores
+    "orb_min_matches": 8,       # FeatureDetector: coincidencias mínimas que respeten la homografía
+    "orb_min_area": 0.05,       # FeatureDetector: área mínima de la caja (fracción de la imagen buscada)
+    "blob_min_area": 50,        # ColorBlobDetector: píxeles mínimos de una mancha de color
+    "blob_max_candidates": 5,   # ColorBlobDetector: manchas a confirmar por captura
+    "blob_downscale": 2,        # ColorBlobDetector: reducción de la captura antes de buscar manchas
+    "blob_margin": 8,           # CascadeDetector: píxeles extra alrededor de cada mancha
+    "parallel_workers": None,   # ParallelDetector: procesos de búsqueda (None = uno por núcleo)
+    "parallel_min_area": 1_000_000,  # ParallelDetector: área mínima para repartir la captura
+}
+
+# Configuración de captura de pantalla
+CAPTURE_CONFIG = {
+    "backend": "auto",          # "mss", "pyautogui", "bus" o "auto" (mss si está instalado)
+    "bus_name": "image_clicker_frames",  # Memoria compartida del bus de capturas (core/frame_bus.py)
+    "bus_slots": 3,             # Capturas en el bus; una vista sigue válida por bus_slots - 1 publicaciones
+    "bus_poll": 0.001,          # Segundos entre consultas mientras se espera una captura nueva
+    "bus_timeout": 1.0,         # Segundos máximos de espera de una captura nueva
+}
+
+# Ventana del juego (core/window.py)
+WINDOW_CONFIG = {
+    "backend": "pygetwindow",   # "pygetwindow" o "fake" (ventanas simuladas, para pruebas)
+    "client_area": True,        # Usar el área cliente (sin bordes ni barra de título) de la ventana
+    "poll_interval": 0.1,       # Segundos mínimos entre dos lecturas de la posición de la ventana
+    "refind_interval": 1.0,     # Segundos entre búsquedas por título si la ventana se cerró
+}
+
+# Grabación de sesiones (core/recorder.py)
+RECORDING_CONFIG = {
+    "tile_size": 32,            # Lado de los bloques que se guardan si cambian
+    "keyframe_interval": 120,   # Capturas entre dos capturas completas
+    "compression": 1,           # Nivel de zlib (1 = rápido, 9 = más chico)
+    "queue_size": 8,            # Capturas en espera de ser comprimidas (si se llena, no se graban)
 }
 
 # Configuración de comportamiento - OPTIMIZADO PARA UN SOLO CLIC RÁPIDO
 BEHAVIOR_CONFIG = {
     "click_delay": 0.0,         # Sin delay - clic instantáneo
-    "scan_interval": 0.05,      # Escaneo muy rápido (50ms)
+    "scan_interval": 0.05,      # Escaneo muy rápido (50ms) - presupuesto por ciclo
+    "idle_max_interval": 0.1,   # Intervalo máximo mientras la pantalla no cambia
+    "idle_backoff": 1.5,        # Crecimiento del intervalo en cada escaneo sin cambios
     "max_retries": 100,         # Muchos intentos para no perder la imagen
     "click_duration": 0.0,      # Clic instantáneo
+    "input_backend": "pyautogui",  # "pyautogui", "win32" (SendInput, más rápido), "record" o "auto" (win32 en Windows)
+    "fast_click": False,        # Ignorar click_delay/click_duration (sin sleep ni movimiento gradual)
+    "hover_ready": False,       # Dejar el mouse sobre el objetivo previsto antes de encontrarlo
+    "pipeline_workers": 2,      # Hilos de búsqueda en el modo en paralelo
+    "pipeline_queue": 4,        # Capturas en espera; si se llena se descarta la más vieja
+    "pipeline_max_age": 0.1,    # Segundos máximos entre captura y clic (si no, se descarta)
+    "latency_tracking": True,   # Registrar la duración de cada etapa (captura, búsqueda, clic)
+    "latency_window": 1024,     # Muestras por etapa para los percentiles
+}
+
+# Perfilado del ciclo de escaneo (utils/profiler.py, python main.py --profile)
+PROFILING_CONFIG = {
+    "enabled": False,           # Perfilar sin pasar --profile
+    "mode": "cprofile",         # "cprofile" (cada llamada) o "sampling" (muestras de la pila, menos costo)
+    "sample_interval": 0.001,   # Segundos entre muestras del modo sampling
+    "tracemalloc": True,        # Contar asignaciones de memoria por escaneo (más lento)
+    "tracemalloc_frames": 1,    # Cuadros de pila por asignación (más = sitios más precisos, más lento)
+    "top": 25,                  # Funciones y sitios de asignación en el resumen
 }
 
 # Configuración de logging
@@ -28,4 +103,8 @@ LOGGING_CONFIG = {
     "enabled": True,
     "level": "INFO",            # DEBUG, INFO, WARNING, ERROR
     "file_logging": False,
+    "async": True,              # Escribir desde un hilo aparte: el log nunca frena el ciclo de escaneo
+    "queue_size": 10000,        # Mensajes en espera antes de empezar a descartar
+    "drop_policy": "newest",    # Con la cola llena: "newest" descarta el mensaje nuevo, "oldest" el más viejo
+    "debug_sample": 1,          # Escribir 1 de cada N mensajes DEBUG por línea de código (1 = todos)
 }
@@ -1,19 +1,59 @@
 """
 Módulos core de la aplicación.
+
+Los exports se importan al primer uso, y pyautogui, pygetwindow y mss
+solo se importan al crear el backend que los usa: así los módulos de
+detección se pueden usar también sin pantalla (benchmarks, Linux headless).
 """
-from core.detector import ImageDetector, DetectionResult
-from core.clicker import MouseController, ClickType
-from core.automation import ImageClickAutomation, AutomationResult
-from core.window import get_window_region, focus_window, WindowRegion
+from importlib import import_module
+
+_EXPORTS = {
+    "ImageDetector": "core.detector",
+    "DetectionResult": "core.detector",
+    "MultiDetectionResult": "core.detector",
+    "Template": "core.detector",
+    "TemplateCache": "core.detector",
+    "get_template_cache": "core.detector",
+    "MatchEngine": "core.matching",
+    "OpenCVMatchEngine": "core.matching",
+    "create_match_engine": "core.matching",
+    "FrameChangeDetector": "core.change_detector",
+    "FeatureDetector": "core.feature_detector",
+    "ColorBlobDetector": "core.color_detector",
+    "CascadeDetector": "core.color_detector",
+    "ParallelDetector": "core.parallel_detector",
+    "PixelRuleSet": "core.pixel_rules",
+    "ROITracker": "core.roi",
+    "FrameRecorder": "core.recorder",
+    "Recording": "core.recorder",
+    "RecordingFrameSource": "core.recorder",
+    "ReplayFrameSource": "core.recorder",
+    "FrameBus": "core.frame_bus",
+    "BusFrameSource": "core.frame_bus",
+    "LatencyRecorder": "core.timing",
+    "get_latency_recorder": "core.timing",
+    "MouseController": "core.clicker",
+    "ClickType": "core.clicker",
+    "InputBackend": "core.input_backend",
+    "RecordingInputBackend": "core.input_backend",
+    "create_input_backend": "core.input_backend",
+    "ImageClickAutomation": "core.automation",
+    "AutomationResult": "core.automation",
+    "PipelinedAutomation": "core.pipeline",
+    "AsyncImageClickAutomation": "core.async_automation",
+    "get_window_region": "core.window",
+    "focus_window": "core.window",
+    "WindowRegion": "core.window",
+    "WindowWatcher": "core.window",
+    "WindowFrameSource": "core.frame_source",
+    "FakeWindowBackend": "core.window",
+    "set_window_backend": "core.window",
+}
+
+__all__ = list(_EXPORTS)
+
 
-__all__ = [
-    "ImageDetector",
-    "DetectionResult",
-    "MouseController", 
-    "ClickType",
-    "ImageClickAutomation",
-    "AutomationResult",
-    "get_window_region",
-    "focus_window",
-    "WindowRegion"
-]
+def __getattr__(name: str):
+    if name in _EXPORTS:
+        return getattr(import_module(_EXPORTS[name]), name)
+    raise AttributeError(f"module 'core' has no attribute '{name}'")
@@ -0,0 +1,269 @@
+"""
+Automatización con asyncio.
+
+Varias tareas pueden esperar imágenes distintas desde un mismo event loop.
+Todas comparten una sola captura por ciclo: un único ciclo de escaneo
+captura la región, busca todas las imágenes pedidas y reparte los
+resultados. La captura y la búsqueda corren en un hilo aparte para no
+bloquear el event loop, y el ritmo lo marca un AdaptiveScheduler, igual
+que en ImageClickAutomation.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple, Union
+
+from core.detector import ImageDetector, DetectionResult, Template
+from core.clicker import MouseController, ClickType
+from core.timing import Stopwatch
+from core.automation import AutomationResult
+from core.scheduler import AdaptiveScheduler
+from config.settings import BEHAVIOR_CONFIG
+from utils.logger import get_logger
+
+
+class _Subscription:
+    """Suscripción de una tarea a los resultados de una imagen."""
+    
+    def __init__(self, template: Template):
+        self.template = template
+        # Solo interesa el resultado más reciente
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+        self.ticks = 0
+    
+    def publish(self, result: Union[DetectionResult, Exception]) -> None:
+        """Entrega un resultado positivo (o un error del escaneo)."""
+        self.ticks += 1
+        if isinstance(result, DetectionResult) and not result.found:
+            return
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(result)
+    
+    async def next(self) -> DetectionResult:
+        """Espera el próximo resultado positivo."""
+        result = await self.queue.get()
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+class AsyncImageClickAutomation:
+    """Versión asyncio de ImageClickAutomation."""
+    
+    def __init__(
+        self,
+        detector: ImageDetector = None,
+        clicker: MouseController = None,
+        scan_interval: float = None
+    ):
+        """
+        Inicializa la automatización.
+        
+        Args:
+            detector: Instancia de ImageDetector (solo se usa desde el hilo de escaneo)
+            clicker: Instancia de MouseController
+            scan_interval: Presupuesto por escaneo (ver AdaptiveScheduler)
+        """
+        self.detector = detector or ImageDetector()
+        self.clicker = clicker or MouseController()
+        self.scan_interval = scan_interval or BEHAVIOR_CONFIG["scan_interval"]
+        self.logger = get_logger(__name__)
+        
+        # Un solo hilo: la fuente de captura y los buffers del detector
+        # no se pueden usar desde varios hilos
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="async-scan")
+        self._subscriptions: Set[_Subscription] = set()
+        self._scan_task: Optional[asyncio.Task] = None
+        self.ticks = 0
+    
+    async def watch(self, image_path: Union[Path, Template]) -> AsyncIterator[DetectionResult]:
+        """
+        Produce las detecciones de una imagen a medida que aparecen.
+        
+        Uso:
+            async for detection in automation.watch(path):
+                ...
+        
+        Args:
+            image_path: Ruta a la imagen (o Template ya cargado)
+        
+        Yields:
+            DetectionResult de cada escaneo en el que se encontró la imagen
+        """
+        subscription = self._subscribe(image_path)
+        try:
+            while True:
+                yield await subscription.next()
+        finally:
+            self._subscriptions.discard(subscription)
+    
+    async def wait_for(
+        self,
+        image_path: Union[Path, Template],
+        timeout: float = None
+    ) -> Optional[DetectionResult]:
+        """
+        Espera a que aparezca una imagen.
+        
+        Args:
+            image_path: Ruta a la imagen (o Template ya cargado)
+            timeout: Segundos máximos de espera (None = sin límite)
+        
+        Returns:
+            DetectionResult, o None si se agotó el tiempo
+        """
+        subscription = self._subscribe(image_path)
+        try:
+            return await asyncio.wait_for(subscription.next(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            self._subscriptions.discard(subscription)
+    
+    async def find_and_click(
+        self,
+        image_path: Union[Path, Template],
+        click_type: ClickType = ClickType.LEFT,
+        timeout: float = None
+    ) -> AutomationResult:
+        """
+        Espera una imagen y hace clic en ella.
+        
+        Se puede cancelar cancelando la tarea que la espera.
+        
+        Args:
+            image_path: Ruta a la imagen (o Template ya cargado)
+            click_type: Tipo de clic a realizar
+            timeout: Segundos máximos de espera (None = sin límite)
+        
+        Returns:
+            AutomationResult con el resultado de la operación
+        """
+        subscription = self._subscribe(image_path)
+        name = subscription.template.path.name
+        self.logger.info(f"Buscando imagen: {name}")
+        
+        try:
+            detection = await asyncio.wait_for(subscription.next(), timeout)
+        except asyncio.TimeoutError:
+            self.logger.warning(f"Imagen {name} no encontrada en {timeout}s")
+            return AutomationResult(
+                success=False,
+                attempts=subscription.ticks,
+                message=f"Imagen no encontrada en {timeout}s"
+            )
+        finally:
+            self._subscriptions.discard(subscription)
+        
+        center = detection.center
+        loop = asyncio.get_running_loop()
+        clicked = await loop.run_in_executor(
+            None, lambda: self.clicker.click(center[0], center[1], click_type=click_type)
+        )
+        
+        if not clicked:
+            return AutomationResult(
+                success=False,
+                detection=detection,
+                attempts=subscription.ticks,
+                message="Error al hacer clic"
+            )
+        
+        self.logger.info(f"Clic exitoso en ({center[0]}, {center[1]})")
+        return AutomationResult(
+            success=True,
+            detection=detection,
+            clicked_at=center,
+            attempts=subscription.ticks,
+            message="Imagen encontrada y clic realizado"
+        )
+    
+    async def aclose(self) -> None:
+        """Detiene el ciclo de escaneo y libera el hilo."""
+        self._subscriptions.clear()
+        if self._scan_task:
+            self._scan_task.cancel()
+            try:
+                await self._scan_task
+            except asyncio.CancelledError:
+                pass
+        self._executor.shutdown(wait=True)
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc):
+        await self.aclose()
+    
+    def _subscribe(self, image_path: Union[Path, Template]) -> _Subscription:
+        """Registra una suscripción y arranca el ciclo de escaneo si hace falta."""
+        subscription = _Subscription(self.detector.load(image_path))
+        self._subscriptions.add(subscription)
+        
+        if self._scan_task is None or self._scan_task.done():
+            self._scan_task = asyncio.get_running_loop().create_task(self._scan_loop())
+        
+        return subscription
+    
+    async def _scan_loop(self) -> None:
+        """Un escaneo por ciclo mientras haya suscripciones."""
+        loop = asyncio.get_running_loop()
+        scheduler = AdaptiveScheduler(frame_budget=self.scan_interval)
+        
+        while self._subscriptions:
+            subscriptions = list(self._subscriptions)
+            
+            # Cada imagen se busca una sola vez aunque la esperen varias tareas
+            templates: Dict[Path, Template] = {}
+            for subscription in subscriptions:
+                templates.setdefault(subscription.template.path, subscription.template)
+            
+            try:
+                results, changed = await loop.run_in_executor(
+                    self._executor, self._scan, list(templates.values())
+                )
+            except Exception as e:
+                # Avisar a todas las tareas en espera y terminar el ciclo
+                self.logger.error(f"Error en el escaneo: {e}")
+                for subscription in subscriptions:
+                    subscription.publish(e)
+                return
+            
+            self.ticks += 1
+            for subscription in subscriptions:
+                subscription.publish(results[subscription.template.path])
+            
+            found = any(result.found for result in results.values())
+            await scheduler.wait_async(changed=found or changed)
+        
+        if scheduler.cycles:
+            self.logger.info(f"Ritmo de escaneo: {scheduler.summary()}")
+    
+    def _scan(self, templates: List[Template]) -> Tuple[Dict[Path, DetectionResult], bool]:
+        """
+        Captura una vez y busca todas las imágenes (corre en el hilo de escaneo).
+        
+        Returns:
+            Resultado por imagen, y si la captura cambió (según el
+            change_gate del detector; True si no tiene)
+        """
+        source = self.detector.source
+        watch = Stopwatch()
+        frame = source.grab()
+        capture = watch.lap("capture")
+        self.detector.latency.record("capture", capture)
+        
+        # Solo marca el ritmo: se busca siempre, porque cada tarea espera un resultado
+        changed = True
+        if self.detector.change_gate is not None:
+            change = self.detector.change_gate.check(frame, region=source.region)
+            self.detector.last_change = change
+            changed = change.changed
+        
+        multi = self.detector.match_many(frame, templates, source.region[:2])
+        results = {}
+        for template, result in zip(templates, multi.results):
+            result.timings["capture"] = capture
+            results[template.path] = result
+        return results, changed
@@ -1,13 +1,17 @@
 """
 Módulo principal de automatización que combina detección y clic.
 """
-import time
 from pathlib import Path
-from typing import Optional, Callable
+from typing import Optional, Callable, List, Union
 from dataclasses import dataclass, field
 
-from core.detector import ImageDetector, DetectionResult
+from core.detector import ImageDetector, DetectionResult, Template
+from core.frame_source import WindowFrameSource
 from core.clicker import MouseController, ClickType
+from core.roi import ROITracker
+from core.scheduler import AdaptiveScheduler
+from core.timing import StageTimings, Stopwatch
+from core.window import WindowWatcher, shift_region
 from config.settings import BEHAVIOR_CONFIG
 from utils.logger import get_logger
 
@@ -20,6 +24,7 @@ class AutomationResult:
     clicked_at: Optional[tuple] = None
     attempts: int = 0
     message: str = ""
+    timings: List[StageTimings] = field(default_factory=list)  # Segundos por etapa, uno por intento
 
 
 class ImageClickAutomation:
@@ -30,7 +35,8 @@ class ImageClickAutomation:
         detector: ImageDetector = None,
         clicker: MouseController = None,
         scan_interval: float = None,
-        max_retries: int = None
+        max_retries: int = None,
+        window_watcher: WindowWatcher = None
     ):
         """
         Inicializa la automatización.
@@ -38,20 +44,27 @@ class ImageClickAutomation:
         Args:
             detector: Instancia de ImageDetector
             clicker: Instancia de MouseController
-            scan_interval: Intervalo entre escaneos
+            scan_interval: Presupuesto por escaneo (ver AdaptiveScheduler)
             max_retries: Máximo número de intentos
+            window_watcher: Seguimiento de la ventana; si se mueve, la
+                            región de búsqueda se mueve con ella (no hace
+                            falta si el detector usa WindowFrameSource)
         """
         self.detector = detector or ImageDetector()
         self.clicker = clicker or MouseController()
         self.scan_interval = scan_interval or BEHAVIOR_CONFIG["scan_interval"]
         self.max_retries = max_retries or BEHAVIOR_CONFIG["max_retries"]
+        self.window_watcher = window_watcher
         self.logger = get_logger(__name__)
         
         self._running = False
+        self._last_target: Optional[tuple] = None  # Último punto donde se hizo clic
+        self._prepared_target: Optional[tuple] = None  # Donde prepare dejó el mouse (modo continuo)
+        self._full_region: Optional[tuple] = None  # Región completa del modo continuo
     
     def find_and_click(
         self,
-        image_path: Path,
+        image_path: Union[Path, Template],
         click_type: ClickType = ClickType.LEFT,
         wait_for_image: bool = True,
         on_found: Optional[Callable[[DetectionResult], None]] = None
@@ -60,7 +73,7 @@ class ImageClickAutomation:
         Busca una imagen y hace clic en ella.
         
         Args:
-            image_path: Ruta a la imagen a buscar
+            image_path: Ruta a la imagen a buscar (o Template ya cargado)
             click_type: Tipo de clic a realizar
             wait_for_image: Si debe esperar a que aparezca la imagen
             on_found: Callback cuando se encuentra la imagen
@@ -68,14 +81,30 @@ class ImageClickAutomation:
         Returns:
             AutomationResult con el resultado de la operación
         """
-        self.logger.info(f"Buscando imagen: {image_path.name}")
+        # Cargar la imagen una sola vez para todos los intentos
+        template = self.detector.load(image_path)
+        
+        self.logger.info(f"Buscando imagen: {template.path.name}")
         attempts = 0
+        timings: List[StageTimings] = []
+        scheduler = AdaptiveScheduler(frame_budget=self.scan_interval)
+        
+        # Con hover_ready el mouse espera sobre el objetivo previsto; en el
+        # modo continuo solo se mueve cuando el objetivo cambia, no en cada escaneo
+        target = self._predicted_target()
+        if target is not None and (not self._running or target != self._prepared_target):
+            self.clicker.prepare(*target)
+            self._prepared_target = target
         
         while attempts < self.max_retries:
             attempts += 1
+            watch = Stopwatch()
+            self._poll_window()
             
             # Detectar imagen
-            detection = self.detector.detect(image_path)
+            detection = self.detector.detect(template)
+            attempt = dict(detection.timings)
+            timings.append(attempt)
             
             if detection.found:
                 self.logger.info(f"Imagen encontrada en intento {attempts}")
@@ -93,33 +122,43 @@ class ImageClickAutomation:
                     )
                     
                     if click_success:
+                        self._last_target = self._prepared_target = center
+                        attempt.update(self.clicker.last_timings)
+                        attempt["detect_to_click"] = watch.elapsed
+                        self.detector.latency.record("detect_to_click", attempt["detect_to_click"])
+                        
                         self.logger.info(f"Clic exitoso en ({center[0]}, {center[1]})")
                         return AutomationResult(
                             success=True,
                             detection=detection,
                             clicked_at=center,
                             attempts=attempts,
-                            message="Imagen encontrada y clic realizado"
+                            message="Imagen encontrada y clic realizado",
+                            timings=timings
                         )
             
             if not wait_for_image:
                 break
                 
-            self.logger.debug(f"Intento {attempts}/{self.max_retries} - Imagen no encontrada")
-            time.sleep(self.scan_interval)
+            self.logger.debug("Intento %d/%d - Imagen no encontrada", attempts, self.max_retries)
+            attempt["wait"] = scheduler.wait(changed=self._frame_changed())
         
         self.logger.warning(f"Imagen no encontrada después de {attempts} intentos")
+        if scheduler.cycles:
+            self.logger.info(f"Ritmo de escaneo: {scheduler.summary()}")
         return AutomationResult(
             success=False,
             attempts=attempts,
-            message=f"Imagen no encontrada después de {attempts} intentos"
+            message=f"Imagen no encontrada después de {attempts} intentos",
+            timings=timings
         )
     
     def find_and_click_continuous(
         self,
         image_path: Path,
         click_type: ClickType = ClickType.LEFT,
-        stop_after_clicks: int = None
+        stop_after_clicks: int = None,
+        track_roi: bool = True
     ) -> int:
         """
         Busca y hace clic en la imagen continuamente.
@@ -128,23 +167,39 @@ class ImageClickAutomation:
             image_path: Ruta a la imagen
             click_type: Tipo de clic
             stop_after_clicks: Detener después de N clics (None = infinito)
+            track_roi: Reducir la búsqueda alrededor del último resultado
             
         Returns:
             Número total de clics realizados
         """
         self._running = True
+        self._prepared_target = None
         clicks_count = 0
+        template = self.detector.load(image_path)
+        
+        self._full_region = self.detector.source.region
+        tracker = ROITracker(self._full_region) if track_roi else None
+        scheduler = AdaptiveScheduler(frame_budget=self.scan_interval)
         
         self.logger.info("Iniciando modo continuo")
         
         try:
             while self._running:
+                self._poll_window()
+                if tracker:
+                    if tracker.full_region != self._full_region:
+                        tracker = ROITracker(self._full_region)  # La ventana se movió
+                    self.detector.region = tracker.region
+                
                 result = self.find_and_click(
-                    image_path,
+                    template,
                     click_type=click_type,
                     wait_for_image=False
                 )
                 
+                if tracker:
+                    tracker.update(result.detection)
+                
                 if result.success:
                     clicks_count += 1
                     self.logger.info(f"Clics totales: {clicks_count}")
@@ -153,14 +208,55 @@ class ImageClickAutomation:
                         self.logger.info("Límite de clics alcanzado")
                         break
                 
-                time.sleep(self.scan_interval)
+                scheduler.wait(changed=result.success or self._frame_changed())
                 
         except KeyboardInterrupt:
             self.logger.info("Detenido por el usuario")
+        finally:
+            self.detector.region = self._full_region
+            self._full_region = None
+        
+        self.logger.info(f"Ritmo de escaneo: {scheduler.summary()}")
+        self.log_latency()
         
         self._running = False
         return clicks_count
     
+    def log_latency(self) -> None:
+        """Escribe en el log los percentiles de cada etapa."""
+        for stage, stats in self.detector.latency.summary().items():
+            self.logger.info(f"Latencia {stage}: {stats}")
+    
+    def _predicted_target(self) -> Optional[tuple]:
+        """Dónde se espera la imagen: el último clic o el centro de la región."""
+        if self._last_target is not None:
+            return self._last_target
+        region = self.detector.region
+        if region is None:
+            return None
+        x, y, width, height = region
+        return (x + width // 2, y + height // 2)
+    
+    def _poll_window(self) -> None:
+        """Si la ventana se movió, mueve la región de búsqueda con ella."""
+        if self.window_watcher is None or isinstance(self.detector.source, WindowFrameSource):
+            return  # Con coordenadas relativas a la ventana no hay nada que mover
+        old = self.window_watcher.region
+        new = self.window_watcher.poll()
+        if old is None or new is None:
+            return
+        
+        self.logger.info(f"Ventana movida: {old.as_tuple()} -> {new.as_tuple()}")
+        self.detector.region = shift_region(self.detector.region, old, new)
+        if self._full_region is not None:
+            self._full_region = shift_region(self._full_region, old, new)
+        self._last_target = None
+    
+    def _frame_changed(self) -> bool:
+        """Si la última captura del detector cambió (True si no se sabe)."""
+        change = self.detector.last_change
+        return change is None or change.changed
+    
     def stop(self):
         """Detiene la ejecución continua."""
         self._running = False
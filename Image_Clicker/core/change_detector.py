@@ -0,0 +1,127 @@
+"""
+Detección de cambios entre capturas.
+
+Compara cada captura con la última en la que se buscó, bloque por bloque
+(la mayor diferencia de cada bloque de tile x tile píxeles), para que el
+detector pueda saltear la búsqueda en capturas que no cambiaron, o
+limitarla a la zona que cambió.
+"""
+import cv2
+import numpy as np
+from typing import Dict, Hashable, Optional, Tuple
+from dataclasses import dataclass
+
+from config.settings import DETECTION_CONFIG
+
+
+Region = Tuple[int, int, int, int]  # (x, y, width, height)
+
+
+@dataclass
+class FrameChange:
+    """Resultado de comparar una captura con la de referencia."""
+    changed: bool
+    dirty: Optional[Region] = None  # Rectángulo de los bloques cambiados, relativo a la captura
+
+
+class FrameChangeDetector:
+    """Compara capturas con la última en la que se buscó, por bloques."""
+    
+    def __init__(self, tile_size: int = None, threshold: int = None):
+        """
+        Inicializa el detector de cambios.
+        
+        Args:
+            tile_size: Lado en píxeles de cada bloque
+            threshold: Diferencia mínima de algún píxel del bloque (0-255)
+                       para considerarlo cambiado
+        """
+        self.tile_size = tile_size or DETECTION_CONFIG["change_tile"]
+        self.threshold = threshold if threshold is not None else DETECTION_CONFIG["change_threshold"]
+        
+        self.frames_skipped = 0
+        self.frames_matched = 0
+        
+        self._previous: Dict[Hashable, Tuple[Region, np.ndarray]] = {}
+        self._diff: Optional[np.ndarray] = None
+        self._kernel: Optional[np.ndarray] = None
+    
+    def tile_diff(self, frame: np.ndarray, reference: np.ndarray) -> np.ndarray:
+        """
+        Calcula la mayor diferencia de cada bloque entre dos capturas.
+        
+        Se usa el máximo y no el promedio del bloque para que un cambio chico
+        (un sprite de pocos píxeles) no quede diluido entre los píxeles quietos.
+        
+        Args:
+            frame: Captura actual, BGR o escala de grises
+            reference: Captura de referencia del mismo tamaño
+        
+        Returns:
+            Array (filas x columnas de bloques) con la diferencia máxima (0-255)
+        """
+        if self._diff is None or self._diff.shape != frame.shape:
+            self._diff = np.empty_like(frame)
+        cv2.absdiff(frame, reference, dst=self._diff)
+        
+        # Dilatar con el ancla en la esquina deja en cada píxel el máximo del
+        # bloque que empieza ahí; basta con tomar la esquina de cada bloque
+        tile = self.tile_size
+        if self._kernel is None or self._kernel.shape[0] != tile:
+            self._kernel = np.ones((tile, tile), dtype=np.uint8)
+        diff = cv2.dilate(self._diff, self._kernel, anchor=(0, 0))[::tile, ::tile]
+        return diff.max(axis=2) if diff.ndim == 3 else diff
+    
+    def check(self, frame: np.ndarray, key: Hashable = None, region: Region = None) -> FrameChange:
+        """
+        Compara la captura con la referencia registrada bajo la misma clave.
+        
+        La referencia es la última captura que se informó como cambiada (la
+        última en la que el detector buscó), no la inmediata anterior: un
+        cambio gradual, con pasos menores al umbral, se acumula hasta superarlo.
+        
+        Args:
+            frame: Captura actual
+            key: Identifica la secuencia de capturas (por ejemplo la imagen buscada)
+            region: Región de pantalla de la captura; si cambia, todo cuenta como cambiado
+        
+        Returns:
+            FrameChange indicando si hubo cambios y dónde
+        """
+        previous = self._previous.get(key)
+        height, width = frame.shape[:2]
+        if previous is None or previous[0] != region or previous[1].shape != frame.shape:
+            self._previous[key] = (region, frame.copy())
+            return FrameChange(changed=True, dirty=(0, 0, width, height))
+        
+        reference = previous[1]
+        dirty = self.tile_diff(frame, reference) > self.threshold
+        
+        rows = np.flatnonzero(dirty.any(axis=1))
+        if rows.size == 0:
+            return FrameChange(changed=False)
+        cols = np.flatnonzero(dirty.any(axis=0))
+        
+        # Solo ahora avanza la referencia: el detector va a buscar en esta captura
+        np.copyto(reference, frame)
+        
+        tile = self.tile_size
+        left = int(cols[0]) * tile
+        top = int(rows[0]) * tile
+        right = min(int(cols[-1] + 1) * tile, width)
+        bottom = min(int(rows[-1] + 1) * tile, height)
+        
+        return FrameChange(changed=True, dirty=(left, top, right - left, bottom - top))
+    
+    def reset(self, key: Hashable = None) -> None:
+        """Olvida la captura de referencia de una clave (o de todas si es None)."""
+        if key is None:
+            self._previous.clear()
+        else:
+            self._previous.pop(key, None)
+    
+    @property
+    def skip_ratio(self) -> float:
+        """Fracción de capturas en las que se salteó la búsqueda."""
+        total = self.frames_skipped + self.frames_matched
+        return self.frames_skipped / total if total else 0.0
@@ -1,12 +1,20 @@
 """
 Módulo de control del mouse y clics.
+
+Los eventos se envían por un backend de entrada (ver core/input_backend.py),
+así que el módulo se puede importar sin pantalla.
+
+Con window, las coordenadas son relativas a la ventana (ver core/window.py):
+la posición de la ventana se suma en el momento del clic.
 """
-import pyautogui
 import time
-from typing import Optional, Tuple
+from typing import Optional, Tuple, Union
 from enum import Enum
 
 from config.settings import BEHAVIOR_CONFIG
+from core.input_backend import InputBackend, create_input_backend
+from core.timing import LatencyRecorder, StageTimings, Stopwatch, get_latency_recorder
+from core.window import WindowWatcher
 
 
 class ClickType(Enum):
@@ -23,7 +31,12 @@ class MouseController:
     def __init__(
         self,
         click_delay: float = None,
-        click_duration: float = None
+        click_duration: float = None,
+        latency: LatencyRecorder = None,
+        backend: Union[InputBackend, str] = None,
+        fast: bool = None,
+        hover_ready: bool = None,
+        window: WindowWatcher = None
     ):
         """
         Inicializa el controlador del mouse.
@@ -31,13 +44,60 @@ class MouseController:
         Args:
             click_delay: Delay antes de hacer clic
             click_duration: Duración del clic
+            latency: Registro de latencias (por defecto el compartido)
+            backend: Backend de entrada o su nombre ("auto", "pyautogui",
+                     "win32", "record")
+            fast: Modo rápido: sin delay ni movimiento gradual, sin importar
+                  click_delay/click_duration
+            hover_ready: Dejar el mouse sobre el objetivo previsto (ver prepare)
+            window: Ventana de referencia: las coordenadas de click, move_to,
+                    prepare y get_position son relativas a ella
         """
-        self.click_delay = click_delay or BEHAVIOR_CONFIG["click_delay"]
-        self.click_duration = click_duration or BEHAVIOR_CONFIG["click_duration"]
+        self.click_delay = click_delay if click_delay is not None else BEHAVIOR_CONFIG["click_delay"]
+        self.click_duration = (
+            click_duration if click_duration is not None
+            else BEHAVIOR_CONFIG["click_duration"]
+        )
+        self.latency = latency or get_latency_recorder()
+        self.backend = backend if isinstance(backend, InputBackend) else create_input_backend(backend)
+        self.fast = fast if fast is not None else BEHAVIOR_CONFIG["fast_click"]
+        self.hover_ready = hover_ready if hover_ready is not None else BEHAVIOR_CONFIG["hover_ready"]
+        self.window = window
+        
+        # Duración del delay ("click_delay") y del envío del clic ("click_dispatch")
+        self.last_timings: StageTimings = {}
         
-        # Configuración de seguridad de pyautogui
-        pyautogui.FAILSAFE = True  # Mover mouse a esquina superior izquierda para abortar
-        pyautogui.PAUSE = 0.0      # Sin pausa - máxima velocidad
+        # Donde dejamos el mouse por última vez, en pantalla (para no moverlo de nuevo)
+        self._cursor: Optional[Tuple[int, int]] = None
+    
+    def prepare(self, x: int, y: int) -> bool:
+        """
+        Deja el mouse sobre el objetivo previsto antes de encontrarlo.
+        
+        Si el clic después cae en el mismo punto, se envía sin moverse; si
+        cae en otro, se mueve como siempre. Solo actúa con hover_ready.
+        
+        Args:
+            x: Coordenada X prevista
+            y: Coordenada Y prevista
+            
+        Returns:
+            True si el mouse quedó sobre el objetivo
+        """
+        if not self.hover_ready:
+            return False
+        
+        try:
+            x, y = self._to_screen(x, y)
+            if self._cursor == (x, y):
+                return True
+            self.backend.move(x, y)
+        except Exception as e:
+            print(f"Error al mover mouse: {e}")
+            return False
+        
+        self._cursor = (x, y)
+        return True
     
     def click(
         self,
@@ -58,19 +118,29 @@ class MouseController:
         Returns:
             True si el clic fue exitoso
         """
+        watch = Stopwatch()
+        self.last_timings = watch.timings
+        
         try:
-            time.sleep(self.click_delay)
+            if self.click_delay > 0 and not self.fast:
+                time.sleep(self.click_delay)
+            watch.lap("click_delay")
             
+            button = click_type.value
             if click_type == ClickType.DOUBLE:
-                pyautogui.doubleClick(x, y, duration=self.click_duration)
+                button, clicks = ClickType.LEFT.value, 2
+            duration = 0.0 if self.fast else self.click_duration
+            x, y = self._to_screen(x, y)
+            
+            # Si el mouse ya está en el objetivo (prepare) se hace clic sin moverlo
+            if self._cursor == (x, y) and self.backend.position() == (x, y):
+                self.backend.click(button=button, clicks=clicks)
             else:
-                pyautogui.click(
-                    x, y,
-                    button=click_type.value,
-                    clicks=clicks,
-                    duration=self.click_duration
-                )
+                self.backend.click(x, y, button=button, clicks=clicks, duration=duration)
+            self._cursor = (x, y)
             
+            watch.lap("click_dispatch")
+            self.latency.record_all(watch.timings)
             return True
             
         except Exception as e:
@@ -90,18 +160,29 @@ class MouseController:
             True si el movimiento fue exitoso
         """
         try:
-            pyautogui.moveTo(x, y, duration=duration)
+            x, y = self._to_screen(x, y)
+            self.backend.move(x, y, duration)
+            self._cursor = (x, y)
             return True
         except Exception as e:
             print(f"Error al mover mouse: {e}")
             return False
     
-    @staticmethod
-    def get_position() -> Tuple[int, int]:
-        """Retorna la posición actual del mouse."""
-        return pyautogui.position()
+    def get_position(self) -> Tuple[int, int]:
+        """Retorna la posición actual del mouse (relativa a window, si hay)."""
+        x, y = self.backend.position()
+        if self.window is None:
+            return (x, y)
+        self.window.poll()
+        return self.window.to_window(x, y)
     
-    @staticmethod
-    def get_screen_size() -> Tuple[int, int]:
+    def get_screen_size(self) -> Tuple[int, int]:
         """Retorna el tamaño de la pantalla."""
-        return pyautogui.size()
+        return self.backend.screen_size()
+
+    def _to_screen(self, x: int, y: int) -> Tuple[int, int]:
+        """Suma la posición actual de la ventana (si hay) a un punto relativo."""
+        if self.window is None:
+            return (x, y)
+        self.window.poll()
+        return self.window.to_screen(x, y)
@@ -0,0 +1,388 @@
+"""
+Detección por manchas de color.
+
+El dado dorado tiene un color muy distinto del resto de la pantalla:
+umbralizar la región por color y buscar componentes conexas cuesta mucho
+menos que la correlación completa. ColorBlobDetector se puede usar solo, o
+como primer filtro de CascadeDetector, que solo corre la búsqueda de
+ImageDetector alrededor de las manchas candidatas (y ninguna si no hay).
+"""
+import cv2
+import numpy as np
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+from dataclasses import dataclass
+
+from config.settings import DETECTION_CONFIG
+from core.detector import DetectionResult, ImageDetector, Template
+from core.frame_source import FrameSource, Region, create_frame_source
+from core.roi import clip_region
+from core.timing import Stopwatch
+
+
+Color = Tuple[int, int, int]
+
+
+@dataclass
+class Blob:
+    """Mancha del color buscado, en coordenadas de pantalla."""
+    x: int
+    y: int
+    width: int
+    height: int
+    area: int  # Píxeles del color dentro de la caja
+    
+    @property
+    def region(self) -> Region:
+        return (self.x, self.y, self.width, self.height)
+    
+    @property
+    def fill(self) -> float:
+        """Fracción de la caja ocupada por el color."""
+        return self.area / float(self.width * self.height)
+
+
+class ColorBlobDetector:
+    """Busca manchas de un rango de color en la región."""
+    
+    def __init__(
+        self,
+        lower: Color,
+        upper: Color,
+        space: str = "hsv",
+        min_area: int = None,
+        max_blobs: int = None,
+        downscale: int = None,
+        region: Optional[Region] = None,
+        frame_source: FrameSource = None
+    ):
+        """
+        Inicializa el detector.
+        
+        Args:
+            lower: Límite inferior del color (HSV de OpenCV o BGR según space)
+            upper: Límite superior; en HSV, un tono inferior mayor al superior
+                   da la vuelta (p. ej. rojo: 170 a 10)
+            space: "hsv" o "bgr"
+            min_area: Píxeles mínimos de una mancha
+            max_blobs: Máximo de manchas a retornar (las más grandes)
+            downscale: Factor de reducción de la captura antes de buscar
+                       manchas (1 = resolución completa)
+            region: Región de la pantalla a escanear (x, y, width, height)
+            frame_source: Fuente de capturas (por defecto se crea una para la región)
+        """
+        if space not in ("hsv", "bgr"):
+            raise ValueError(f"Espacio de color desconocido: {space}")
+        
+        self.lower = np.array(lower, dtype=np.uint8)
+        self.upper = np.array(upper, dtype=np.uint8)
+        self.space = space
+        self.min_area = min_area or DETECTION_CONFIG["blob_min_area"]
+        self.max_blobs = max_blobs or DETECTION_CONFIG["blob_max_candidates"]
+        self.downscale = downscale or DETECTION_CONFIG["blob_downscale"]
+        
+        self._source = frame_source
+        self._region = region or DETECTION_CONFIG["region"]
+        if frame_source is not None and self._region:
+            frame_source.set_region(self._region)
+        
+        # Buffers reutilizados entre capturas
+        self._converted: Optional[np.ndarray] = None
+        self._mask: Optional[np.ndarray] = None
+        self._wrap_mask: Optional[np.ndarray] = None
+        self._small: Optional[np.ndarray] = None
+        self._labels: Optional[np.ndarray] = None
+    
+    @classmethod
+    def from_image(
+        cls,
+        image: Union[Path, Template, np.ndarray],
+        tolerance: Color = (8, 60, 60),
+        min_saturation: int = 60,
+        min_value: int = 60,
+        **kwargs
+    ) -> "ColorBlobDetector":
+        """
+        Crea el detector con el color dominante de una imagen.
+        
+        Toma la mediana HSV de los píxeles saturados y con brillo (descarta
+        fondo gris, blanco, negro y las partes transparentes) y le suma la
+        tolerancia. Si no se indica min_area, se usa un cuarto de los
+        píxeles de ese color en la imagen.
+        
+        Args:
+            image: Ruta a la imagen, Template o array BGR
+            tolerance: Margen (tono, saturación, valor) alrededor de la mediana
+            min_saturation: Saturación mínima de los píxeles considerados
+            min_value: Brillo mínimo de los píxeles considerados
+            **kwargs: Resto de los argumentos de ColorBlobDetector
+        
+        Returns:
+            ColorBlobDetector en espacio HSV
+        """
+        if isinstance(image, Template):
+            bgr = image.color
+        elif isinstance(image, np.ndarray):
+            bgr = image
+        else:
+            bgr = cv2.imread(str(image), cv2.IMREAD_UNCHANGED)
+            if bgr is None:
+                raise FileNotFoundError(f"Imagen no encontrada: {image}")
+        
+        if bgr.ndim == 2:
+            bgr = cv2.cvtColor(bgr, cv2.COLOR_GRAY2BGR)
+        pixels = bgr.reshape(-1, bgr.shape[2])
+        if pixels.shape[1] == 4:
+            pixels = pixels[pixels[:, 3] > 0]  # Descarta lo transparente
+        
+        hsv = cv2.cvtColor(pixels[None, :, :3], cv2.COLOR_BGR2HSV)[0]
+        saturated = hsv[(hsv[:, 1] >= min_saturation) & (hsv[:, 2] >= min_value)]
+        if not len(saturated):
+            raise ValueError("La imagen no tiene un color dominante (píxeles sin saturación)")
+        
+        # Una mancha mucho menor que el color de la imagen no puede ser ella
+        kwargs.setdefault("min_area", max(DETECTION_CONFIG["blob_min_area"], len(saturated) // 4))
+        
+        hue, sat, val = (int(v) for v in np.median(saturated, axis=0))
+        lower = ((hue - tolerance[0]) % 180, max(sat - tolerance[1], 0), max(val - tolerance[2], 0))
+        upper = ((hue + tolerance[0]) % 180, min(sat + tolerance[1], 255), min(val + tolerance[2], 255))
+        return cls(lower, upper, space="hsv", **kwargs)
+    
+    @property
+    def source(self) -> FrameSource:
+        """Fuente de capturas del detector (se crea al primer uso)."""
+        if self._source is None:
+            self._source = create_frame_source(region=self._region)
+        return self._source
+    
+    def mask(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Máscara de los píxeles del color buscado.
+        
+        Args:
+            frame: Captura BGR
+        
+        Returns:
+            Máscara uint8 (255 = color buscado); es un buffer interno
+        """
+        shape = frame.shape[:2]
+        if self._mask is None or self._mask.shape != shape:
+            self._mask = np.empty(shape, dtype=np.uint8)
+            self._wrap_mask = np.empty(shape, dtype=np.uint8)
+            self._converted = np.empty(frame.shape, dtype=np.uint8)
+        
+        if self.space == "bgr":
+            return cv2.inRange(frame, self.lower, self.upper, dst=self._mask)
+        
+        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV, dst=self._converted)
+        if self.lower[0] <= self.upper[0]:
+            return cv2.inRange(hsv, self.lower, self.upper, dst=self._mask)
+        
+        # El tono da la vuelta: [lower, 179] o [0, upper]
+        high = self.upper.copy()
+        high[0] = 179
+        low = self.lower.copy()
+        low[0] = 0
+        cv2.inRange(hsv, self.lower, high, dst=self._mask)
+        cv2.inRange(hsv, low, self.upper, dst=self._wrap_mask)
+        return cv2.bitwise_or(self._mask, self._wrap_mask, dst=self._mask)
+    
+    def find_blobs(self, frame: np.ndarray, origin: Tuple[int, int] = (0, 0)) -> List[Blob]:
+        """
+        Busca las manchas del color en una captura.
+        
+        Args:
+            frame: Captura BGR
+            origin: Coordenadas de pantalla de la esquina de la captura
+        
+        Returns:
+            Manchas de mayor a menor área (como máximo max_blobs)
+        """
+        step = self.downscale
+        if step > 1:
+            # Vecino más cercano: no mezcla colores, solo saltea píxeles
+            shape = (frame.shape[0] // step, frame.shape[1] // step, frame.shape[2])
+            if self._small is None or self._small.shape != shape:
+                self._small = np.empty(shape, dtype=np.uint8)
+            frame = cv2.resize(
+                frame, (shape[1], shape[0]), dst=self._small, interpolation=cv2.INTER_NEAREST
+            )
+        
+        mask = self.mask(frame)
+        if not cv2.countNonZero(mask):
+            return []
+        
+        if self._labels is None or self._labels.shape != mask.shape:
+            self._labels = np.empty(mask.shape, dtype=np.int32)
+        count, _, stats, _ = cv2.connectedComponentsWithStats(
+            mask, labels=self._labels, connectivity=8, ltype=cv2.CV_32S
+        )
+        # La componente 0 es el fondo; las cajas vuelven a la resolución completa
+        stats = stats[1:] * np.array([step, step, step, step, step * step])
+        stats = stats[stats[:, cv2.CC_STAT_AREA] >= self.min_area]
+        stats = stats[np.argsort(-stats[:, cv2.CC_STAT_AREA])][:self.max_blobs]
+        
+        return [
+            Blob(
+                x=origin[0] + int(left),
+                y=origin[1] + int(top),
+                width=int(width),
+                height=int(height),
+                area=int(area)
+            )
+            for left, top, width, height, area in stats
+        ]
+    
+    def detect(self, name: str = None) -> DetectionResult:
+        """
+        Busca la mancha más grande del color (uso como detector independiente).
+        
+        Args:
+            name: Nombre a reportar en el resultado
+        
+        Returns:
+            DetectionResult con la caja de la mancha; confidence es la
+            fracción de la caja ocupada por el color
+        """
+        blobs = self.find_blobs(self.source.grab(), self.source.region[:2])
+        if not blobs:
+            return DetectionResult(found=False, name=name)
+        
+        blob = blobs[0]
+        return DetectionResult(
+            found=True,
+            x=blob.x,
+            y=blob.y,
+            width=blob.width,
+            height=blob.height,
+            confidence=blob.fill,
+            name=name
+        )
+
+
+class CascadeDetector(ImageDetector):
+    """
+    ImageDetector que primero busca manchas de color.
+    
+    La correlación solo corre en una ventana alrededor de cada mancha
+    candidata; si en la captura no hay ninguna, no se busca. detect() es el
+    de ImageDetector, así que respeta change_gate: el filtro de color corre
+    solo en capturas (o zonas) que cambiaron, y su tiempo queda dentro de la
+    etapa "match".
+    """
+    
+    def __init__(
+        self,
+        color: ColorBlobDetector,
+        margin: int = None,
+        **kwargs
+    ):
+        """
+        Inicializa el detector.
+        
+        Args:
+            color: Detector de color que elige las zonas candidatas
+            margin: Píxeles agregados alrededor de cada mancha
+            **kwargs: Argumentos de ImageDetector
+        """
+        super().__init__(**kwargs)
+        self.color = color
+        self.margin = margin if margin is not None else DETECTION_CONFIG["blob_margin"]
+        self.frames_skipped = 0  # Capturas sin manchas (sin correlación)
+    
+    def match_blobs(
+        self,
+        frame: np.ndarray,
+        template: Template,
+        origin: Tuple[int, int],
+        watch: Stopwatch = None
+    ) -> DetectionResult:
+        """
+        Confirma con la correlación las manchas candidatas de una captura.
+        
+        Args:
+            frame: Captura BGR
+            template: Imagen a buscar
+            origin: Coordenadas de pantalla de la esquina de la captura
+            watch: Cronómetro en curso (para separar las etapas)
+        
+        Returns:
+            Mejor DetectionResult entre las manchas, o no encontrado
+        """
+        watch = watch or Stopwatch()
+        blobs = self.color.find_blobs(frame, origin)
+        watch.lap("blobs")
+        
+        best = DetectionResult(found=False, name=template.path.name)
+        if not blobs:
+            self.frames_skipped += 1
+            return best
+        
+        bounds = (origin[0], origin[1], frame.shape[1], frame.shape[0])
+        template_w, template_h = self._max_size(template)
+        for blob in blobs:
+            # Solo las posiciones de la imagen que contienen la mancha entera
+            # (o toda la mancha si es más grande que la imagen)
+            right, bottom = blob.x + blob.width, blob.y + blob.height
+            left, top = min(right - template_w, blob.x), min(bottom - template_h, blob.y)
+            x, y, width, height = clip_region((
+                left - self.margin,
+                top - self.margin,
+                max(blob.x + template_w, right) - left + 2 * self.margin,
+                max(blob.y + template_h, bottom) - top + 2 * self.margin,
+            ), bounds)
+            if width < template.width or height < template.height:
+                continue
+            
+            left, top = x - origin[0], y - origin[1]
+            result = super()._match_frame(frame[top:top + height, left:left + width], template, (x, y))
+            if result.found and (not best.found or result.confidence > best.confidence):
+                best = result
+        
+        watch.lap("match")
+        return best
+    
+    def clone(self) -> "CascadeDetector":
+        """Copia con buffers propios (incluido el detector de color)."""
+        color = ColorBlobDetector(
+            self.color.lower,
+            self.color.upper,
+            space=self.color.space,
+            min_area=self.color.min_area,
+            max_blobs=self.color.max_blobs,
+            downscale=self.color.downscale
+        )
+        return CascadeDetector(
+            color,
+            margin=self.margin,
+            confidence=self.confidence,
+            grayscale=self.grayscale,
+            templates=self.templates,
+            engine=self._engine_copy(),
+            pyramid_levels=self.pyramid_levels,
+            change_gate=False,
+            latency=self.latency,
+            multiscale=self.multiscale,
+            scales=self.scales,
+            rotations=self.rotations
+        )
+    
+    def match_frame(
+        self,
+        frame: np.ndarray,
+        image: Union[Path, Template],
+        origin: Tuple[int, int] = (0, 0)
+    ) -> DetectionResult:
+        """Igual que ImageDetector.match_frame, pero solo alrededor de las manchas."""
+        watch = Stopwatch()
+        result = self.match_blobs(frame, self.load(image), origin, watch)
+        return self._timed(result, watch)
+    
+    def _match_frame(
+        self,
+        frame: np.ndarray,
+        image: Union[Path, Template],
+        origin: Tuple[int, int]
+    ) -> DetectionResult:
+        """Búsqueda de ImageDetector.detect: solo alrededor de las manchas."""
+        return self.match_blobs(frame, self.load(image), origin)
@@ -1,12 +1,27 @@
 """
 Módulo de detección de imágenes en pantalla.
 """
-import pyautogui
+import cv2
+import numpy as np
 from pathlib import Path
-from typing import Optional, Tuple
-from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+from dataclasses import dataclass, field, replace
 
 from config.settings import DETECTION_CONFIG
+from core.change_detector import FrameChange, FrameChangeDetector
+from core.frame_source import FrameSource, create_frame_source
+from core.matching import (
+    FramePyramid,
+    MatchEngine,
+    MatchPeak,
+    OpenCVMatchEngine,
+    TemplateVariant,
+    create_match_engine,
+    pyramid_levels,
+    scaled_size,
+    template_variants,
+)
+from core.timing import LatencyRecorder, StageTimings, Stopwatch, get_latency_recorder
 
 
 @dataclass
@@ -17,7 +32,11 @@ class DetectionResult:
     y: Optional[int] = None
     width: Optional[int] = None
     height: Optional[int] = None
-    confidence: Optional[float] = None
+    confidence: Optional[float] = None  # Puntaje real de la coincidencia
+    name: Optional[str] = None  # Nombre del archivo de la imagen buscada
+    scale: float = 1.0  # Escala de la imagen que coincidió (búsqueda multiescala)
+    angle: float = 0.0  # Rotación en grados de la imagen que coincidió
+    timings: StageTimings = field(default_factory=dict, repr=False, compare=False)  # Segundos por etapa
     
     @property
     def center(self) -> Optional[Tuple[int, int]]:
@@ -30,6 +49,160 @@ class DetectionResult:
         return None
 
 
+@dataclass
+class MultiDetectionResult:
+    """Resultado de buscar varias imágenes sobre una misma captura."""
+    results: List[DetectionResult] = field(default_factory=list)  # Una por imagen, en orden
+    best_index: Optional[int] = None  # Índice de la imagen con mayor puntaje
+    
+    @property
+    def found(self) -> bool:
+        return self.best_index is not None
+    
+    @property
+    def best(self) -> Optional[DetectionResult]:
+        """Detección ganadora, o None si no se encontró ninguna imagen."""
+        if self.best_index is None:
+            return None
+        return self.results[self.best_index]
+
+
+@dataclass
+class Template:
+    """Imagen a buscar ya cargada y preprocesada en memoria."""
+    path: Path
+    mtime: float
+    color: np.ndarray  # BGR, formato nativo de OpenCV
+    gray: np.ndarray
+    _pyramids: Dict[Tuple[bool, int], List[np.ndarray]] = field(
+        default_factory=dict, repr=False, compare=False
+    )
+    _variants: Dict[tuple, List[TemplateVariant]] = field(
+        default_factory=dict, repr=False, compare=False
+    )
+    
+    @property
+    def width(self) -> int:
+        return self.color.shape[1]
+    
+    @property
+    def height(self) -> int:
+        return self.color.shape[0]
+    
+    def image(self, grayscale: bool) -> np.ndarray:
+        """Retorna la variante color o escala de grises."""
+        return self.gray if grayscale else self.color
+    
+    def pyramid(self, grayscale: bool, levels: int) -> List[np.ndarray]:
+        """Retorna la imagen reducida en cada nivel de la pirámide (cacheada)."""
+        key = (grayscale, levels)
+        if key not in self._pyramids:
+            self._pyramids[key] = pyramid_levels(self.image(grayscale), levels)
+        return self._pyramids[key]
+    
+    def variants(
+        self,
+        grayscale: bool,
+        scales: Sequence[float],
+        rotations: Sequence[float]
+    ) -> List[TemplateVariant]:
+        """Retorna las variantes reescaladas/rotadas de la imagen (cacheadas)."""
+        key = (grayscale, tuple(scales), tuple(rotations))
+        if key not in self._variants:
+            self._variants[key] = template_variants(self.image(grayscale), scales, rotations)
+        return self._variants[key]
+
+
+class TemplateCache:
+    """
+    Registro de imágenes a buscar.
+    
+    Cada imagen se lee y decodifica una sola vez; las entradas se identifican
+    por ruta y fecha de modificación, así que un archivo editado en disco se
+    recarga automáticamente.
+    """
+    
+    def __init__(self, revalidate: bool = None):
+        """
+        Inicializa el registro.
+        
+        Args:
+            revalidate: Si True, verifica el mtime del archivo en cada acceso.
+                        Si False, la entrada vive hasta invalidarla a mano.
+        """
+        self.revalidate = (
+            revalidate if revalidate is not None
+            else DETECTION_CONFIG["template_revalidate"]
+        )
+        self._entries: Dict[Path, Template] = {}
+    
+    def get(self, image_path: Path) -> Template:
+        """
+        Obtiene la imagen cargada, leyéndola de disco solo si hace falta.
+        
+        Args:
+            image_path: Ruta a la imagen
+            
+        Returns:
+            Template con las variantes color y escala de grises
+        """
+        path = Path(image_path)
+        entry = self._entries.get(path)
+        
+        if entry is not None and not self.revalidate:
+            return entry
+        
+        try:
+            mtime = path.stat().st_mtime
+        except OSError:
+            self._entries.pop(path, None)
+            raise FileNotFoundError(f"Imagen no encontrada: {path}")
+        
+        if entry is not None and entry.mtime == mtime:
+            return entry
+        
+        entry = self._load(path, mtime)
+        self._entries[path] = entry
+        return entry
+    
+    def invalidate(self, image_path: Optional[Path] = None) -> None:
+        """
+        Descarta una imagen del registro (o todas si no se indica ruta).
+        
+        Args:
+            image_path: Ruta a descartar, o None para vaciar el registro
+        """
+        if image_path is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(Path(image_path), None)
+    
+    def __contains__(self, image_path: Path) -> bool:
+        return Path(image_path) in self._entries
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    @staticmethod
+    def _load(path: Path, mtime: float) -> Template:
+        """Lee y decodifica la imagen desde disco."""
+        color = cv2.imread(str(path), cv2.IMREAD_COLOR)
+        if color is None:
+            raise ValueError(f"No se pudo decodificar la imagen: {path}")
+        
+        gray = cv2.cvtColor(color, cv2.COLOR_BGR2GRAY)
+        return Template(path=path, mtime=mtime, color=color, gray=gray)
+
+
+# Registro compartido por todos los detectores por defecto
+_default_cache = TemplateCache()
+
+
+def get_template_cache() -> TemplateCache:
+    """Retorna el registro de imágenes compartido."""
+    return _default_cache
+
+
 class ImageDetector:
     """Clase para detectar imágenes en la pantalla."""
     
@@ -37,7 +210,16 @@ class ImageDetector:
         self,
         confidence: float = None,
         grayscale: bool = None,
-        region: Optional[Tuple[int, int, int, int]] = None
+        region: Optional[Tuple[int, int, int, int]] = None,
+        templates: TemplateCache = None,
+        engine: Union[str, MatchEngine] = None,
+        frame_source: FrameSource = None,
+        pyramid_levels: int = None,
+        change_gate: Union[bool, FrameChangeDetector] = None,
+        latency: LatencyRecorder = None,
+        multiscale: bool = None,
+        scales: Sequence[float] = None,
+        rotations: Sequence[float] = None
     ):
         """
         Inicializa el detector de imágenes.
@@ -46,80 +228,434 @@ class ImageDetector:
             confidence: Nivel de confianza (0.0 - 1.0)
             grayscale: Si usar escala de grises
             region: Región de la pantalla a escanear (x, y, width, height)
+            templates: Registro de imágenes (por defecto el compartido)
+            engine: Motor de búsqueda o su nombre ("opencv", "pyautogui")
+            frame_source: Fuente de capturas (por defecto se crea una para la región)
+            pyramid_levels: Niveles de reducción para la búsqueda gruesa a fina
+                            (0 = desactivada, 1 = 1/2, 2 = 1/4)
+            change_gate: Saltear la búsqueda en capturas sin cambios (True/False
+                         o un FrameChangeDetector propio)
+            latency: Registro de latencias (por defecto el compartido)
+            multiscale: Buscar también la imagen reescalada/rotada (para cambios
+                        de DPI o del tamaño de la ventana)
+            scales: Escalas a probar en modo multiescala
+            rotations: Ángulos en grados a probar en modo multiescala
         """
         self.confidence = confidence or DETECTION_CONFIG["confidence"]
         self.grayscale = grayscale if grayscale is not None else DETECTION_CONFIG["grayscale"]
-        self.region = region or DETECTION_CONFIG["region"]
+        self.templates = templates if templates is not None else _default_cache
+        self.engine = engine if isinstance(engine, MatchEngine) else create_match_engine(engine)
+        self.pyramid_levels = (
+            pyramid_levels if pyramid_levels is not None
+            else DETECTION_CONFIG["pyramid_levels"]
+        )
+        self.latency = latency or get_latency_recorder()
+        self.multiscale = multiscale if multiscale is not None else DETECTION_CONFIG["multiscale"]
+        self.scales = tuple(scales or DETECTION_CONFIG["scales"])
+        self.rotations = tuple(rotations or DETECTION_CONFIG["rotations"])
+        
+        self._source = frame_source
+        self._region = region or DETECTION_CONFIG["region"]
+        if frame_source is not None and self._region:
+            frame_source.set_region(self._region)
+        
+        if change_gate is None:
+            change_gate = DETECTION_CONFIG["skip_unchanged"]
+        if isinstance(change_gate, FrameChangeDetector):
+            self.change_gate: Optional[FrameChangeDetector] = change_gate
+        else:
+            self.change_gate = FrameChangeDetector() if change_gate else None
+        
+        # Último resultado por imagen, reutilizado si la captura no cambió
+        self._last_results: Dict[Path, DetectionResult] = {}
+        self.last_change: Optional[FrameChange] = None
+        
+        # Variante ganadora por imagen: se prueba primero en el próximo escaneo
+        self._variant_hints: Dict[Path, TemplateVariant] = {}
+        
+        # Buffers reutilizados entre escaneos
+        self._gray: Optional[np.ndarray] = None
+        self._pyramid = FramePyramid()
+    
+    @property
+    def source(self) -> FrameSource:
+        """Fuente de capturas del detector (se crea al primer uso)."""
+        if self._source is None:
+            self._source = create_frame_source(region=self._region)
+        return self._source
     
-    def detect(self, image_path: Path) -> DetectionResult:
+    @property
+    def region(self) -> Optional[Tuple[int, int, int, int]]:
+        """Región de la pantalla a escanear (x, y, width, height)."""
+        if self._source is not None:
+            return self._source.region
+        return self._region
+    
+    @region.setter
+    def region(self, region: Optional[Tuple[int, int, int, int]]) -> None:
+        self._region = region
+        if self._source is not None:
+            self._source.set_region(region)
+    
+    def clone(self) -> "ImageDetector":
+        """
+        Crea una copia con la misma configuración pero buffers propios.
+        
+        Los buffers de búsqueda no se pueden compartir entre hilos; cada hilo
+        que llame a match_frame debe usar su propia copia. La copia comparte
+        el registro de imágenes y no tiene fuente de capturas ni change_gate.
+        
+        Returns:
+            Nuevo ImageDetector
+        """
+        return ImageDetector(
+            confidence=self.confidence,
+            grayscale=self.grayscale,
+            templates=self.templates,
+            engine=self._engine_copy(),
+            pyramid_levels=self.pyramid_levels,
+            change_gate=False,
+            latency=self.latency,
+            multiscale=self.multiscale,
+            scales=self.scales,
+            rotations=self.rotations
+        )
+    
+    def _engine_copy(self) -> MatchEngine:
+        """Motor de búsqueda igual al actual, con buffers propios (para clone)."""
+        if isinstance(self.engine, OpenCVMatchEngine):
+            return OpenCVMatchEngine(self.engine.method)
+        return create_match_engine(self.engine.name)
+    
+    def load(self, image: Union[Path, Template]) -> Template:
+        """
+        Obtiene la imagen preprocesada desde el registro.
+        
+        Args:
+            image: Ruta a la imagen o Template ya cargado
+            
+        Returns:
+            Template listo para buscar
+        """
+        if isinstance(image, Template):
+            return image
+        return self.templates.get(image)
+    
+    def detect(self, image_path: Union[Path, Template]) -> DetectionResult:
         """
         Detecta una imagen en la pantalla.
         
+        Si change_gate está activo y la imagen no estaba en la búsqueda
+        anterior, solo se busca en la zona que cambió desde entonces, o no se
+        busca si la captura no cambió. Un resultado positivo nunca se reutiliza:
+        después de un clic la imagen pudo desaparecer sin que se note el cambio.
+        
+        La duración de cada etapa ("capture", "gate", "match") queda en
+        DetectionResult.timings y en el registro de latencias.
+        
         Args:
-            image_path: Ruta a la imagen a buscar
+            image_path: Ruta a la imagen a buscar (o Template ya cargado)
             
         Returns:
             DetectionResult con la información de la detección
         """
-        if not image_path.exists():
-            raise FileNotFoundError(f"Imagen no encontrada: {image_path}")
+        template = self.load(image_path)
+        watch = Stopwatch()
+        frame = self.source.grab()
+        region = self.source.region
+        watch.lap("capture")
         
-        try:
-            location = pyautogui.locateOnScreen(
-                str(image_path),
-                confidence=self.confidence,
-                grayscale=self.grayscale,
-                region=self.region
+        if self.change_gate is None:
+            result = self._match_frame(frame, template, region[:2])
+            watch.lap("match")
+            return self._timed(result, watch)
+        
+        change = self.change_gate.check(frame, key=template.path, region=region)
+        self.last_change = change
+        last = self._last_results.get(template.path)
+        watch.lap("gate")
+        
+        if last is not None and not last.found and not change.changed:
+            self.change_gate.frames_skipped += 1
+            return self._timed(replace(last, timings={}), watch)
+        
+        self.change_gate.frames_matched += 1
+        
+        if last is not None and not last.found:
+            # Una coincidencia nueva tiene que tocar la zona que cambió
+            x, y, width, height = change.dirty
+            pad_w, pad_h = self._max_size(template)
+            left = max(x - pad_w, 0)
+            top = max(y - pad_h, 0)
+            right = min(x + width + pad_w, frame.shape[1])
+            bottom = min(y + height + pad_h, frame.shape[0])
+            result = self._match_frame(
+                frame[top:bottom, left:right], template, (region[0] + left, region[1] + top)
             )
+        else:
+            result = self._match_frame(frame, template, region[:2])
+        
+        watch.lap("match")
+        self._last_results[template.path] = result
+        return self._timed(result, watch)
+    
+    def detect_all(
+        self,
+        image_path: Union[Path, Template],
+        max_results: int = None,
+        iou: float = None
+    ) -> list[DetectionResult]:
+        """
+        Detecta todas las instancias de una imagen en la pantalla.
+        
+        Cada objeto aparece una sola vez: de las coincidencias superpuestas
+        se conserva la de mayor puntaje.
+        
+        Args:
+            image_path: Ruta a la imagen a buscar (o Template ya cargado)
+            max_results: Máximo de resultados (por defecto DETECTION_CONFIG["max_results"])
+            iou: Superposición máxima entre dos resultados (por defecto DETECTION_CONFIG["nms_iou"])
             
-            if location:
-                return DetectionResult(
-                    found=True,
-                    x=location.left,
-                    y=location.top,
-                    width=location.width,
-                    height=location.height,
-                    confidence=self.confidence
-                )
-            
-            return DetectionResult(found=False)
+        Returns:
+            Lista de DetectionResult ordenada de mayor a menor confianza
+        """
+        template = self.load(image_path)
+        watch = Stopwatch()
+        frame = self.source.grab()
+        origin = self.source.region[:2]
+        watch.lap("capture")
+        
+        peaks = self.engine.match_all(
+            self._prepare(frame).level(0),
+            template.image(self.grayscale),
+            self.confidence,
+            iou=iou,
+            max_results=max_results
+        )
+        watch.lap("match")
+        self.latency.record_all(watch.timings)
+        
+        return [
+            self._to_result(peak, template, origin, dict(watch.timings))
+            for peak in peaks
+        ]
+    
+    def detect_many(self, images: Sequence[Union[Path, Template]]) -> MultiDetectionResult:
+        """
+        Busca varias imágenes con una sola captura.
+        
+        La captura, su conversión a escala de grises y los niveles de la
+        pirámide se comparten entre todas las imágenes, así que el costo por
+        imagen es solo la búsqueda.
+        
+        Args:
+            images: Rutas a las imágenes (o Templates ya cargados)
             
-        except pyautogui.ImageNotFoundException:
-            return DetectionResult(found=False)
+        Returns:
+            MultiDetectionResult con una detección por imagen y la ganadora
+        """
+        watch = Stopwatch()
+        frame = self.source.grab()
+        capture = watch.lap("capture")
+        self.latency.record("capture", capture)
+        
+        multi = self.match_many(frame, images, self.source.region[:2])
+        for result in multi.results:
+            result.timings["capture"] = capture
+        return multi
     
-    def detect_all(self, image_path: Path) -> list[DetectionResult]:
+    def match_many(
+        self,
+        frame: np.ndarray,
+        images: Sequence[Union[Path, Template]],
+        origin: Tuple[int, int] = (0, 0)
+    ) -> MultiDetectionResult:
         """
-        Detecta todas las instancias de una imagen en la pantalla.
+        Busca varias imágenes en una captura ya obtenida.
         
         Args:
-            image_path: Ruta a la imagen a buscar
+            frame: Captura BGR
+            images: Rutas a las imágenes (o Templates ya cargados)
+            origin: Coordenadas de pantalla de la esquina de la captura
             
         Returns:
-            Lista de DetectionResult
+            MultiDetectionResult con una detección por imagen y la ganadora
         """
-        if not image_path.exists():
-            raise FileNotFoundError(f"Imagen no encontrada: {image_path}")
+        templates = [self.load(image) for image in images]
+        watch = Stopwatch()
+        pyramid = self._prepare(frame)
+        prepare = watch.lap("prepare")
+        self.latency.record("prepare", prepare)
         
-        results = []
-        try:
-            locations = pyautogui.locateAllOnScreen(
-                str(image_path),
-                confidence=self.confidence,
-                grayscale=self.grayscale,
-                region=self.region
-            )
+        multi = MultiDetectionResult()
+        best_score = -1.0
+        
+        for index, template in enumerate(templates):
+            peak = self._match(pyramid, template)
+            timings = {"prepare": prepare, "match": watch.lap("match")}
+            self.latency.record("match", timings["match"])
             
-            for location in locations:
-                results.append(DetectionResult(
-                    found=True,
-                    x=location.left,
-                    y=location.top,
-                    width=location.width,
-                    height=location.height,
-                    confidence=self.confidence
-                ))
-                
-        except pyautogui.ImageNotFoundException:
-            pass
+            if peak is None:
+                multi.results.append(DetectionResult(found=False, name=template.path.name, timings=timings))
+                continue
             
-        return results
+            multi.results.append(self._to_result(peak, template, origin, timings))
+            if peak.score > best_score:
+                best_score = peak.score
+                multi.best_index = index
+        
+        return multi
+    
+    def match_frame(
+        self,
+        frame: np.ndarray,
+        image: Union[Path, Template],
+        origin: Tuple[int, int] = (0, 0)
+    ) -> DetectionResult:
+        """
+        Busca una imagen en una captura ya obtenida.
+        
+        Args:
+            frame: Captura BGR
+            image: Ruta a la imagen a buscar (o Template ya cargado)
+            origin: Coordenadas de pantalla de la esquina de la captura
+            
+        Returns:
+            DetectionResult en coordenadas de pantalla
+        """
+        watch = Stopwatch()
+        result = self._match_frame(frame, image, origin)
+        watch.lap("match")
+        return self._timed(result, watch)
+    
+    def _match_frame(
+        self,
+        frame: np.ndarray,
+        image: Union[Path, Template],
+        origin: Tuple[int, int]
+    ) -> DetectionResult:
+        """match_frame sin registrar tiempos."""
+        template = self.load(image)
+        peak = self._match(self._prepare(frame), template)
+        
+        if peak is None:
+            return DetectionResult(found=False, name=template.path.name)
+        
+        return self._to_result(peak, template, origin)
+    
+    def _timed(self, result: DetectionResult, watch: Stopwatch) -> DetectionResult:
+        """Copia los tiempos de las etapas al resultado y al registro de latencias."""
+        result.timings.update(watch.timings)
+        self.latency.record_all(watch.timings)
+        return result
+    
+    def _prepare(self, frame: np.ndarray) -> FramePyramid:
+        """Convierte la captura a escala de grises si corresponde y arma su pirámide."""
+        if self.grayscale:
+            if self._gray is None or self._gray.shape != frame.shape[:2]:
+                self._gray = np.empty(frame.shape[:2], dtype=np.uint8)
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=self._gray)
+        
+        return self._pyramid.update(frame)
+        
+    def _match(self, pyramid: FramePyramid, template: Template) -> Optional[MatchPeak]:
+        """Busca la imagen, usando la pirámide si la región es grande."""
+        if self.multiscale:
+            return self._match_multiscale(pyramid, template)
+        
+        needles = template.pyramid(self.grayscale, self.pyramid_levels)
+        return self._match_needles(pyramid, needles)
+    
+    def _match_needles(self, pyramid: FramePyramid, needles: List[np.ndarray]) -> Optional[MatchPeak]:
+        """Busca una imagen (needles[0]) con sus niveles reducidos."""
+        if self._use_pyramid(pyramid):
+            return self.engine.match_pyramid(pyramid, needles, self.confidence)
+        return self.engine.match(pyramid.level(0), needles[0], self.confidence)
+    
+    def _use_pyramid(self, pyramid: FramePyramid) -> bool:
+        """Si la región es lo bastante grande para la búsqueda gruesa a fina."""
+        frame = pyramid.level(0)
+        return (
+            self.pyramid_levels > 0
+            and isinstance(self.engine, OpenCVMatchEngine)
+            and frame.shape[0] * frame.shape[1] >= DETECTION_CONFIG["pyramid_min_area"]
+        )
+        
+    def _match_multiscale(self, pyramid: FramePyramid, template: Template) -> Optional[MatchPeak]:
+        """
+        Busca la imagen en todas sus variantes de escala y rotación.
+        
+        Primero prueba la variante que ganó en el escaneo anterior; solo si
+        no coincide recorre todo el banco. En regiones grandes las variantes
+        se comparan en el nivel más reducido de la pirámide y solo las dos
+        mejores se refinan a resolución completa.
+        """
+        frame = pyramid.level(0)
+        variants = [
+            variant for variant in template.variants(self.grayscale, self.scales, self.rotations)
+            if variant.image.shape[0] <= frame.shape[0] and variant.image.shape[1] <= frame.shape[1]
+        ]
+        
+        hint = self._variant_hints.get(template.path)
+        if hint is not None and any(variant is hint for variant in variants):
+            peak = self._match_needles(pyramid, hint.pyramid(self.pyramid_levels))
+            if peak is not None:
+                return self._variant_peak(peak, hint)
+            variants = [variant for variant in variants if variant is not hint]
+        
+        if self._use_pyramid(pyramid):
+            # Ordenar por el puntaje en el nivel reducido y refinar las mejores
+            ranked = []
+            for variant in variants:
+                needles = variant.pyramid(self.pyramid_levels)
+                level = len(needles) - 1
+                coarse = self.engine.match(pyramid.level(level), needles[level], -1.0)
+                ranked.append((coarse.score if coarse else -1.0, variant))
+            ranked.sort(key=lambda item: item[0], reverse=True)
+            candidates = [variant for _, variant in ranked[:2]]
+        else:
+            candidates = variants
+        
+        best: Optional[MatchPeak] = None
+        for variant in candidates:
+            peak = self._match_needles(pyramid, variant.pyramid(self.pyramid_levels))
+            if peak is not None and (best is None or peak.score > best.score):
+                best = self._variant_peak(peak, variant)
+                self._variant_hints[template.path] = variant
+        
+        return best
+    
+    @staticmethod
+    def _variant_peak(peak: MatchPeak, variant: TemplateVariant) -> MatchPeak:
+        """Anota en la coincidencia la variante que la produjo."""
+        peak.scale = variant.scale
+        peak.angle = variant.angle
+        return peak
+    
+    def _max_size(self, template: Template) -> Tuple[int, int]:
+        """Tamaño máximo (ancho, alto) que puede tener una coincidencia."""
+        if not self.multiscale:
+            return template.width, template.height
+        return scaled_size(template.width, template.height, max(self.scales))
+    
+    @staticmethod
+    def _to_result(
+        peak: MatchPeak,
+        template: Template,
+        origin: Tuple[int, int],
+        timings: Optional[StageTimings] = None
+    ) -> DetectionResult:
+        """Convierte una coincidencia en la captura a coordenadas de pantalla."""
+        width, height = scaled_size(template.width, template.height, peak.scale)
+        return DetectionResult(
+            found=True,
+            x=origin[0] + peak.x,
+            y=origin[1] + peak.y,
+            width=width,
+            height=height,
+            confidence=peak.score,
+            name=template.path.name,
+            scale=peak.scale,
+            angle=peak.angle,
+            timings=timings if timings is not None else {}
+        )
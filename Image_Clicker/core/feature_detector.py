@@ -0,0 +1,314 @@
+"""
+Detección por puntos característicos (ORB).
+
+Alternativa a la correlación de ImageDetector para imágenes animadas,
+parcialmente tapadas o con otra escala/rotación: compara descriptores ORB
+de la imagen buscada (calculados una sola vez) con los de la captura y
+estima la caja con una homografía. Tiene la misma interfaz detect() y
+devuelve DetectionResult.
+"""
+import math
+import cv2
+import numpy as np
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Tuple, Union
+from dataclasses import dataclass
+
+from config.settings import DETECTION_CONFIG
+from core.detector import (
+    DetectionResult,
+    MultiDetectionResult,
+    Template,
+    TemplateCache,
+    get_template_cache,
+)
+from core.frame_source import FrameSource, Region, create_frame_source
+from core.roi import clip_region
+from core.timing import LatencyRecorder, Stopwatch, get_latency_recorder
+
+
+@dataclass
+class Features:
+    """Puntos característicos y descriptores de una imagen."""
+    points: np.ndarray  # (N, 2) float32, coordenadas en la imagen
+    descriptors: Optional[np.ndarray]  # (N, 32) uint8, o None si no hay puntos
+    
+    def __len__(self) -> int:
+        return len(self.points)
+
+
+class FeatureDetector:
+    """Detector de imágenes por puntos característicos ORB."""
+    
+    def __init__(
+        self,
+        region: Optional[Region] = None,
+        templates: TemplateCache = None,
+        frame_source: FrameSource = None,
+        n_features: int = None,
+        ratio: float = None,
+        min_matches: int = None,
+        latency: LatencyRecorder = None
+    ):
+        """
+        Inicializa el detector.
+        
+        Args:
+            region: Región de la pantalla a escanear (x, y, width, height)
+            templates: Registro de imágenes (por defecto el compartido)
+            frame_source: Fuente de capturas (por defecto se crea una para la región)
+            n_features: Máximo de puntos por captura
+            ratio: Umbral del test de Lowe (mejor / segundo mejor descriptor)
+            min_matches: Mínimo de coincidencias consistentes con la homografía
+            latency: Registro de latencias (por defecto el compartido)
+        """
+        self.templates = templates if templates is not None else get_template_cache()
+        self.n_features = n_features or DETECTION_CONFIG["orb_features"]
+        self.ratio = ratio or DETECTION_CONFIG["orb_ratio"]
+        self.min_matches = min_matches or DETECTION_CONFIG["orb_min_matches"]
+        self.min_area = DETECTION_CONFIG["orb_min_area"]
+        self.latency = latency or get_latency_recorder()
+        
+        patch = DETECTION_CONFIG["orb_patch_size"]
+        self._patch = patch
+        # Parches chicos: las imágenes del juego son de pocas decenas de píxeles
+        self._orb = cv2.ORB_create(
+            nfeatures=self.n_features, edgeThreshold=patch, patchSize=patch
+        )
+        self._matcher = cv2.BFMatcher(cv2.NORM_HAMMING)
+        
+        self._source = frame_source
+        self._region = region or DETECTION_CONFIG["region"]
+        if frame_source is not None and self._region:
+            frame_source.set_region(self._region)
+        
+        # Descriptores por imagen, invalidados si el Template se recarga
+        self._features: Dict[Path, Tuple[Template, Features]] = {}
+        self._gray: Optional[np.ndarray] = None
+    
+    @property
+    def source(self) -> FrameSource:
+        """Fuente de capturas del detector (se crea al primer uso)."""
+        if self._source is None:
+            self._source = create_frame_source(region=self._region)
+        return self._source
+    
+    @property
+    def region(self) -> Optional[Region]:
+        """Región de la pantalla a escanear (x, y, width, height)."""
+        if self._source is not None:
+            return self._source.region
+        return self._region
+    
+    @region.setter
+    def region(self, region: Optional[Region]) -> None:
+        self._region = region
+        if self._source is not None:
+            self._source.set_region(region)
+    
+    def load(self, image: Union[Path, Template]) -> Template:
+        """Obtiene la imagen preprocesada desde el registro."""
+        if isinstance(image, Template):
+            return image
+        return self.templates.get(image)
+    
+    def template_features(self, image: Union[Path, Template]) -> Features:
+        """
+        Puntos y descriptores de la imagen buscada (calculados una sola vez).
+        
+        Args:
+            image: Ruta a la imagen o Template ya cargado
+        
+        Returns:
+            Features de la imagen
+        """
+        template = self.load(image)
+        cached = self._features.get(template.path)
+        if cached is not None and cached[0] is template:
+            return cached[1]
+        
+        # Borde repetido para que haya puntos también cerca de los bordes
+        pad = self._patch
+        padded = cv2.copyMakeBorder(template.gray, pad, pad, pad, pad, cv2.BORDER_REPLICATE)
+        features = self._compute(padded, offset=(-pad, -pad))
+        self._features[template.path] = (template, features)
+        return features
+    
+    def detect(
+        self,
+        image_path: Union[Path, Template],
+        roi: Optional[Region] = None
+    ) -> DetectionResult:
+        """
+        Detecta una imagen en la pantalla.
+        
+        Args:
+            image_path: Ruta a la imagen a buscar (o Template ya cargado)
+            roi: Zona de la captura (en coordenadas de pantalla) donde buscar
+                 puntos; None para toda la región
+        
+        Returns:
+            DetectionResult con la información de la detección
+        """
+        return self.detect_many([image_path], roi=roi).results[0]
+    
+    def detect_many(
+        self,
+        images: Sequence[Union[Path, Template]],
+        roi: Optional[Region] = None
+    ) -> MultiDetectionResult:
+        """
+        Busca varias imágenes con una sola captura.
+        
+        Los puntos de la captura se calculan una sola vez para todas las imágenes.
+        
+        Args:
+            images: Rutas a las imágenes (o Templates ya cargados)
+            roi: Zona de la captura (en coordenadas de pantalla) donde buscar puntos
+        
+        Returns:
+            MultiDetectionResult con una detección por imagen y la ganadora
+        """
+        watch = Stopwatch()
+        frame = self.source.grab()
+        region = self.source.region
+        watch.lap("capture")
+        
+        return self.match_many(frame, images, region[:2], roi=roi, watch=watch)
+    
+    def match_frame(
+        self,
+        frame: np.ndarray,
+        image: Union[Path, Template],
+        origin: Tuple[int, int] = (0, 0),
+        roi: Optional[Region] = None
+    ) -> DetectionResult:
+        """
+        Busca una imagen en una captura ya obtenida.
+        
+        Args:
+            frame: Captura BGR
+            image: Ruta a la imagen a buscar (o Template ya cargado)
+            origin: Coordenadas de pantalla de la esquina de la captura
+            roi: Zona de la captura (en coordenadas de pantalla) donde buscar puntos
+        
+        Returns:
+            DetectionResult en coordenadas de pantalla
+        """
+        return self.match_many(frame, [image], origin, roi=roi).results[0]
+    
+    def match_many(
+        self,
+        frame: np.ndarray,
+        images: Sequence[Union[Path, Template]],
+        origin: Tuple[int, int] = (0, 0),
+        roi: Optional[Region] = None,
+        watch: Stopwatch = None
+    ) -> MultiDetectionResult:
+        """
+        Busca varias imágenes en una captura ya obtenida.
+        
+        Args:
+            frame: Captura BGR
+            images: Rutas a las imágenes (o Templates ya cargados)
+            origin: Coordenadas de pantalla de la esquina de la captura
+            roi: Zona de la captura (en coordenadas de pantalla) donde buscar puntos
+            watch: Cronómetro en curso (para sumar la etapa de captura)
+        
+        Returns:
+            MultiDetectionResult con una detección por imagen y la ganadora
+        """
+        watch = watch or Stopwatch()
+        templates = [self.load(image) for image in images]
+        
+        height, width = frame.shape[:2]
+        left, top = 0, 0
+        if roi is not None:
+            x, y, w, h = clip_region(roi, (origin[0], origin[1], width, height))
+            left, top = x - origin[0], y - origin[1]
+            frame = frame[top:top + h, left:left + w]
+        
+        if self._gray is None or self._gray.shape != frame.shape[:2]:
+            self._gray = np.empty(frame.shape[:2], dtype=np.uint8)
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=self._gray)
+        frame_features = self._compute(gray, offset=(left + origin[0], top + origin[1]))
+        watch.lap("features")
+        
+        multi = MultiDetectionResult()
+        best_score = -1.0
+        for index, template in enumerate(templates):
+            result = self._match(template, frame_features)
+            multi.results.append(result)
+            if result.found and result.confidence > best_score:
+                best_score = result.confidence
+                multi.best_index = index
+        
+        watch.lap("match")
+        self.latency.record_all(watch.timings)
+        for result in multi.results:
+            result.timings.update(watch.timings)
+        return multi
+    
+    def _compute(self, gray: np.ndarray, offset: Tuple[int, int]) -> Features:
+        """Calcula puntos y descriptores, desplazando los puntos por offset."""
+        keypoints, descriptors = self._orb.detectAndCompute(gray, None)
+        points = np.array([kp.pt for kp in keypoints], dtype=np.float32).reshape(-1, 2)
+        points += np.array(offset, dtype=np.float32)
+        return Features(points=points, descriptors=descriptors)
+    
+    def _match(self, template: Template, frame_features: Features) -> DetectionResult:
+        """Empareja los descriptores y estima la caja con una homografía."""
+        not_found = DetectionResult(found=False, name=template.path.name)
+        needle = self.template_features(template)
+        if len(needle) < self.min_matches or len(frame_features) < 2:
+            return not_found
+        
+        pairs = self._matcher.knnMatch(needle.descriptors, frame_features.descriptors, k=2)
+        good = [
+            pair[0] for pair in pairs
+            if len(pair) == 2 and pair[0].distance < self.ratio * pair[1].distance
+        ]
+        if len(good) < self.min_matches:
+            return not_found
+        
+        src = needle.points[[m.queryIdx for m in good]]
+        dst = frame_features.points[[m.trainIdx for m in good]]
+        homography, inliers = cv2.findHomography(src, dst, cv2.RANSAC, 5.0)
+        if homography is None:
+            return not_found
+        
+        inlier_count = int(inliers.sum())
+        if inlier_count < self.min_matches:
+            return not_found
+        
+        corners = np.array(
+            [[0, 0], [template.width, 0], [template.width, template.height], [0, template.height]],
+            dtype=np.float32
+        ).reshape(-1, 1, 2)
+        box = cv2.perspectiveTransform(corners, homography).reshape(-1, 2)
+        
+        # Una homografía degenerada (caja cruzada o casi sin área) es ruido de RANSAC
+        area = template.width * template.height
+        if not cv2.isContourConvex(box) or cv2.contourArea(box) < self.min_area * area:
+            return not_found
+        
+        x, y = np.floor(box.min(axis=0)).astype(int)
+        right, bottom = np.ceil(box.max(axis=0)).astype(int)
+        
+        # Escala y rotación aproximadas a partir de la parte lineal
+        # (ángulo antihorario, como en TemplateVariant; el eje y apunta hacia abajo)
+        linear = homography[:2, :2] / homography[2, 2]
+        scale = math.sqrt(abs(np.linalg.det(linear)))
+        angle = -math.degrees(math.atan2(linear[1, 0], linear[0, 0]))
+        
+        return DetectionResult(
+            found=True,
+            x=int(x),
+            y=int(y),
+            width=int(right - x),
+            height=int(bottom - y),
+            confidence=inlier_count / len(good),
+            name=template.path.name,
+            scale=scale,
+            angle=angle
+        )
@@ -0,0 +1,412 @@
+"""
+Bus de capturas en memoria compartida.
+
+Un proceso (tools/frame_bus.py) captura la pantalla y publica cada captura
+en el bus; cualquier cantidad de procesos (main.py, identify_pixels.py,
+varias ImageClickAutomation) las leen como vistas de NumPy sobre la misma
+memoria, sin copiarlas. Así se captura una sola vez por ciclo sin importar
+cuántos procesos miren la pantalla.
+
+La memoria tiene un encabezado, una tabla con el estado de cada captura y
+varias capturas (slots) que se usan por turno. Cada slot lleva un contador
+de secuencia (seqlock): el productor lo incrementa antes de escribir
+(queda impar) y después (queda par). Un lector toma el último slot
+publicado solo si el contador es par, y la vista sigue siendo válida
+mientras el contador no cambie: el productor escribe siempre en el slot
+siguiente, así que eso da bus_slots - 1 publicaciones de margen.
+
+Formato de la memoria:
+    encabezado | tabla de slots | captura 0 | captura 1 | ...
+"""
+import os
+import time
+import numpy as np
+from multiprocessing import shared_memory
+from dataclasses import dataclass
+from typing import Optional, Union
+
+from config.settings import CAPTURE_CONFIG
+from core.frame_source import FrameSource, Region
+
+
+MAGIC = b"ICBUS\x00\x00\x01"
+
+HEADER_DTYPE = np.dtype([
+    ("magic", "S8"),
+    ("slots", "<u4"),
+    ("x", "<i4"),
+    ("y", "<i4"),
+    ("width", "<u4"),
+    ("height", "<u4"),
+    ("closed", "<u4"),   # 1 cuando el productor terminó
+    ("latest", "<u8"),   # Número de la última captura publicada (0 = ninguna)
+])
+
+SLOT_DTYPE = np.dtype([
+    ("seq", "<u8"),        # Seqlock: impar mientras el productor escribe
+    ("number", "<u8"),     # Número de captura que contiene el slot
+    ("timestamp", "<f8"),  # time.perf_counter() del productor al publicarla
+])
+
+_ALIGN = 64
+
+# Reintentos de read() mientras el productor escribe el slot pedido
+READ_RETRIES = 100
+
+
+def _aligned(size: int) -> int:
+    """Redondea size al próximo múltiplo de _ALIGN."""
+    return -(-size // _ALIGN) * _ALIGN
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Abre la memoria de un bus existente sin adueñarse de ella."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13: el resource_tracker del lector la borraría al salir.
+        # Un proceso hijo del productor comparte su tracker: debe usar el
+        # FrameBus heredado en lugar de attach
+        shm = shared_memory.SharedMemory(name=name)
+        if os.name == "posix":  # Windows no usa resource_tracker para la memoria compartida
+            from multiprocessing import resource_tracker
+            # El tracker registra el nombre con la barra inicial que shm.name omite
+            resource_tracker.unregister("/" + shm.name, "shared_memory")
+        return shm
+
+
+@dataclass
+class BusFrame:
+    """Captura leída del bus (la imagen es una vista sobre la memoria compartida)."""
+    image: np.ndarray
+    number: int       # Número de captura (crece de a uno por publicación)
+    timestamp: float  # time.perf_counter() del productor al publicarla
+    slot: int
+    seq: int
+
+
+class FrameBus:
+    """
+    Memoria compartida con las últimas capturas de una región.
+    
+    El proceso que la crea (FrameBus.create) es el único que publica; los
+    demás la abren con FrameBus.attach y leen.
+    """
+    
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+        """
+        Usar FrameBus.create o FrameBus.attach.
+        
+        Args:
+            shm: Memoria compartida del bus
+            owner: True en el productor (la borra al cerrar)
+        """
+        self._shm = shm
+        self.owner = owner
+        self._header = np.ndarray((), dtype=HEADER_DTYPE, buffer=shm.buf)
+        if bytes(self._header["magic"]) != MAGIC:
+            shm.close()
+            raise ValueError(f"'{shm.name}' no es un bus de capturas")
+        
+        self.slots = int(self._header["slots"])
+        self.region: Region = (
+            int(self._header["x"]), int(self._header["y"]),
+            int(self._header["width"]), int(self._header["height"])
+        )
+        _, _, width, height = self.region
+        
+        table = _aligned(HEADER_DTYPE.itemsize)
+        self._table = np.ndarray((self.slots,), dtype=SLOT_DTYPE, buffer=shm.buf, offset=table)
+        self._frames = np.ndarray(
+            (self.slots, height, width, 3), dtype=np.uint8, buffer=shm.buf,
+            offset=table + _aligned(SLOT_DTYPE.itemsize * self.slots)
+        )
+    
+    @classmethod
+    def create(cls, region: Region, name: str = None, slots: int = None) -> "FrameBus":
+        """
+        Crea el bus (productor).
+        
+        Args:
+            region: Región de pantalla que se va a publicar (x, y, width, height)
+            name: Nombre de la memoria compartida (por defecto CAPTURE_CONFIG["bus_name"])
+            slots: Capturas en el bus (mínimo 2)
+        
+        Returns:
+            FrameBus listo para publicar
+        """
+        name = name or CAPTURE_CONFIG["bus_name"]
+        slots = slots or CAPTURE_CONFIG["bus_slots"]
+        if slots < 2:
+            raise ValueError("El bus necesita al menos 2 slots")
+        x, y, width, height = (int(v) for v in region)
+        if width <= 0 or height <= 0:
+            raise ValueError(f"Región inválida: {region}")
+        
+        size = (
+            _aligned(HEADER_DTYPE.itemsize) + _aligned(SLOT_DTYPE.itemsize * slots)
+            + slots * width * height * 3
+        )
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        header = np.ndarray((), dtype=HEADER_DTYPE, buffer=shm.buf)
+        header[()] = (MAGIC, slots, x, y, width, height, 0, 0)
+        del header
+        return cls(shm, owner=True)
+    
+    @classmethod
+    def attach(cls, name: str = None) -> "FrameBus":
+        """
+        Abre un bus creado por otro proceso (lector).
+        
+        Args:
+            name: Nombre de la memoria compartida (por defecto CAPTURE_CONFIG["bus_name"])
+        
+        Returns:
+            FrameBus para leer
+        """
+        name = name or CAPTURE_CONFIG["bus_name"]
+        try:
+            shm = _attach(name)
+        except FileNotFoundError:
+            raise FileNotFoundError(
+                f"No hay un bus de capturas '{name}' (¿está corriendo tools/frame_bus.py?)"
+            ) from None
+        return cls(shm, owner=False)
+    
+    @property
+    def name(self) -> str:
+        return self._shm.name
+    
+    @property
+    def latest(self) -> int:
+        """Número de la última captura publicada (0 = ninguna)."""
+        return int(self._header["latest"])
+    
+    @property
+    def closed(self) -> bool:
+        """True si el productor cerró el bus."""
+        return bool(self._header["closed"])
+    
+    def publish(self, frame: np.ndarray, timestamp: float = None) -> int:
+        """
+        Publica una captura (copiándola al bus).
+        
+        Args:
+            frame: Captura BGR de la región del bus
+            timestamp: Instante de la captura (por defecto, ahora)
+        
+        Returns:
+            Número de la captura publicada
+        """
+        return self._write(lambda out: np.copyto(out, frame), timestamp)
+    
+    def capture(self, source: FrameSource) -> int:
+        """
+        Captura con source directamente en el bus, sin copias intermedias.
+        
+        Args:
+            source: Fuente de captura configurada con la región del bus
+        
+        Returns:
+            Número de la captura publicada
+        """
+        return self._write(source.grab_into)
+    
+    def read(self, after: int = 0) -> Optional[BusFrame]:
+        """
+        Retorna la última captura publicada, sin copiarla.
+        
+        La vista se puede usar mientras valid(frame) sea True, es decir
+        hasta bus_slots - 1 publicaciones más.
+        
+        Si el productor está sobrescribiendo el slot (dio la vuelta mientras se
+        leía), se reintenta cediendo el procesador hasta READ_RETRIES veces.
+        
+        Args:
+            after: Retornar solo una captura con número mayor que este
+        
+        Returns:
+            BusFrame, o None si todavía no hay una captura nueva (o no se pudo
+            leer una completa)
+        """
+        for _ in range(READ_RETRIES):
+            number = self.latest
+            if number == 0 or number <= after:
+                return None
+            
+            slot = number % self.slots
+            seq = int(self._table["seq"][slot])
+            if seq % 2 == 0 and int(self._table["number"][slot]) == number:
+                timestamp = float(self._table["timestamp"][slot])
+                if int(self._table["seq"][slot]) == seq:
+                    return BusFrame(self._frames[slot], number, timestamp, slot, seq)
+            # El productor dio la vuelta y está escribiendo ese slot: leer de nuevo
+            time.sleep(0)
+        return None
+    
+    def wait(self, after: int = 0, timeout: float = None) -> Optional[BusFrame]:
+        """
+        Espera una captura con número mayor que after.
+        
+        Args:
+            after: Número de la última captura leída
+            timeout: Segundos máximos de espera (por defecto CAPTURE_CONFIG["bus_timeout"])
+        
+        Returns:
+            BusFrame, o None si no llegó ninguna a tiempo o el bus se cerró
+        """
+        timeout = timeout if timeout is not None else CAPTURE_CONFIG["bus_timeout"]
+        poll = CAPTURE_CONFIG["bus_poll"]
+        deadline = time.perf_counter() + timeout
+        while True:
+            frame = self.read(after)
+            if frame is not None or self.closed or time.perf_counter() >= deadline:
+                return frame
+            time.sleep(poll)
+    
+    def valid(self, frame: BusFrame) -> bool:
+        """True si el productor todavía no sobrescribió la captura."""
+        return int(self._table["seq"][frame.slot]) == frame.seq
+    
+    def close(self) -> None:
+        """Cierra el bus; en el productor además borra la memoria compartida."""
+        if self._shm is None:
+            return
+        if self.owner:
+            self._header["closed"] = 1
+        
+        self._header = self._table = self._frames = None
+        shm, self._shm = self._shm, None
+        try:
+            shm.close()
+        except BufferError:
+            pass  # Quedan vistas de capturas en uso; se libera cuando no quede ninguna
+        if self.owner:
+            shm.unlink()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def _write(self, fill, timestamp: float = None) -> int:
+        """Escribe la próxima captura con fill(out) siguiendo el seqlock."""
+        number = self.latest + 1
+        slot = number % self.slots
+        
+        self._table["seq"][slot] += 1  # Impar: escribiendo
+        fill(self._frames[slot])
+        self._table["number"][slot] = number
+        self._table["timestamp"][slot] = timestamp if timestamp is not None else time.perf_counter()
+        self._table["seq"][slot] += 1  # Par: lista
+        
+        self._header["latest"] = number
+        return number
+
+
+class BusFrameSource(FrameSource):
+    """
+    Fuente que lee las capturas publicadas en un FrameBus.
+    
+    Se usa en lugar de una fuente de pantalla (CAPTURE_CONFIG["backend"] =
+    "bus"). grab() espera una captura más nueva que la anterior y retorna
+    una vista recortada a la región, sin copiarla; con copy=True la copia
+    al buffer propio (para conservarla más de bus_slots - 1 publicaciones).
+    """
+    
+    name = "bus"
+    
+    def __init__(
+        self,
+        bus: Union[str, FrameBus] = None,
+        region: Optional[Region] = None,
+        copy: bool = False,
+        timeout: float = None
+    ):
+        """
+        Inicializa la fuente.
+        
+        Args:
+            bus: FrameBus abierto o nombre del bus (por defecto CAPTURE_CONFIG["bus_name"])
+            region: Región a recortar, o None para toda la región del bus
+            copy: Copiar cada captura al buffer de la fuente en lugar de dar una vista
+            timeout: Segundos máximos de espera de una captura nueva; si no
+                     llega, se repite la última
+        """
+        self.bus = bus if isinstance(bus, FrameBus) else FrameBus.attach(bus)
+        self._owns_bus = not isinstance(bus, FrameBus)
+        self.copy = copy
+        self.timeout = timeout
+        self.last: Optional[BusFrame] = None
+        self.frames_missed = 0  # Capturas publicadas que esta fuente no llegó a leer
+        super().__init__(region)
+    
+    def set_region(self, region: Optional[Region]) -> None:
+        region = tuple(int(v) for v in region) if region else self.bus.region
+        bus_x, bus_y, bus_w, bus_h = self.bus.region
+        x, y, width, height = region
+        if (width <= 0 or height <= 0 or x < bus_x or y < bus_y
+                or x + width > bus_x + bus_w or y + height > bus_y + bus_h):
+            raise ValueError(f"La región {region} está fuera del bus {self.bus.region}")
+        
+        if self.copy:
+            super().set_region(region)
+        else:
+            self._region = region  # Sin buffer propio: se entregan vistas del bus
+    
+    def grab(self) -> np.ndarray:
+        """
+        Retorna la captura más nueva del bus, recortada a la región.
+        
+        Sin copy, el array es una vista de la memoria compartida: vale hasta
+        bus_slots - 1 publicaciones más (ver valid).
+        
+        Returns:
+            Captura BGR de forma (height, width, 3)
+        """
+        after = self.last.number if self.last else 0
+        while True:
+            frame = self.bus.wait(after, self.timeout)
+            if frame is None:
+                frame = self.bus.read()  # Sin capturas nuevas: se repite la última
+            if frame is None:
+                raise TimeoutError(f"El bus '{self.bus.name}' no publicó ninguna captura")
+            
+            view = self._crop(frame.image, self._region)
+            if self.copy:
+                np.copyto(self._frame, view)
+                if not self.bus.valid(frame):
+                    continue  # Se sobrescribió mientras se copiaba
+                view = self._frame
+            break
+        
+        if self.last is not None and frame.number > self.last.number + 1:
+            self.frames_missed += frame.number - self.last.number - 1
+        self.last = frame
+        self.frames_captured += 1
+        return view
+    
+    def valid(self) -> bool:
+        """True si la última captura entregada todavía no se sobrescribió."""
+        return self.copy or (self.last is not None and self.bus.valid(self.last))
+    
+    def close(self) -> None:
+        self.last = None
+        if self._owns_bus:
+            self.bus.close()
+    
+    def _crop(self, image: np.ndarray, region: Region) -> np.ndarray:
+        """Vista de region (en coordenadas de pantalla) dentro de una captura del bus."""
+        x, y, width, height = region
+        left, top = x - self.bus.region[0], y - self.bus.region[1]
+        return image[top:top + height, left:left + width]
+    
+    def _capture(self, region: Region, out: np.ndarray) -> None:
+        frame = self.bus.read()
+        if frame is None:
+            raise TimeoutError(f"El bus '{self.bus.name}' no publicó ninguna captura")
+        np.copyto(out, self._crop(frame.image, region))
+    
+    def _screen_region(self) -> Region:
+        return self.bus.region
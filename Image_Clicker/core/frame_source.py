@@ -0,0 +1,345 @@
+"""
+Fuentes de captura de pantalla.
+
+Todas las fuentes escriben en un único buffer de NumPy reservado de antemano
+para la región configurada, en formato BGR (el nativo de OpenCV). Los
+detectores consumen las capturas desde una fuente en lugar de capturar la
+pantalla cada uno por su cuenta.
+"""
+import cv2
+import numpy as np
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+from config.settings import CAPTURE_CONFIG
+from core.window import WindowWatcher
+
+
+Region = Tuple[int, int, int, int]  # (x, y, width, height)
+
+
+class FrameSource:
+    """Interfaz común de las fuentes de captura."""
+    
+    name = "base"
+    
+    def __init__(self, region: Optional[Region] = None):
+        """
+        Inicializa la fuente.
+        
+        Args:
+            region: Región de la pantalla a capturar (x, y, width, height)
+                    o None para la pantalla completa
+        """
+        self._region: Optional[Region] = None
+        self._buffer = np.empty(0, dtype=np.uint8)
+        self._frame: Optional[np.ndarray] = None
+        self.frames_captured = 0
+        self.set_region(region)
+    
+    @property
+    def region(self) -> Region:
+        """Región capturada actualmente."""
+        return self._region
+    
+    def set_region(self, region: Optional[Region]) -> None:
+        """
+        Cambia la región a capturar.
+        
+        El buffer solo se reserva de nuevo si la región no entra en el actual.
+        
+        Args:
+            region: Nueva región (x, y, width, height) o None para pantalla completa
+        """
+        region = tuple(int(v) for v in region) if region else self._screen_region()
+        if region == self._region:
+            return
+        
+        _, _, width, height = region
+        if width <= 0 or height <= 0:
+            raise ValueError(f"Región inválida: {region}")
+        
+        size = width * height * 3
+        if self._buffer.size < size:
+            self._buffer = np.empty(size, dtype=np.uint8)
+        
+        self._frame = self._buffer[:size].reshape(height, width, 3)
+        self._region = region
+    
+    def grab(self) -> np.ndarray:
+        """
+        Captura la región configurada.
+        
+        El array retornado es el buffer interno de la fuente: se sobrescribe
+        en la próxima captura, así que hay que copiarlo si se quiere conservar.
+        
+        Returns:
+            Captura BGR de forma (height, width, 3)
+        """
+        self._capture(self._region, self._frame)
+        self.frames_captured += 1
+        return self._frame
+    
+    def grab_into(self, out: np.ndarray) -> np.ndarray:
+        """
+        Captura la región configurada directamente en out, sin pasar por el
+        buffer interno (lo usa el bus de capturas para escribir en la
+        memoria compartida).
+        
+        Args:
+            out: Array BGR de forma (height, width, 3) de la región
+        
+        Returns:
+            out
+        """
+        _, _, width, height = self._region
+        if out.shape != (height, width, 3):
+            raise ValueError(f"Forma {out.shape} distinta de la región {self._region}")
+        self._capture(self._region, out)
+        self.frames_captured += 1
+        return out
+    
+    def close(self) -> None:
+        """Libera los recursos de la fuente."""
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def _capture(self, region: Region, out: np.ndarray) -> None:
+        """Escribe la captura de region en out (BGR)."""
+        raise NotImplementedError
+    
+    def _screen_region(self) -> Region:
+        """Región de la pantalla completa."""
+        raise NotImplementedError
+
+
+class MssFrameSource(FrameSource):
+    """
+    Captura con mss (BitBlt en Windows, XGetImage en Linux).
+    
+    Una instancia de mss no se puede compartir entre hilos: cada hilo
+    que capture debe tener su propia fuente.
+    """
+    
+    name = "mss"
+    
+    def __init__(self, region: Optional[Region] = None):
+        import mss
+        self._sct = mss.mss()
+        super().__init__(region)
+    
+    def _capture(self, region: Region, out: np.ndarray) -> None:
+        x, y, width, height = region
+        shot = self._sct.grab({"left": x, "top": y, "width": width, "height": height})
+        bgra = np.frombuffer(shot.raw, dtype=np.uint8).reshape(height, width, 4)
+        np.copyto(out, bgra[:, :, :3])
+    
+    def _screen_region(self) -> Region:
+        monitor = self._sct.monitors[0]  # Todos los monitores juntos
+        return (monitor["left"], monitor["top"], monitor["width"], monitor["height"])
+    
+    def close(self) -> None:
+        self._sct.close()
+
+
+class PyAutoGuiFrameSource(FrameSource):
+    """Captura con pyautogui.screenshot (alternativa si mss no está instalado)."""
+    
+    name = "pyautogui"
+    
+    def __init__(self, region: Optional[Region] = None):
+        import pyautogui
+        self._pyautogui = pyautogui
+        super().__init__(region)
+    
+    def _capture(self, region: Region, out: np.ndarray) -> None:
+        rgb = np.asarray(self._pyautogui.screenshot(region=region))
+        np.copyto(out, rgb[:, :, 2::-1])  # RGB(A) -> BGR
+    
+    def _screen_region(self) -> Region:
+        width, height = self._pyautogui.size()
+        return (0, 0, width, height)
+
+
+class SyntheticFrameSource(FrameSource):
+    """
+    Fuente que reproduce imágenes en memoria o desde archivos.
+    
+    Cada imagen representa la pantalla completa (con su esquina superior
+    izquierda en origin); la región configurada se recorta de ella. Sirve
+    para pruebas y benchmarks sin pantalla.
+    """
+    
+    name = "synthetic"
+    
+    def __init__(
+        self,
+        frames: Sequence[np.ndarray],
+        region: Optional[Region] = None,
+        origin: Tuple[int, int] = (0, 0),
+        loop: bool = True
+    ):
+        """
+        Inicializa la fuente.
+        
+        Args:
+            frames: Imágenes BGR (o escala de grises) de la pantalla completa
+            region: Región a recortar, o None para la imagen completa
+            origin: Coordenadas de pantalla de la esquina de las imágenes
+            loop: Si volver a la primera imagen al terminar; si no, se repite la última
+        """
+        if not frames:
+            raise ValueError("Se necesita al menos una imagen")
+        
+        self._frames: List[np.ndarray] = [
+            cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR) if frame.ndim == 2
+            else np.ascontiguousarray(frame[:, :, :3])
+            for frame in frames
+        ]
+        self.origin = origin
+        self.loop = loop
+        self.index = 0
+        super().__init__(region)
+    
+    @classmethod
+    def from_files(cls, paths: Sequence[Path], **kwargs) -> "SyntheticFrameSource":
+        """
+        Crea la fuente a partir de imágenes en disco.
+        
+        Args:
+            paths: Rutas de las imágenes, en orden de reproducción
+        
+        Returns:
+            SyntheticFrameSource con las imágenes cargadas
+        """
+        frames = []
+        for path in paths:
+            frame = cv2.imread(str(path), cv2.IMREAD_COLOR)
+            if frame is None:
+                raise FileNotFoundError(f"Imagen no encontrada: {path}")
+            frames.append(frame)
+        return cls(frames, **kwargs)
+    
+    @property
+    def exhausted(self) -> bool:
+        """True si ya se entregó la última imagen y no hay loop."""
+        return not self.loop and self.index >= len(self._frames)
+    
+    def _capture(self, region: Region, out: np.ndarray) -> None:
+        frame = self._frames[min(self.index, len(self._frames) - 1)]
+        self.index += 1
+        if self.loop and self.index >= len(self._frames):
+            self.index = 0
+        
+        x, y, width, height = region
+        left, top = x - self.origin[0], y - self.origin[1]
+        crop = frame[max(top, 0):top + height, max(left, 0):left + width]
+        if left < 0 or top < 0 or crop.shape[:2] != (height, width):
+            raise ValueError(f"La región {region} está fuera de la imagen sintética")
+        
+        np.copyto(out, crop)
+    
+    def _screen_region(self) -> Region:
+        height, width = self._frames[0].shape[:2]
+        return (self.origin[0], self.origin[1], width, height)
+
+
+class WindowFrameSource(FrameSource):
+    """
+    Fuente con coordenadas relativas a una ventana.
+    
+    La región se expresa relativa al área seguida por un WindowWatcher (el
+    área cliente, por defecto); en cada captura se suma la posición actual
+    de la ventana y se captura con otra fuente. Las regiones, ROI y
+    resultados de los detectores que usan esta fuente quedan relativos a
+    la ventana, así que siguen valiendo si la ventana se mueve. Si la
+    ventana se achica, la parte de la región que queda afuera se entrega
+    en negro.
+    """
+    
+    name = "window"
+    
+    def __init__(
+        self,
+        window: WindowWatcher,
+        region: Optional[Region] = None,
+        source: FrameSource = None
+    ):
+        """
+        Inicializa la fuente.
+        
+        Args:
+            window: Seguimiento de la ventana (origen de las coordenadas)
+            region: Región relativa a la ventana, o None para toda la ventana
+            source: Fuente que captura la pantalla (por defecto create_frame_source())
+        """
+        self.window = window
+        screen = window.region.as_tuple() if window.region else None
+        if screen is None:
+            raise ValueError(f"No se encontró la ventana '{window.title}'")
+        self.source = source or create_frame_source(region=screen)
+        super().__init__(region)
+    
+    def close(self) -> None:
+        self.source.close()
+    
+    def _capture(self, region: Region, out: np.ndarray) -> None:
+        self.window.poll()
+        window = self.window.region
+        x, y, width, height = region
+        
+        # Si la ventana se achicó, se captura solo lo que queda adentro y el resto va en negro
+        left, top = max(x, 0), max(y, 0)
+        right, bottom = min(x + width, window.width), min(y + height, window.height)
+        if (left, top, right, bottom) == (x, y, x + width, y + height):
+            self.source.set_region(window.region_to_screen(region))
+            self.source.grab_into(out)
+            return
+        
+        out.fill(0)
+        if right > left and bottom > top:
+            self.source.set_region(window.region_to_screen((left, top, right - left, bottom - top)))
+            self.source.grab_into(out[top - y:bottom - y, left - x:right - x])
+    
+    def _screen_region(self) -> Region:
+        return (0, 0, self.window.region.width, self.window.region.height)
+
+
+_BACKENDS = {
+    MssFrameSource.name: MssFrameSource,
+    PyAutoGuiFrameSource.name: PyAutoGuiFrameSource,
+}
+
+
+def create_frame_source(backend: str = None, region: Optional[Region] = None) -> FrameSource:
+    """
+    Crea una fuente de captura de pantalla.
+    
+    Args:
+        backend: "mss", "pyautogui", "bus" (capturas de otro proceso) o
+                 "auto" (mss si está instalado)
+        region: Región a capturar, o None para la pantalla completa
+    
+    Returns:
+        Instancia de la fuente
+    """
+    backend = backend or CAPTURE_CONFIG["backend"]
+    
+    if backend == "bus":
+        # Capturas publicadas por otro proceso (ver core/frame_bus.py)
+        from core.frame_bus import BusFrameSource
+        return BusFrameSource(CAPTURE_CONFIG["bus_name"], region)
+    
+    if backend == "auto":
+        try:
+            return MssFrameSource(region)
+        except ImportError:
+            return PyAutoGuiFrameSource(region)
+    
+    if backend not in _BACKENDS:
+        raise ValueError(f"Fuente de captura desconocida: {backend}")
+    return _BACKENDS[backend](region)
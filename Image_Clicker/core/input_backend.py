@@ -0,0 +1,306 @@
+"""
+Backends de entrada (mouse).
+
+MouseController no llama a pyautogui directamente sino a un backend:
+
+    pyautogui  -> el de siempre; funciona en cualquier sistema con pantalla
+    win32      -> SendInput de Windows vía ctypes: mueve y hace clic en una
+                  sola llamada, sin los chequeos ni pausas internas de pyautogui
+                  (su failsafe solo mira la esquina superior izquierda)
+    record     -> no toca el mouse; guarda los eventos con su instante (pruebas,
+                  benchmarks y Linux sin pantalla)
+"""
+import ctypes
+import sys
+import time
+from typing import List, Optional, Tuple
+from dataclasses import dataclass
+
+from config.settings import BEHAVIOR_CONFIG
+
+
+Point = Tuple[int, int]
+
+
+class InputBackend:
+    """Interfaz común de los backends de entrada."""
+    
+    name = "base"
+    
+    def position(self) -> Point:
+        """Posición actual del mouse."""
+        raise NotImplementedError
+    
+    def screen_size(self) -> Tuple[int, int]:
+        """Tamaño de la pantalla."""
+        raise NotImplementedError
+    
+    def move(self, x: int, y: int, duration: float = 0.0) -> None:
+        """Mueve el mouse (en duration segundos; 0 = instantáneo)."""
+        raise NotImplementedError
+    
+    def press(self, button: str = "left") -> None:
+        """Aprieta un botón ("left", "right" o "middle")."""
+        raise NotImplementedError
+    
+    def release(self, button: str = "left") -> None:
+        """Suelta un botón."""
+        raise NotImplementedError
+    
+    def click(
+        self,
+        x: Optional[int] = None,
+        y: Optional[int] = None,
+        button: str = "left",
+        clicks: int = 1,
+        duration: float = 0.0
+    ) -> None:
+        """
+        Hace clic.
+        
+        Args:
+            x: Coordenada X, o None para hacer clic donde está el mouse
+            y: Coordenada Y, o None para hacer clic donde está el mouse
+            button: "left", "right" o "middle"
+            clicks: Número de clics
+            duration: Duración del movimiento previo
+        """
+        if x is not None and y is not None:
+            self.move(x, y, duration)
+        for _ in range(clicks):
+            self.press(button)
+            self.release(button)
+
+
+class PyAutoGuiInputBackend(InputBackend):
+    """Entrada con pyautogui (comportamiento anterior de MouseController)."""
+    
+    name = "pyautogui"
+    
+    def __init__(self):
+        import pyautogui
+        self._pyautogui = pyautogui
+        
+        # Configuración de seguridad de pyautogui
+        pyautogui.FAILSAFE = True  # Mover mouse a esquina superior izquierda para abortar
+        pyautogui.PAUSE = 0.0      # Sin pausa - máxima velocidad
+    
+    def position(self) -> Point:
+        return tuple(self._pyautogui.position())
+    
+    def screen_size(self) -> Tuple[int, int]:
+        return tuple(self._pyautogui.size())
+    
+    def move(self, x: int, y: int, duration: float = 0.0) -> None:
+        self._pyautogui.moveTo(x, y, duration=duration)
+    
+    def press(self, button: str = "left") -> None:
+        self._pyautogui.mouseDown(button=button)
+    
+    def release(self, button: str = "left") -> None:
+        self._pyautogui.mouseUp(button=button)
+    
+    def click(
+        self,
+        x: Optional[int] = None,
+        y: Optional[int] = None,
+        button: str = "left",
+        clicks: int = 1,
+        duration: float = 0.0
+    ) -> None:
+        self._pyautogui.click(x, y, button=button, clicks=clicks, duration=duration)
+
+
+class _POINT(ctypes.Structure):
+    _fields_ = [("x", ctypes.c_int32), ("y", ctypes.c_int32)]
+
+
+class _MOUSEINPUT(ctypes.Structure):
+    _fields_ = [
+        ("dx", ctypes.c_int32),
+        ("dy", ctypes.c_int32),
+        ("mouseData", ctypes.c_uint32),
+        ("dwFlags", ctypes.c_uint32),
+        ("time", ctypes.c_uint32),
+        ("dwExtraInfo", ctypes.c_size_t),
+    ]
+
+
+class _INPUT(ctypes.Structure):
+    # MOUSEINPUT es el miembro más grande de la unión de INPUT
+    _fields_ = [("type", ctypes.c_uint32), ("mi", _MOUSEINPUT)]
+
+
+_INPUT_MOUSE = 0
+_BUTTON_FLAGS = {
+    "left": (0x0002, 0x0004),    # MOUSEEVENTF_LEFTDOWN, LEFTUP
+    "right": (0x0008, 0x0010),   # MOUSEEVENTF_RIGHTDOWN, RIGHTUP
+    "middle": (0x0020, 0x0040),  # MOUSEEVENTF_MIDDLEDOWN, MIDDLEUP
+}
+
+
+class Win32InputBackend(InputBackend):
+    """
+    Entrada con SendInput de Windows.
+    
+    Todos los eventos de un clic (apretar y soltar, por cada clic) se envían
+    en una sola llamada, así el juego los recibe juntos.
+    """
+    
+    name = "win32"
+    
+    def __init__(self, failsafe: bool = True):
+        """
+        Inicializa el backend.
+        
+        Args:
+            failsafe: Abortar (RuntimeError) si el mouse está en la esquina
+                      superior izquierda, como pyautogui.FAILSAFE
+        """
+        if sys.platform != "win32":
+            raise OSError("El backend win32 solo está disponible en Windows")
+        self._user32 = ctypes.windll.user32
+        self.failsafe = failsafe
+    
+    def position(self) -> Point:
+        point = _POINT()
+        self._user32.GetCursorPos(ctypes.byref(point))
+        return (point.x, point.y)
+    
+    def screen_size(self) -> Tuple[int, int]:
+        return (self._user32.GetSystemMetrics(0), self._user32.GetSystemMetrics(1))
+    
+    def move(self, x: int, y: int, duration: float = 0.0) -> None:
+        self._check_failsafe()
+        if duration > 0:
+            # Movimiento lineal en pasos de ~10ms
+            start_x, start_y = self.position()
+            steps = max(int(duration / 0.01), 1)
+            for step in range(1, steps):
+                self._user32.SetCursorPos(
+                    start_x + (x - start_x) * step // steps,
+                    start_y + (y - start_y) * step // steps
+                )
+                time.sleep(duration / steps)
+        self._user32.SetCursorPos(int(x), int(y))
+    
+    def press(self, button: str = "left") -> None:
+        self._send([_BUTTON_FLAGS[button][0]])
+    
+    def release(self, button: str = "left") -> None:
+        self._send([_BUTTON_FLAGS[button][1]])
+    
+    def click(
+        self,
+        x: Optional[int] = None,
+        y: Optional[int] = None,
+        button: str = "left",
+        clicks: int = 1,
+        duration: float = 0.0
+    ) -> None:
+        if x is not None and y is not None:
+            self.move(x, y, duration)
+        else:
+            self._check_failsafe()
+        self._send(list(_BUTTON_FLAGS[button]) * clicks)
+    
+    def _send(self, flags: List[int]) -> None:
+        inputs = (_INPUT * len(flags))(*(
+            _INPUT(type=_INPUT_MOUSE, mi=_MOUSEINPUT(dwFlags=flag)) for flag in flags
+        ))
+        sent = self._user32.SendInput(len(flags), inputs, ctypes.sizeof(_INPUT))
+        if sent != len(flags):
+            raise OSError(f"SendInput envió {sent} de {len(flags)} eventos")
+    
+    def _check_failsafe(self) -> None:
+        if self.failsafe and self.position() == (0, 0):
+            raise RuntimeError("Failsafe: mouse en la esquina superior izquierda")
+
+
+@dataclass
+class InputEvent:
+    """Evento registrado por RecordingInputBackend."""
+    kind: str  # "move", "press" o "release"
+    x: int
+    y: int
+    button: Optional[str] = None
+    timestamp: float = 0.0  # time.perf_counter() al enviarse
+
+
+class RecordingInputBackend(InputBackend):
+    """Backend que no mueve el mouse: solo registra los eventos."""
+    
+    name = "record"
+    
+    def __init__(self, screen_size: Tuple[int, int] = (1920, 1080), position: Point = (0, 0)):
+        """
+        Inicializa el backend.
+        
+        Args:
+            screen_size: Tamaño de pantalla a reportar
+            position: Posición inicial del mouse
+        """
+        self._screen_size = screen_size
+        self._position = position
+        self.events: List[InputEvent] = []
+    
+    @property
+    def clicks(self) -> List[InputEvent]:
+        """Eventos de soltar botón (uno por clic completo)."""
+        return [event for event in self.events if event.kind == "release"]
+    
+    def position(self) -> Point:
+        return self._position
+    
+    def screen_size(self) -> Tuple[int, int]:
+        return self._screen_size
+    
+    def move(self, x: int, y: int, duration: float = 0.0) -> None:
+        self._position = (int(x), int(y))
+        self._record("move")
+    
+    def press(self, button: str = "left") -> None:
+        self._record("press", button)
+    
+    def release(self, button: str = "left") -> None:
+        self._record("release", button)
+    
+    def clear(self) -> None:
+        """Borra los eventos registrados."""
+        self.events.clear()
+    
+    def _record(self, kind: str, button: str = None) -> None:
+        x, y = self._position
+        self.events.append(InputEvent(kind, x, y, button, time.perf_counter()))
+
+
+_BACKENDS = {
+    PyAutoGuiInputBackend.name: PyAutoGuiInputBackend,
+    Win32InputBackend.name: Win32InputBackend,
+    RecordingInputBackend.name: RecordingInputBackend,
+}
+
+
+def create_input_backend(backend: str = None) -> InputBackend:
+    """
+    Crea un backend de entrada.
+    
+    Args:
+        backend: "pyautogui", "win32", "record" o "auto" (win32 en Windows,
+                 pyautogui en el resto). Por defecto BEHAVIOR_CONFIG["input_backend"],
+                 que es pyautogui; win32 y auto hay que pedirlos
+    
+    Returns:
+        Instancia del backend
+    """
+    backend = backend or BEHAVIOR_CONFIG["input_backend"]
+    
+    if backend == "auto":
+        try:
+            return Win32InputBackend()
+        except OSError:
+            return PyAutoGuiInputBackend()
+    
+    if backend not in _BACKENDS:
+        raise ValueError(f"Backend de entrada desconocido: {backend}")
+    return _BACKENDS[backend]()
@@ -0,0 +1,531 @@
+"""
+Motores de búsqueda de imágenes (template matching).
+
+Cada motor recibe una captura como array de NumPy y la imagen a buscar ya
+preprocesada, y devuelve la posición del mejor resultado dentro de la captura.
+"""
+import cv2
+import numpy as np
+from typing import Dict, List, Optional, Sequence, Tuple
+from dataclasses import dataclass, field
+
+from config.settings import DETECTION_CONFIG
+
+
+# Métodos de OpenCV soportados. Todos se normalizan para que un valor más
+# alto signifique una mejor coincidencia (0.0 - 1.0).
+MATCH_METHODS = {
+    "TM_CCOEFF_NORMED": cv2.TM_CCOEFF_NORMED,
+    "TM_CCORR_NORMED": cv2.TM_CCORR_NORMED,
+    "TM_SQDIFF_NORMED": cv2.TM_SQDIFF_NORMED,
+}
+
+
+# Lado mínimo de la imagen buscada en el nivel reducido de la pirámide
+MIN_PYRAMID_TEMPLATE = 8
+
+
+@dataclass
+class MatchPeak:
+    """Mejor coincidencia dentro de una captura."""
+    score: float
+    x: int  # Relativo a la esquina superior izquierda de la captura
+    y: int
+    scale: float = 1.0  # Variante de la imagen que coincidió (ver TemplateVariant)
+    angle: float = 0.0
+
+
+@dataclass
+class TemplateVariant:
+    """Imagen buscada reescalada y/o rotada."""
+    scale: float
+    angle: float  # Grados, sentido antihorario
+    image: np.ndarray
+    _pyramids: Dict[int, List[np.ndarray]] = field(default_factory=dict, repr=False, compare=False)
+    
+    def pyramid(self, levels: int) -> List[np.ndarray]:
+        """Retorna la variante reducida en cada nivel de la pirámide (cacheada)."""
+        if levels not in self._pyramids:
+            self._pyramids[levels] = pyramid_levels(self.image, levels)
+        return self._pyramids[levels]
+
+
+class MatchEngine:
+    """Interfaz común de los motores de búsqueda."""
+    
+    name = "base"
+    
+    def match(
+        self,
+        frame: np.ndarray,
+        needle: np.ndarray,
+        confidence: float
+    ) -> Optional[MatchPeak]:
+        """
+        Busca la mejor coincidencia de la imagen en la captura.
+        
+        Args:
+            frame: Captura (BGR o escala de grises)
+            needle: Imagen a buscar, con los mismos canales que la captura
+            confidence: Puntaje mínimo para aceptar la coincidencia
+        
+        Returns:
+            MatchPeak con la mejor coincidencia, o None si no supera el umbral
+        """
+        raise NotImplementedError
+    
+    def match_all(
+        self,
+        frame: np.ndarray,
+        needle: np.ndarray,
+        confidence: float,
+        iou: float = None,
+        max_results: int = None
+    ) -> List[MatchPeak]:
+        """
+        Busca todas las apariciones de la imagen.
+        
+        Las coincidencias superpuestas de un mismo objeto se reducen a la de
+        mayor puntaje (non-maximum suppression).
+        
+        Args:
+            frame: Captura (BGR o escala de grises)
+            needle: Imagen a buscar
+            confidence: Puntaje mínimo
+            iou: Superposición máxima (intersección / unión) entre dos
+                 resultados (por defecto DETECTION_CONFIG["nms_iou"])
+            max_results: Máximo de resultados (None = sin límite)
+        
+        Returns:
+            Lista de MatchPeak ordenada de mayor a menor puntaje
+        """
+        raise NotImplementedError
+
+
+class OpenCVMatchEngine(MatchEngine):
+    """
+    Motor que llama a cv2.matchTemplate directamente.
+    
+    Reutiliza el buffer del mapa de puntajes entre llamadas mientras no
+    cambien los tamaños de la captura y de la imagen buscada.
+    """
+    
+    name = "opencv"
+    
+    def __init__(self, method: str = None):
+        """
+        Inicializa el motor.
+        
+        Args:
+            method: Nombre del método de OpenCV (ver MATCH_METHODS)
+        """
+        method = method or DETECTION_CONFIG["method"]
+        if method not in MATCH_METHODS:
+            raise ValueError(f"Método de búsqueda no soportado: {method}")
+        
+        self.method = method
+        self._cv_method = MATCH_METHODS[method]
+        self._buffers: Dict[Tuple[int, int], np.ndarray] = {}
+    
+    def score_map(self, frame: np.ndarray, needle: np.ndarray) -> np.ndarray:
+        """
+        Calcula el mapa de puntajes de la imagen sobre toda la captura.
+        
+        El array retornado es un buffer interno: se sobrescribe en la
+        siguiente llamada con los mismos tamaños.
+        
+        Args:
+            frame: Captura
+            needle: Imagen a buscar
+        
+        Returns:
+            Mapa float32 de tamaño (H - h + 1, W - w + 1)
+        """
+        frame_h, frame_w = frame.shape[:2]
+        needle_h, needle_w = needle.shape[:2]
+        if frame_h < needle_h or frame_w < needle_w:
+            raise ValueError("La imagen buscada es más grande que la región de búsqueda")
+        
+        shape = (frame_h - needle_h + 1, frame_w - needle_w + 1)
+        result = self._buffers.get(shape)
+        if result is None:
+            result = np.empty(shape, dtype=np.float32)
+            self._buffers[shape] = result
+        
+        cv2.matchTemplate(frame, needle, self._cv_method, result=result)
+        
+        if self._cv_method == cv2.TM_SQDIFF_NORMED:
+            # Invertir para que más alto sea mejor
+            np.subtract(1.0, result, out=result)
+        
+        return result
+    
+    def match(
+        self,
+        frame: np.ndarray,
+        needle: np.ndarray,
+        confidence: float
+    ) -> Optional[MatchPeak]:
+        result = self.score_map(frame, needle)
+        _, max_val, _, max_loc = cv2.minMaxLoc(result)
+        
+        if max_val < confidence:
+            return None
+        
+        return MatchPeak(score=float(max_val), x=max_loc[0], y=max_loc[1])
+    
+    def match_all(
+        self,
+        frame: np.ndarray,
+        needle: np.ndarray,
+        confidence: float,
+        iou: float = None,
+        max_results: int = None
+    ) -> List[MatchPeak]:
+        result = self.score_map(frame, needle)
+        xs, ys, scores = local_maxima(result, confidence)
+        
+        height, width = needle.shape[:2]
+        keep = non_max_suppression(xs, ys, scores, width, height, iou, max_results)
+        
+        return [
+            MatchPeak(score=float(scores[i]), x=int(xs[i]), y=int(ys[i]))
+            for i in keep
+        ]
+
+    def match_pyramid(
+        self,
+        pyramid: "FramePyramid",
+        needles: Sequence[np.ndarray],
+        confidence: float,
+        top_k: int = None
+    ) -> Optional[MatchPeak]:
+        """
+        Búsqueda gruesa a fina.
+        
+        Busca en el nivel más reducido de needles, toma los top_k mejores
+        candidatos y refina cada uno a resolución completa en una ventana
+        pequeña alrededor de su posición.
+        
+        Args:
+            pyramid: Pirámide de la captura
+            needles: Imagen a buscar en cada nivel (needles[0] es la original)
+            confidence: Puntaje mínimo en resolución completa
+            top_k: Candidatos a refinar (por defecto DETECTION_CONFIG["pyramid_top_k"])
+        
+        Returns:
+            MatchPeak en coordenadas de resolución completa, o None
+        """
+        top_k = top_k or DETECTION_CONFIG["pyramid_top_k"]
+        level = len(needles) - 1
+        if level == 0:
+            return self.match(pyramid.level(0), needles[0], confidence)
+        
+        coarse = self.score_map(pyramid.level(level), needles[level])
+        scale = 1 << level
+        needle_h, needle_w = needles[level].shape[:2]
+        
+        frame = pyramid.level(0)
+        frame_h, frame_w = frame.shape[:2]
+        full_h, full_w = needles[0].shape[:2]
+        margin = 2 * scale  # Error de redondeo de pyrDown en cada nivel
+        
+        best: Optional[MatchPeak] = None
+        for _ in range(top_k):
+            _, score, _, (cx, cy) = cv2.minMaxLoc(coarse)
+            if not np.isfinite(score) or score <= -1.0:
+                break
+            
+            # Suprimir el vecindario para que el próximo candidato sea otro objeto
+            coarse[
+                max(cy - needle_h // 2, 0):cy + needle_h // 2 + 1,
+                max(cx - needle_w // 2, 0):cx + needle_w // 2 + 1
+            ] = -1.0
+            
+            # Refinar en resolución completa
+            left = max(cx * scale - margin, 0)
+            top = max(cy * scale - margin, 0)
+            right = min(cx * scale + full_w + margin, frame_w)
+            bottom = min(cy * scale + full_h + margin, frame_h)
+            
+            peak = self.match(frame[top:bottom, left:right], needles[0], confidence)
+            if peak is not None and (best is None or peak.score > best.score):
+                best = MatchPeak(score=peak.score, x=left + peak.x, y=top + peak.y)
+        
+        return best
+
+
+class FramePyramid:
+    """
+    Niveles reducidos a la mitad de una captura.
+    
+    Los niveles se calculan al primer uso y se guardan en buffers que se
+    reutilizan en la siguiente captura, así varias imágenes buscadas sobre
+    la misma captura comparten la pirámide.
+    """
+    
+    def __init__(self):
+        """Inicializa la pirámide vacía."""
+        self._levels: List[np.ndarray] = []
+        self._buffers: Dict[int, np.ndarray] = {}
+    
+    def update(self, frame: np.ndarray) -> "FramePyramid":
+        """Reemplaza la captura base e invalida los niveles calculados."""
+        self._levels = [frame]
+        return self
+    
+    def level(self, n: int) -> np.ndarray:
+        """
+        Retorna el nivel n (la captura reducida 2^n veces).
+        
+        Args:
+            n: Nivel, 0 es la captura original
+        
+        Returns:
+            Array del nivel pedido
+        """
+        while len(self._levels) <= n:
+            index = len(self._levels)
+            source = self._levels[-1]
+            shape = ((source.shape[0] + 1) // 2, (source.shape[1] + 1) // 2) + source.shape[2:]
+            
+            buffer = self._buffers.get(index)
+            if buffer is None or buffer.shape != shape:
+                buffer = np.empty(shape, dtype=source.dtype)
+                self._buffers[index] = buffer
+            
+            self._levels.append(cv2.pyrDown(source, dst=buffer))
+        
+        return self._levels[n]
+
+
+def local_maxima(
+    score_map: np.ndarray,
+    confidence: float
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Extrae los máximos locales del mapa de puntajes que superan el umbral.
+    
+    Un punto es máximo local si ningún vecino (3x3) tiene mayor puntaje.
+    Alrededor de cada coincidencia el mapa forma una meseta de puntajes
+    altos; quedarse con el máximo reduce miles de posiciones a unas pocas
+    antes de la supresión.
+    
+    Args:
+        score_map: Mapa de puntajes (más alto = mejor)
+        confidence: Puntaje mínimo
+    
+    Returns:
+        (xs, ys, scores) de los máximos
+    """
+    mask = score_map >= confidence
+    if not mask.any():
+        empty = np.empty(0, dtype=np.intp)
+        return empty, empty, np.empty(0, dtype=np.float32)
+    
+    # Solo dilatar la zona que supera el umbral (más un borde para los vecinos)
+    rows = np.flatnonzero(mask.any(axis=1))
+    cols = np.flatnonzero(mask.any(axis=0))
+    top, bottom = max(rows[0] - 1, 0), rows[-1] + 2
+    left, right = max(cols[0] - 1, 0), cols[-1] + 2
+    
+    window = score_map[top:bottom, left:right]
+    peaks = (window == cv2.dilate(window, None)) & mask[top:bottom, left:right]
+    
+    ys, xs = np.nonzero(peaks)
+    scores = window[ys, xs]
+    return xs + left, ys + top, scores
+
+
+def non_max_suppression(
+    xs: np.ndarray,
+    ys: np.ndarray,
+    scores: np.ndarray,
+    width: int,
+    height: int,
+    iou: float = None,
+    max_results: int = None
+) -> np.ndarray:
+    """
+    Descarta las coincidencias que se superponen con otra de mayor puntaje.
+    
+    Todas las cajas tienen el tamaño de la imagen buscada, así que la
+    intersección se calcula solo con las distancias entre esquinas.
+    
+    Args:
+        xs, ys: Esquinas superiores izquierdas de las coincidencias
+        scores: Puntajes de las coincidencias
+        width, height: Tamaño de la imagen buscada
+        iou: Superposición máxima permitida (por defecto DETECTION_CONFIG["nms_iou"])
+        max_results: Máximo de índices a retornar (None = sin límite)
+    
+    Returns:
+        Índices de las coincidencias conservadas, de mayor a menor puntaje
+    """
+    iou = iou if iou is not None else DETECTION_CONFIG["nms_iou"]
+    max_results = max_results if max_results is not None else DETECTION_CONFIG["max_results"]
+    
+    order = np.argsort(-scores, kind="stable")
+    area = width * height
+    keep = []
+    
+    while order.size:
+        best = order[0]
+        keep.append(best)
+        if max_results and len(keep) >= max_results:
+            break
+        
+        rest = order[1:]
+        overlap_w = np.clip(width - np.abs(xs[rest] - xs[best]), 0, None)
+        overlap_h = np.clip(height - np.abs(ys[rest] - ys[best]), 0, None)
+        intersection = overlap_w * overlap_h
+        order = rest[intersection / (2 * area - intersection) <= iou]
+    
+    return np.array(keep, dtype=np.intp)
+
+
+def scaled_size(width: int, height: int, scale: float) -> Tuple[int, int]:
+    """Tamaño (ancho, alto) de una imagen reescalada."""
+    return max(int(round(width * scale)), 1), max(int(round(height * scale)), 1)
+
+
+def template_variants(
+    needle: np.ndarray,
+    scales: Sequence[float],
+    rotations: Sequence[float] = (0.0,)
+) -> List[TemplateVariant]:
+    """
+    Genera las variantes de la imagen buscada para la búsqueda multiescala.
+    
+    Las rotaciones mantienen el tamaño de la imagen y rellenan las esquinas
+    repitiendo el borde, así que sirven para ángulos chicos (unos pocos grados).
+    
+    Args:
+        needle: Imagen a buscar original
+        scales: Escalas a generar (1.0 = tamaño original)
+        rotations: Ángulos en grados a generar para cada escala
+    
+    Returns:
+        Variantes ordenadas de la más parecida a la original (escala 1.0,
+        sin rotar) a la menos parecida
+    """
+    height, width = needle.shape[:2]
+    variants = []
+    
+    for scale in scales:
+        size = scaled_size(width, height, scale)
+        if min(size) < MIN_PYRAMID_TEMPLATE:
+            continue
+        
+        interpolation = cv2.INTER_AREA if scale < 1.0 else cv2.INTER_LINEAR
+        scaled = needle if scale == 1.0 else cv2.resize(needle, size, interpolation=interpolation)
+        
+        for angle in rotations:
+            image = scaled
+            if angle:
+                center = (size[0] / 2, size[1] / 2)
+                matrix = cv2.getRotationMatrix2D(center, angle, 1.0)
+                image = cv2.warpAffine(scaled, matrix, size, borderMode=cv2.BORDER_REPLICATE)
+            variants.append(TemplateVariant(scale=float(scale), angle=float(angle), image=image))
+    
+    variants.sort(key=lambda v: (abs(np.log(v.scale)), abs(v.angle)))
+    return variants
+
+
+def pyramid_levels(needle: np.ndarray, levels: int) -> List[np.ndarray]:
+    """
+    Reduce la imagen buscada hasta levels veces.
+    
+    Se detiene antes si la imagen queda más chica que MIN_PYRAMID_TEMPLATE.
+    
+    Args:
+        needle: Imagen a buscar original
+        levels: Cantidad máxima de niveles
+    
+    Returns:
+        Lista con la imagen en cada nivel (el índice 0 es la original)
+    """
+    result = [needle]
+    for _ in range(levels):
+        smaller = cv2.pyrDown(result[-1])
+        if min(smaller.shape[:2]) < MIN_PYRAMID_TEMPLATE:
+            break
+        result.append(smaller)
+    return result
+
+
+class PyScreezeMatchEngine(MatchEngine):
+    """
+    Motor compatible con el comportamiento anterior (pyautogui/pyscreeze).
+    
+    pyscreeze no expone el puntaje obtenido, así que el score reportado es
+    el umbral pedido.
+    """
+    
+    name = "pyautogui"
+    
+    def __init__(self):
+        """Inicializa el motor."""
+        import pyscreeze
+        self._pyscreeze = pyscreeze
+    
+    def match(
+        self,
+        frame: np.ndarray,
+        needle: np.ndarray,
+        confidence: float
+    ) -> Optional[MatchPeak]:
+        for peak in self._locate(frame, needle, confidence, limit=1):
+            return peak
+        return None
+    
+    def match_all(
+        self,
+        frame: np.ndarray,
+        needle: np.ndarray,
+        confidence: float,
+        iou: float = None,
+        max_results: int = None
+    ) -> List[MatchPeak]:
+        peaks = list(self._locate(frame, needle, confidence))
+        if not peaks:
+            return []
+        
+        xs = np.array([peak.x for peak in peaks])
+        ys = np.array([peak.y for peak in peaks])
+        scores = np.array([peak.score for peak in peaks], dtype=np.float32)
+        
+        height, width = needle.shape[:2]
+        keep = non_max_suppression(xs, ys, scores, width, height, iou, max_results)
+        return [peaks[i] for i in keep]
+    
+    def _locate(self, frame, needle, confidence, limit=10000):
+        try:
+            for box in self._pyscreeze.locateAll(
+                needle, frame, confidence=confidence, limit=limit
+            ):
+                yield MatchPeak(score=confidence, x=int(box.left), y=int(box.top))
+        except self._pyscreeze.ImageNotFoundException:
+            return
+
+
+_ENGINES = {
+    OpenCVMatchEngine.name: OpenCVMatchEngine,
+    PyScreezeMatchEngine.name: PyScreezeMatchEngine,
+}
+
+
+def create_match_engine(name: str = None) -> MatchEngine:
+    """
+    Crea un motor de búsqueda por nombre.
+    
+    Args:
+        name: "opencv" o "pyautogui" (por defecto DETECTION_CONFIG["engine"])
+    
+    Returns:
+        Instancia del motor
+    """
+    name = name or DETECTION_CONFIG["engine"]
+    if name not in _ENGINES:
+        raise ValueError(f"Motor de búsqueda desconocido: {name}")
+    return _ENGINES[name]()
@@ -0,0 +1,306 @@
+"""
+Búsqueda en paralelo en varios procesos.
+
+La región se divide en bloques que se superponen en el tamaño de la imagen
+buscada (así cada posición posible cae entera en un bloque) y cada bloque
+se busca en un proceso distinto. Los procesos son persistentes y leen la
+captura de una memoria compartida: por cada escaneo solo viajan la ruta de
+la imagen y las coordenadas del bloque, nunca los píxeles.
+
+Conviene en escaneos de la ventana completa en máquinas con varios
+núcleos; en regiones chicas (como el cuadrado de main.py) el costo de
+coordinar los procesos es mayor que la búsqueda y se busca en el proceso
+principal.
+"""
+import atexit
+import math
+import os
+import multiprocessing
+import numpy as np
+from multiprocessing import shared_memory
+from multiprocessing.connection import Connection
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from config.settings import DETECTION_CONFIG
+from core.detector import DetectionResult, ImageDetector, Template
+from core.frame_source import Region
+
+
+# Resultado de un bloque: (found, x, y, width, height, confidence, scale, angle)
+TileResult = Tuple[bool, int, int, int, int, float, float, float]
+
+
+def split_tiles(
+    width: int,
+    height: int,
+    template_size: Tuple[int, int],
+    count: int
+) -> List[Region]:
+    """
+    Divide una captura en bloques para buscar una imagen en paralelo.
+    
+    Se reparten las posiciones posibles de la imagen (no los píxeles): cada
+    bloque se agranda en el tamaño de la imagen menos uno, así cada posición
+    se prueba en exactamente un bloque.
+    
+    Args:
+        width: Ancho de la captura
+        height: Alto de la captura
+        template_size: (ancho, alto) de la imagen buscada
+        count: Cantidad de bloques deseada
+    
+    Returns:
+        Bloques (x, y, width, height) relativos a la captura
+    """
+    template_w, template_h = template_size
+    positions_x = width - template_w + 1
+    positions_y = height - template_h + 1
+    if positions_x <= 0 or positions_y <= 0:
+        return []
+    
+    # Grilla con bloques lo más cuadrados posible
+    rows = max(1, min(positions_y, round(math.sqrt(count * positions_y / positions_x))))
+    cols = max(1, min(positions_x, math.ceil(count / rows)))
+    
+    xs = np.linspace(0, positions_x, cols + 1).astype(int)
+    ys = np.linspace(0, positions_y, rows + 1).astype(int)
+    return [
+        (int(x0), int(y0), int(x1 - x0) + template_w - 1, int(y1 - y0) + template_h - 1)
+        for y0, y1 in zip(ys[:-1], ys[1:])
+        for x0, x1 in zip(xs[:-1], xs[1:])
+    ]
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Abre la memoria compartida del proceso principal sin adueñarse de ella."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13: los procesos hijos comparten el resource_tracker del
+        # principal (ver start), así que abrirla no la registra dos veces
+        return shared_memory.SharedMemory(name=name)
+
+
+def _worker_main(conn: Connection, settings: Dict) -> None:
+    """
+    Proceso de búsqueda: recibe bloques por conn y responde un TileResult por bloque.
+    
+    Mensajes: (nombre de memoria, forma, ruta de la imagen, [bloques]) o None para
+    terminar. Si la búsqueda falla se responde la excepción.
+    """
+    detector = ImageDetector(change_gate=False, **settings)
+    shm: Optional[shared_memory.SharedMemory] = None
+    
+    try:
+        while True:
+            message = conn.recv()
+            if message is None:
+                break
+            
+            name, shape, image_path, tiles = message
+            if shm is None or shm.name != name:
+                if shm is not None:
+                    shm.close()
+                shm = _attach(name)
+            frame = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+            
+            try:
+                results: List[TileResult] = []
+                for x, y, width, height in tiles:
+                    result = detector.match_frame(frame[y:y + height, x:x + width], Path(image_path), (x, y))
+                    results.append((
+                        result.found, result.x or 0, result.y or 0, result.width or 0,
+                        result.height or 0, result.confidence or 0.0, result.scale, result.angle
+                    ))
+                conn.send(results)
+            except Exception as error:
+                conn.send(error)
+            finally:
+                del frame
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        if shm is not None:
+            shm.close()
+
+
+class ParallelDetector(ImageDetector):
+    """
+    ImageDetector que reparte cada búsqueda entre varios procesos.
+    
+    Tiene la misma interfaz que ImageDetector (change_gate, ROI, tiempos);
+    solo cambia cómo se busca una imagen en la captura. detect_all y
+    detect_many buscan en el proceso principal, y clone() retorna un
+    ImageDetector común. Hay que llamar a close() (o usarlo con with) para
+    terminar los procesos.
+    """
+    
+    def __init__(
+        self,
+        workers: int = None,
+        min_area: int = None,
+        **kwargs
+    ):
+        """
+        Inicializa el detector (los procesos arrancan en la primera búsqueda).
+        
+        Args:
+            workers: Procesos de búsqueda (por defecto, uno por núcleo)
+            min_area: Área mínima (píxeles) de la captura para repartirla;
+                      en capturas menores se busca en el proceso principal
+            **kwargs: Argumentos de ImageDetector
+        """
+        super().__init__(**kwargs)
+        self.workers = workers or DETECTION_CONFIG["parallel_workers"] or os.cpu_count() or 1
+        self.min_area = min_area if min_area is not None else DETECTION_CONFIG["parallel_min_area"]
+        
+        self._processes: List[multiprocessing.Process] = []
+        self._connections: List[Connection] = []
+        self._shm: Optional[shared_memory.SharedMemory] = None
+        self._shared: Optional[np.ndarray] = None
+    
+    @property
+    def running(self) -> bool:
+        """True si los procesos de búsqueda están activos."""
+        return bool(self._processes)
+    
+    def start(self) -> None:
+        """Arranca los procesos de búsqueda (si no están corriendo)."""
+        if self._processes:
+            return
+        
+        settings = {
+            "confidence": self.confidence,
+            "grayscale": self.grayscale,
+            "engine": self.engine.name,
+            "pyramid_levels": self.pyramid_levels,
+            "multiscale": self.multiscale,
+            "scales": self.scales,
+            "rotations": self.rotations,
+        }
+        if os.name == "posix":
+            # Los hijos heredan el resource_tracker solo si ya está corriendo;
+            # si no, cada uno abre el suyo y borra la memoria compartida al salir
+            from multiprocessing import resource_tracker
+            resource_tracker.ensure_running()
+        
+        for index in range(self.workers):
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=_worker_main,
+                args=(child, settings),
+                name=f"detector-{index}",
+                daemon=True
+            )
+            process.start()
+            child.close()
+            self._processes.append(process)
+            self._connections.append(parent)
+        
+        atexit.register(self.close)
+    
+    def close(self) -> None:
+        """Termina los procesos y libera la memoria compartida."""
+        atexit.unregister(self.close)
+        for conn in self._connections:
+            try:
+                conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self._processes:
+            process.join(timeout=2.0)
+            if process.is_alive():
+                process.terminate()
+        for conn in self._connections:
+            conn.close()
+        
+        self._processes = []
+        self._connections = []
+        self._shared = None
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def _match_frame(
+        self,
+        frame: np.ndarray,
+        image: Union[Path, Template],
+        origin: Tuple[int, int]
+    ) -> DetectionResult:
+        """Busca repartiendo la captura en bloques entre los procesos."""
+        template = self.load(image)
+        height, width = frame.shape[:2]
+        tiles = split_tiles(width, height, self._max_size(template), self.workers)
+        
+        if self.workers < 2 or width * height < self.min_area or len(tiles) < 2:
+            return super()._match_frame(frame, template, origin)
+        
+        self.start()
+        shared = self._share(frame)
+        
+        # Bloques repartidos por turno entre los procesos
+        batches = [tiles[index::self.workers] for index in range(self.workers)]
+        busy = []
+        try:
+            for conn, batch in zip(self._connections, batches):
+                if batch:
+                    conn.send((self._shm.name, shared.shape, str(template.path), batch))
+                    busy.append(conn)
+            
+            # Se esperan todas las respuestas antes de propagar un error
+            replies = [conn.recv() for conn in busy]
+        except (EOFError, OSError) as error:
+            dead = ", ".join(
+                f"{process.name} (código {process.exitcode})"
+                for process in self._processes if not process.is_alive()
+            )
+            self.close()  # Se vuelven a arrancar en la próxima búsqueda
+            raise RuntimeError(
+                f"Un proceso de búsqueda terminó inesperadamente: {dead or 'sin respuesta'}"
+            ) from error
+        for reply in replies:
+            if isinstance(reply, Exception):
+                raise reply
+        
+        best: Optional[TileResult] = None
+        for tile in (tile for reply in replies for tile in reply):
+            if tile[0] and (best is None or tile[5] > best[5]):
+                best = tile
+        
+        if best is None:
+            return DetectionResult(found=False, name=template.path.name)
+        
+        _, x, y, result_w, result_h, confidence, scale, angle = best
+        return DetectionResult(
+            found=True,
+            x=origin[0] + x,
+            y=origin[1] + y,
+            width=result_w,
+            height=result_h,
+            confidence=confidence,
+            name=template.path.name,
+            scale=scale,
+            angle=angle
+        )
+    
+    def _share(self, frame: np.ndarray) -> np.ndarray:
+        """Copia la captura a la memoria compartida (se agranda si no entra)."""
+        if self._shared is None or self._shared.shape != frame.shape:
+            if self._shm is None or self._shm.size < frame.nbytes:
+                if self._shm is not None:
+                    self._shared = None
+                    self._shm.close()
+                    self._shm.unlink()
+                self._shm = shared_memory.SharedMemory(create=True, size=frame.nbytes)
+            self._shared = np.ndarray(frame.shape, dtype=np.uint8, buffer=self._shm.buf)
+        
+        np.copyto(self._shared, frame)
+        return self._shared
@@ -0,0 +1,372 @@
+"""
+Modo de automatización en paralelo (pipeline).
+
+Captura, búsqueda y clic corren en hilos separados:
+
+    captura -> FrameRing (capturas en espera) -> hilos de búsqueda -> clic
+
+La captura no espera a la búsqueda: si los hilos de búsqueda no dan abasto,
+se descarta la captura más vieja en espera. El clic siempre se hace sobre
+el resultado más reciente y se descartan los que quedaron viejos.
+"""
+import threading
+import time
+import numpy as np
+from collections import deque
+from pathlib import Path
+from typing import Callable, Deque, Dict, List, Optional, Tuple, Union
+from dataclasses import dataclass
+
+from core.detector import ImageDetector, DetectionResult, Template
+from core.clicker import MouseController, ClickType
+from core.frame_source import FrameSource, WindowFrameSource, create_frame_source
+from core.window import WindowWatcher
+from config.settings import BEHAVIOR_CONFIG
+from utils.logger import get_logger
+
+
+@dataclass
+class PipelineFrame:
+    """Captura en espera de ser procesada."""
+    seq: int
+    timestamp: float  # time.perf_counter() al capturar
+    origin: Tuple[int, int]
+    data: np.ndarray
+
+
+@dataclass
+class PipelineStats:
+    """Contadores del pipeline."""
+    frames_captured: int = 0
+    frames_dropped: int = 0
+    frames_matched: int = 0
+    results_stale: int = 0
+    clicks: int = 0
+
+
+class FrameRing:
+    """
+    Cola acotada de capturas con buffers reservados de antemano.
+    
+    Hay capacity + consumers + 1 buffers: los que están en la cola, uno por
+    cada hilo que está procesando y uno libre para la próxima captura. Si la
+    cola está llena, la captura más vieja en espera se descarta.
+    """
+    
+    def __init__(self, capacity: int, consumers: int):
+        """
+        Inicializa la cola.
+        
+        Args:
+            capacity: Máximo de capturas en espera
+            consumers: Cantidad de hilos que procesan capturas
+        """
+        self.capacity = capacity
+        self.dropped = 0
+        
+        slots = capacity + consumers + 1
+        self._buffers: List[Optional[np.ndarray]] = [None] * slots
+        self._frames: Dict[int, PipelineFrame] = {}
+        self._free: Deque[int] = deque(range(slots))
+        self._queue: Deque[int] = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+    
+    def put(self, frame: np.ndarray, origin: Tuple[int, int], seq: int, timestamp: float) -> None:
+        """
+        Copia una captura a la cola.
+        
+        Args:
+            frame: Captura (se copia, así la fuente puede reutilizar su buffer)
+            origin: Coordenadas de pantalla de la esquina de la captura
+            seq: Número de secuencia de la captura
+            timestamp: Momento de la captura
+        """
+        with self._cond:
+            if len(self._queue) >= self.capacity:
+                slot = self._queue.popleft()
+                del self._frames[slot]
+                self.dropped += 1
+            else:
+                slot = self._free.popleft()
+        
+        # El buffer es exclusivo de este hilo hasta volver a la cola
+        buffer = self._buffers[slot]
+        if buffer is None or buffer.shape != frame.shape:
+            buffer = np.empty_like(frame)
+            self._buffers[slot] = buffer
+        np.copyto(buffer, frame)
+        
+        with self._cond:
+            self._frames[slot] = PipelineFrame(seq, timestamp, origin, buffer)
+            self._queue.append(slot)
+            self._cond.notify()
+    
+    def get(self, timeout: float = None) -> Optional[Tuple[int, PipelineFrame]]:
+        """
+        Toma la captura más vieja en espera.
+        
+        El buffer queda reservado hasta llamar a release con el slot retornado.
+        
+        Args:
+            timeout: Segundos máximos de espera
+        
+        Returns:
+            (slot, PipelineFrame), o None si se agotó el tiempo o se cerró la cola
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._queue or self._closed, timeout)
+            if not self._queue:
+                return None
+            slot = self._queue.popleft()
+            return slot, self._frames.pop(slot)
+    
+    def release(self, slot: int) -> None:
+        """Devuelve un buffer tomado con get."""
+        with self._cond:
+            self._free.append(slot)
+    
+    def close(self) -> None:
+        """Despierta a los hilos que esperan capturas."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+class PipelinedAutomation:
+    """Busca y hace clic con captura, búsqueda y clic superpuestos."""
+    
+    def __init__(
+        self,
+        detector: ImageDetector = None,
+        clicker: MouseController = None,
+        workers: int = None,
+        queue_size: int = None,
+        max_age: float = None,
+        frame_source: FrameSource = None
+    ):
+        """
+        Inicializa el pipeline.
+        
+        Args:
+            detector: Detector con la configuración de búsqueda; cada hilo usa una copia
+            clicker: Instancia de MouseController
+            workers: Cantidad de hilos de búsqueda
+            queue_size: Máximo de capturas en espera
+            max_age: Segundos máximos entre la captura y el clic
+            frame_source: Fuente de capturas. Por defecto el hilo de captura crea
+                          la suya para la región del detector (mss no se puede
+                          compartir entre hilos), relativa a la misma ventana
+                          si el detector usa un WindowFrameSource
+        """
+        self.detector = detector or ImageDetector()
+        self.clicker = clicker or MouseController()
+        self.workers = workers or BEHAVIOR_CONFIG["pipeline_workers"]
+        self.queue_size = queue_size or BEHAVIOR_CONFIG["pipeline_queue"]
+        self.max_age = max_age if max_age is not None else BEHAVIOR_CONFIG["pipeline_max_age"]
+        self.frame_source = frame_source
+        self.logger = get_logger(__name__)
+        
+        self.stats = PipelineStats()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._ring: Optional[FrameRing] = None
+        
+        # Resultado positivo más reciente pendiente de clic
+        self._pending: Optional[Tuple[PipelineFrame, DetectionResult]] = None
+        self._pending_cond = threading.Condition()
+    
+    @property
+    def running(self) -> bool:
+        return any(thread.is_alive() for thread in self._threads)
+    
+    def start(
+        self,
+        image_path: Union[Path, Template],
+        click_type: ClickType = ClickType.LEFT,
+        stop_after_clicks: int = None,
+        on_click: Optional[Callable[[DetectionResult], None]] = None
+    ) -> None:
+        """
+        Arranca los hilos y retorna inmediatamente.
+        
+        Args:
+            image_path: Ruta a la imagen (o Template ya cargado)
+            click_type: Tipo de clic
+            stop_after_clicks: Detener después de N clics (None = infinito)
+            on_click: Callback después de cada clic
+        """
+        if self.running:
+            raise RuntimeError("El pipeline ya está en ejecución")
+        
+        template = self.detector.load(image_path)
+        region = self.detector.region
+        # Si el detector trabaja relativo a una ventana, la región también lo es
+        source = self.detector.source
+        window = source.window if isinstance(source, WindowFrameSource) else None
+        
+        self.stats = PipelineStats()
+        self._stop.clear()
+        self._pending = None
+        self._ring = FrameRing(self.queue_size, self.workers)
+        
+        self._threads = [
+            threading.Thread(target=self._capture_loop, args=(region, window), name="pipeline-capture", daemon=True),
+            threading.Thread(
+                target=self._click_loop,
+                args=(click_type, stop_after_clicks, on_click),
+                name="pipeline-click",
+                daemon=True
+            ),
+        ]
+        self._threads += [
+            threading.Thread(
+                target=self._match_loop,
+                args=(self.detector.clone(), template),
+                name=f"pipeline-match-{index}",
+                daemon=True
+            )
+            for index in range(self.workers)
+        ]
+        
+        self.logger.info(f"Iniciando pipeline con {self.workers} hilos de búsqueda")
+        for thread in self._threads:
+            thread.start()
+    
+    def run(
+        self,
+        image_path: Union[Path, Template],
+        click_type: ClickType = ClickType.LEFT,
+        stop_after_clicks: int = None,
+        timeout: float = None
+    ) -> int:
+        """
+        Ejecuta el pipeline hasta stop(), el límite de clics o el timeout.
+        
+        Args:
+            image_path: Ruta a la imagen (o Template ya cargado)
+            click_type: Tipo de clic
+            stop_after_clicks: Detener después de N clics (None = infinito)
+            timeout: Segundos máximos de ejecución (None = sin límite)
+        
+        Returns:
+            Número total de clics realizados
+        """
+        self.start(image_path, click_type=click_type, stop_after_clicks=stop_after_clicks)
+        
+        try:
+            self._stop.wait(timeout)
+        except KeyboardInterrupt:
+            self.logger.info("Detenido por el usuario")
+        
+        self.stop()
+        return self.stats.clicks
+    
+    def stop(self, timeout: float = 2.0) -> None:
+        """
+        Detiene todos los hilos y espera a que terminen.
+        
+        Args:
+            timeout: Segundos máximos de espera por cada hilo
+        """
+        self._stop.set()
+        if self._ring:
+            self._ring.close()
+        with self._pending_cond:
+            self._pending_cond.notify_all()
+        
+        current = threading.current_thread()
+        for thread in self._threads:
+            if thread is not current:
+                thread.join(timeout)
+        
+        if self._ring:
+            self.stats.frames_dropped = self._ring.dropped
+    
+    def _capture_loop(self, region, window: Optional[WindowWatcher]) -> None:
+        """Hilo de captura: produce capturas tan rápido como da la fuente."""
+        if self.frame_source is not None:
+            source = self.frame_source
+        elif window is not None:
+            source = WindowFrameSource(window, region)
+        else:
+            source = create_frame_source(region=region)
+        seq = 0
+        
+        try:
+            while not self._stop.is_set():
+                frame = source.grab()
+                seq += 1
+                self._ring.put(frame, source.region[:2], seq, time.perf_counter())
+                self.stats.frames_captured = seq
+        except Exception as e:
+            self.logger.error(f"Error en la captura: {e}")
+            self._stop.set()
+        finally:
+            if self.frame_source is None:
+                source.close()
+            self._ring.close()
+    
+    def _match_loop(self, detector: ImageDetector, template: Template) -> None:
+        """Hilo de búsqueda: procesa capturas de la cola."""
+        try:
+            while not self._stop.is_set():
+                item = self._ring.get(timeout=0.1)
+                if item is None:
+                    continue
+                
+                slot, frame = item
+                try:
+                    result = detector.match_frame(frame.data, template, frame.origin)
+                finally:
+                    self._ring.release(slot)
+                
+                self.stats.frames_matched += 1
+                if not result.found:
+                    continue
+                
+                with self._pending_cond:
+                    if self._pending is None or frame.seq > self._pending[0].seq:
+                        self._pending = (frame, result)
+                        self._pending_cond.notify()
+        except Exception as e:
+            self.logger.error(f"Error en la búsqueda: {e}")
+            self._stop.set()
+    
+    def _click_loop(
+        self,
+        click_type: ClickType,
+        stop_after_clicks: Optional[int],
+        on_click: Optional[Callable[[DetectionResult], None]]
+    ) -> None:
+        """Hilo de clic: actúa sobre el resultado positivo más reciente."""
+        last_click_time = 0.0
+        
+        while not self._stop.is_set():
+            with self._pending_cond:
+                self._pending_cond.wait_for(lambda: self._pending or self._stop.is_set())
+                if self._stop.is_set():
+                    return
+                frame, result = self._pending
+                self._pending = None
+            
+            # Descartar resultados viejos o de capturas anteriores al último clic
+            if time.perf_counter() - frame.timestamp > self.max_age or frame.timestamp <= last_click_time:
+                self.stats.results_stale += 1
+                continue
+            
+            center = result.center
+            if not self.clicker.click(center[0], center[1], click_type=click_type):
+                continue
+            
+            last_click_time = time.perf_counter()
+            self.stats.clicks += 1
+            self.logger.info(f"Clic en ({center[0]}, {center[1]}) - clics totales: {self.stats.clicks}")
+            
+            if on_click:
+                on_click(result)
+            
+            if stop_after_clicks and self.stats.clicks >= stop_after_clicks:
+                self.logger.info("Límite de clics alcanzado")
+                self._stop.set()
+                return
@@ -2,10 +2,15 @@
 Módulo de detección ultrarrápida por píxeles.
 Monitorea píxeles específicos para detectar cambios.
 """
-import pyautogui
-from typing import List, Tuple, Optional
+import cv2
+import numpy as np
+from typing import List, Tuple, Optional, Union
 from dataclasses import dataclass
 
+from core.frame_source import FrameSource, create_frame_source
+from core.pixel_rules import RULE_ALL, PixelRuleSet, cached_hsv_table
+from core.window import WindowWatcher
+
 
 @dataclass
 class PixelCondition:
@@ -13,67 +18,199 @@ class PixelCondition:
     x: int
     y: int
     expected_color: Tuple[int, int, int]  # RGB
-    tolerance: int = 10  # Tolerancia en cada canal RGB
+    tolerance: Union[int, Tuple[int, int, int]] = 10  # Tolerancia en cada canal RGB
+    hsv_range: Optional[Tuple[Tuple[int, int, int], Tuple[int, int, int]]] = None  # (mín, máx) HSV de OpenCV
+    weight: float = 1.0  # Peso en las reglas ponderadas (ver PixelRuleSet)
+    
+    @property
+    def channel_tolerance(self) -> Tuple[int, int, int]:
+        """Tolerancia por canal RGB."""
+        if isinstance(self.tolerance, int):
+            return (self.tolerance,) * 3
+        return tuple(self.tolerance)
     
     def matches(self, actual_color: Tuple[int, int, int]) -> bool:
-        """Verifica si el color actual coincide con el esperado."""
-        return all(
-            abs(actual_color[i] - self.expected_color[i]) <= self.tolerance
+        """
+        Verifica si el color actual (RGB) coincide con el esperado.
+        
+        Para evaluar muchas condiciones por captura usar PixelRuleSet.
+        """
+        tolerance = self.channel_tolerance
+        if not all(
+            abs(actual_color[i] - self.expected_color[i]) <= tolerance[i]
             for i in range(3)
-        )
+        ):
+            return False
+        
+        if self.hsv_range is None:
+            return True
+        
+        rgb = np.array([[actual_color]], dtype=np.uint8)
+        hsv = cv2.cvtColor(rgb, cv2.COLOR_RGB2HSV)[0, 0]
+        table = cached_hsv_table(self.hsv_range)
+        return bool(table[(0, 1, 2), hsv].all())
+
+
+@dataclass
+class PixelCheckResult:
+    """Resultado de evaluar todas las condiciones sobre una captura."""
+    mask: np.ndarray  # bool por condición, en el mismo orden
+    first: Optional[Tuple[int, int]] = None  # Primer píxel que coincide
+    score: float = 0.0  # Suma de los pesos de las condiciones que coinciden
+    matched: bool = False  # Decisión según el modo de la regla del detector
+    
+    @property
+    def all_matched(self) -> bool:
+        return bool(self.mask.all())
+    
+    @property
+    def any_matched(self) -> bool:
+        return self.first is not None
+    
+    @property
+    def count(self) -> int:
+        return int(np.count_nonzero(self.mask))
+
+
+def conditions_bounds(conditions: List[PixelCondition]) -> Tuple[int, int, int, int]:
+    """
+    Calcula el rectángulo mínimo que contiene todas las condiciones.
+    
+    Args:
+        conditions: Lista de condiciones de píxeles
+        
+    Returns:
+        Región (x, y, width, height)
+    """
+    xs = [condition.x for condition in conditions]
+    ys = [condition.y for condition in conditions]
+    return (min(xs), min(ys), max(xs) - min(xs) + 1, max(ys) - min(ys) + 1)
 
 
 class PixelDetector:
     """Detector ultrarrápido basado en píxeles."""
     
-    def __init__(self, conditions: List[PixelCondition]):
+    def __init__(
+        self,
+        conditions: Union[List[PixelCondition], PixelRuleSet],
+        frame_source: FrameSource = None
+    ):
         """
         Inicializa el detector de píxeles.
         
         Args:
-            conditions: Lista de condiciones de píxeles a verificar
+            conditions: Lista de condiciones de píxeles a verificar, o un
+                        PixelRuleSet ya compilado (con su modo de decisión)
+            frame_source: Fuente de capturas; su región debe contener todos los
+                          píxeles. Por defecto se crea una que los abarca.
+                          Con WindowFrameSource(watcher, region=rules.bounds)
+                          las condiciones son relativas a la ventana.
         """
-        self.conditions = conditions
-        pyautogui.FAILSAFE = True
+        if not isinstance(conditions, PixelRuleSet):
+            conditions = PixelRuleSet(conditions)
+        
+        self.rules = conditions
+        self.conditions = conditions.conditions
+        self._source = frame_source
     
-    def check(self, require_all: bool = True) -> Optional[Tuple[int, int]]:
+    @property
+    def source(self) -> FrameSource:
+        """Fuente de capturas del detector (se crea al primer uso)."""
+        if self._source is None:
+            self._source = create_frame_source(region=self.rules.bounds)
+        return self._source
+    
+    def evaluate(self) -> PixelCheckResult:
+        """
+        Evalúa todas las condiciones con una sola captura.
+        
+        La captura abarca el rectángulo de las condiciones y la comparación
+        se hace en una única operación vectorizada.
+        
+        Returns:
+            PixelCheckResult con la máscara de coincidencias y el primer acierto
+        """
+        result = self.rules.evaluate(self.source.grab(), self.source.region[:2])
+        
+        first = None
+        if result.first is not None:
+            first = (self.conditions[result.first].x, self.conditions[result.first].y)
+        
+        return PixelCheckResult(mask=result.mask, first=first, score=result.score, matched=result.matched)
+    
+    def check(self, require_all: bool = None) -> Optional[Tuple[int, int]]:
         """
         Verifica si los píxeles cumplen las condiciones.
         
         Args:
             require_all: Si True, todos los píxeles deben coincidir.
                         Si False, basta con que uno coincida.
+                        Si None, se usa el modo de la regla del detector.
         
         Returns:
             Coordenadas del primer píxel que coincide, o None
         """
-        matches = []
-        
-        for condition in self.conditions:
-            # Obtener color del píxel
-            pixel_color = pyautogui.pixel(condition.x, condition.y)
-            
-            # Verificar si coincide
-            if condition.matches(pixel_color):
-                matches.append(condition)
-                if not require_all:
-                    # Retornar en cuanto encontremos uno
-                    return (condition.x, condition.y)
-        
-        # Si require_all, verificar que todos coincidan
-        if require_all and len(matches) == len(self.conditions):
-            return (self.conditions[0].x, self.conditions[0].y)
-        
-        return None
+        result = self.evaluate()
+        
+        if require_all is None:
+            if not result.matched:
+                return None
+            if self.rules.mode == RULE_ALL:
+                return (self.conditions[0].x, self.conditions[0].y)
+            return result.first
+        
+        if require_all:
+            return (self.conditions[0].x, self.conditions[0].y) if result.all_matched else None
+        
+        return result.first
     
     @staticmethod
-    def get_pixel_color(x: int, y: int) -> Tuple[int, int, int]:
-        """Obtiene el color de un píxel en coordenadas específicas."""
-        return pyautogui.pixel(x, y)
+    def get_pixel_color(
+        x: int,
+        y: int,
+        frame_source: FrameSource = None
+    ) -> Tuple[int, int, int]:
+        """
+        Obtiene el color de un píxel en coordenadas específicas.
+        
+        Args:
+            x: Coordenada X
+            y: Coordenada Y
+            frame_source: Fuente cuya región contiene el píxel; si es None
+                          se captura solo ese píxel
+        
+        Returns:
+            Color RGB
+        """
+        if frame_source is None:
+            with create_frame_source(region=(x, y, 1, 1)) as source:
+                blue, green, red = source.grab()[0, 0]
+        else:
+            origin_x, origin_y = frame_source.region[:2]
+            blue, green, red = frame_source.grab()[y - origin_y, x - origin_x]
+        
+        return (int(red), int(green), int(blue))
     
     @staticmethod
-    def get_mouse_position_and_color() -> Tuple[int, int, Tuple[int, int, int]]:
-        """Obtiene la posición del mouse y el color del píxel bajo él."""
+    def get_mouse_position_and_color(
+        window: WindowWatcher = None
+    ) -> Tuple[int, int, Tuple[int, int, int]]:
+        """
+        Obtiene la posición del mouse y el color del píxel bajo él.
+        
+        Args:
+            window: Si se indica, la posición se retorna relativa a la ventana
+        
+        Returns:
+            (x, y, color RGB)
+        """
+        import pyautogui
+        
         pos = pyautogui.position()
-        color = pyautogui.pixel(pos.x, pos.y)
-        return (pos.x, pos.y, color)
+        color = PixelDetector.get_pixel_color(pos.x, pos.y)
+        if window is None:
+            return (pos.x, pos.y, color)
+
+        window.poll()
+        x, y = window.to_window(pos.x, pos.y)
+        return (x, y, color)
@@ -0,0 +1,266 @@
+"""
+Reglas de píxeles compiladas.
+
+Un conjunto de PixelCondition se compila una sola vez a arrays de NumPy
+(coordenadas, tablas de colores aceptados y pesos) y se evalúa sobre una
+captura con unas pocas operaciones vectorizadas, sin recorrer los píxeles
+en Python.
+
+Cada condición tiene una tabla de 256 entradas por canal que indica qué
+valores acepta. La tolerancia RGB y los rangos HSV (incluso los de tono que
+dan la vuelta, como el rojo 170-10) se reducen a la misma búsqueda en tabla.
+"""
+import ast
+import cv2
+from functools import lru_cache
+import numpy as np
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Optional, Sequence, Tuple, Union
+from dataclasses import dataclass
+
+if TYPE_CHECKING:
+    from core.pixel_detector import PixelCondition
+
+
+# Modos de decisión
+RULE_ALL = "all"            # Todas las condiciones
+RULE_ANY = "any"            # Al menos una
+RULE_K_OF_N = "k_of_n"      # Al menos k condiciones
+RULE_WEIGHTED = "weighted"  # Suma de pesos de las que coinciden >= threshold
+
+RULE_MODES = (RULE_ALL, RULE_ANY, RULE_K_OF_N, RULE_WEIGHTED)
+
+# Máximo de cada canal HSV en OpenCV (el tono va de 0 a 179)
+HSV_MAX = (179, 255, 255)
+
+
+@dataclass
+class RuleResult:
+    """Resultado de evaluar un conjunto de reglas sobre una captura."""
+    mask: np.ndarray  # bool por condición, en el mismo orden
+    score: float  # Suma de los pesos de las condiciones que coinciden
+    matched: bool  # Decisión según el modo del conjunto
+    first: Optional[int] = None  # Índice de la primera condición que coincide
+
+
+def _tolerance_table(expected: Sequence[int], tolerance: Sequence[int]) -> np.ndarray:
+    """Tabla (3, 256) de valores aceptados para un color y su tolerancia por canal."""
+    values = np.arange(256, dtype=np.int16)
+    return np.stack([
+        np.abs(values - int(expected[channel])) <= int(tolerance[channel])
+        for channel in range(3)
+    ])
+
+
+def hsv_table(low: Sequence[int], high: Sequence[int]) -> np.ndarray:
+    """
+    Tabla (3, 256) de valores aceptados para un rango HSV.
+    
+    Si low > high en un canal, el rango da la vuelta (solo tiene sentido en el tono).
+    """
+    values = np.arange(256)
+    table = np.zeros((3, 256), dtype=bool)
+    for channel in range(3):
+        lo, hi = int(low[channel]), int(high[channel])
+        if lo <= hi:
+            table[channel] = (values >= lo) & (values <= hi)
+        else:
+            table[channel] = ((values >= lo) & (values <= HSV_MAX[channel])) | (values <= hi)
+    return table
+
+
+@lru_cache(maxsize=256)
+def _cached_hsv_table(low: Tuple[int, ...], high: Tuple[int, ...]) -> np.ndarray:
+    table = hsv_table(low, high)
+    table.flags.writeable = False
+    return table
+
+
+def cached_hsv_table(hsv_range: Sequence[Sequence[int]]) -> np.ndarray:
+    """
+    Igual que hsv_table, pero se construye una sola vez por rango.
+    
+    La tabla es de solo lectura: la comparten todas las condiciones con el
+    mismo rango.
+    """
+    low, high = hsv_range
+    return _cached_hsv_table(tuple(low), tuple(high))
+
+
+class PixelRuleSet:
+    """Conjunto de condiciones de píxeles compilado para evaluarse de una vez."""
+    
+    def __init__(
+        self,
+        conditions: Sequence["PixelCondition"],
+        mode: str = RULE_ALL,
+        k: int = None,
+        threshold: float = None
+    ):
+        """
+        Compila las condiciones.
+        
+        Args:
+            conditions: Condiciones de píxeles (ver PixelCondition)
+            mode: "all", "any", "k_of_n" o "weighted"
+            k: Mínimo de condiciones que deben coincidir (modo "k_of_n")
+            threshold: Suma mínima de pesos (modo "weighted"); por defecto
+                       la mitad del peso total
+        """
+        if not conditions:
+            raise ValueError("Se necesita al menos una condición")
+        if mode not in RULE_MODES:
+            raise ValueError(f"Modo de regla desconocido: {mode}")
+        if mode == RULE_K_OF_N and not k:
+            raise ValueError("El modo k_of_n necesita k")
+        
+        self.conditions = list(conditions)
+        self.mode = mode
+        self.k = k
+        
+        count = len(self.conditions)
+        self.xs = np.array([c.x for c in self.conditions], dtype=np.intp)
+        self.ys = np.array([c.y for c in self.conditions], dtype=np.intp)
+        self.weights = np.array([c.weight for c in self.conditions], dtype=np.float64)
+        self.threshold = threshold if threshold is not None else self.weights.sum() / 2
+        
+        # Tablas por condición y canal, en el orden BGR de la captura
+        self._bgr_tables = np.stack([
+            _tolerance_table(c.expected_color[::-1], c.channel_tolerance[::-1])
+            for c in self.conditions
+        ])
+        
+        # Solo las condiciones con rango HSV necesitan la conversión
+        self._hsv_index = np.array(
+            [i for i, c in enumerate(self.conditions) if c.hsv_range is not None], dtype=np.intp
+        )
+        self._hsv_tables = np.stack([
+            cached_hsv_table(self.conditions[i].hsv_range) for i in self._hsv_index
+        ]) if self._hsv_index.size else None
+        
+        self._rows = np.arange(count)[:, None]
+        self._hsv_rows = np.arange(self._hsv_index.size)[:, None]
+        self._channels = np.arange(3)[None, :]
+    
+    def __len__(self) -> int:
+        return len(self.conditions)
+    
+    @property
+    def bounds(self) -> Tuple[int, int, int, int]:
+        """Rectángulo mínimo (x, y, width, height) que contiene todas las condiciones."""
+        left, top = int(self.xs.min()), int(self.ys.min())
+        return (left, top, int(self.xs.max()) - left + 1, int(self.ys.max()) - top + 1)
+    
+    def sample(self, frame: np.ndarray, origin: Tuple[int, int] = (0, 0)) -> np.ndarray:
+        """
+        Lee los píxeles de las condiciones de una captura.
+        
+        Args:
+            frame: Captura BGR
+            origin: Coordenadas de pantalla de la esquina de la captura
+        
+        Returns:
+            Array (N, 3) uint8 con los colores BGR
+        """
+        return frame[self.ys - origin[1], self.xs - origin[0]]
+    
+    def mask(self, pixels: np.ndarray) -> np.ndarray:
+        """
+        Evalúa cada condición sobre sus píxeles ya leídos.
+        
+        Args:
+            pixels: Array (N, 3) uint8 BGR, uno por condición (ver sample)
+        
+        Returns:
+            Máscara bool con una entrada por condición
+        """
+        mask = self._bgr_tables[self._rows, self._channels, pixels].all(axis=1)
+        
+        if self._hsv_tables is not None:
+            hsv = cv2.cvtColor(pixels[self._hsv_index][None], cv2.COLOR_BGR2HSV)[0]
+            mask[self._hsv_index] &= self._hsv_tables[self._hsv_rows, self._channels, hsv].all(axis=1)
+        
+        return mask
+    
+    def evaluate(self, frame: np.ndarray, origin: Tuple[int, int] = (0, 0)) -> RuleResult:
+        """
+        Evalúa el conjunto sobre una captura.
+        
+        Args:
+            frame: Captura BGR que contiene todos los píxeles
+            origin: Coordenadas de pantalla de la esquina de la captura
+        
+        Returns:
+            RuleResult con la máscara, el puntaje y la decisión
+        """
+        mask = self.mask(self.sample(frame, origin))
+        score = float(self.weights @ mask)
+        
+        if self.mode == RULE_ALL:
+            matched = bool(mask.all())
+        elif self.mode == RULE_ANY:
+            matched = bool(mask.any())
+        elif self.mode == RULE_K_OF_N:
+            matched = int(np.count_nonzero(mask)) >= self.k
+        else:
+            matched = score >= self.threshold
+        
+        first = int(mask.argmax()) if mask.any() else None
+        return RuleResult(mask=mask, score=score, matched=matched, first=first)
+    
+    @classmethod
+    def from_code(cls, code: str, **kwargs) -> "PixelRuleSet":
+        """
+        Crea el conjunto a partir del código que genera tools/identify_pixels.py.
+        
+        Args:
+            code: Texto con llamadas PixelCondition(...) (p. ej. la lista
+                  PIXEL_CONDITIONS copiada de la herramienta)
+            **kwargs: mode, k, threshold
+        
+        Returns:
+            PixelRuleSet compilado
+        """
+        return cls(parse_conditions(code), **kwargs)
+    
+    @classmethod
+    def from_file(cls, path: Union[str, Path], **kwargs) -> "PixelRuleSet":
+        """Igual que from_code, leyendo el código de un archivo."""
+        return cls.from_code(Path(path).read_text(encoding="utf-8"), **kwargs)
+
+
+def parse_conditions(code: str) -> List["PixelCondition"]:
+    """
+    Extrae las condiciones de un texto con llamadas PixelCondition(...).
+    
+    El texto no se ejecuta: solo se leen los argumentos literales de cada
+    llamada.
+    
+    Args:
+        code: Código Python (por ejemplo, la salida de tools/identify_pixels.py)
+    
+    Returns:
+        Lista de PixelCondition en el orden en que aparecen
+    """
+    from core.pixel_detector import PixelCondition
+    
+    fields = ("x", "y", "expected_color", "tolerance", "hsv_range", "weight")
+    conditions = []
+    
+    for node in ast.walk(ast.parse(code)):
+        if not isinstance(node, ast.Call):
+            continue
+        name = node.func.id if isinstance(node.func, ast.Name) else getattr(node.func, "attr", None)
+        if name != "PixelCondition":
+            continue
+        
+        kwargs = dict(zip(fields, (ast.literal_eval(arg) for arg in node.args)))
+        for keyword in node.keywords:
+            kwargs[keyword.arg] = ast.literal_eval(keyword.value)
+        conditions.append((node.lineno, node.col_offset, PixelCondition(**kwargs)))
+    
+    if not conditions:
+        raise ValueError("No se encontraron llamadas a PixelCondition")
+    
+    conditions.sort(key=lambda item: item[:2])
+    return [condition for _, _, condition in conditions]
@@ -0,0 +1,483 @@
+"""
+Grabación y reproducción de capturas.
+
+FrameRecorder guarda una sesión de capturas en un archivo comprimido por
+bloques: cada cierto número de capturas una completa (clave) y, entre
+ellas, solo los bloques que cambiaron respecto de la anterior. Cada
+captura queda con su instante, en un índice al final del archivo.
+
+ReplayFrameSource lee el archivo con mmap y entrega las capturas a
+ImageDetector/PixelDetector como cualquier otra fuente, al ritmo grabado
+o lo más rápido posible. Sirve para ajustar la confianza, la región de
+búsqueda o las tolerancias sin el juego abierto, y para repetir las
+mismas mediciones de velocidad y precisión.
+
+Formato del archivo:
+    encabezado | bloque 0 | bloque 1 | ... | índice
+Cada bloque lleva su propio encabezado (instante, tipo, tamaño), así que
+una grabación interrumpida antes de escribir el índice se puede leer igual.
+"""
+import mmap
+import struct
+import threading
+import time
+import zlib
+import numpy as np
+from collections import deque
+from pathlib import Path
+from typing import Deque, Iterator, Optional, Tuple, Union
+
+from config.settings import RECORDING_CONFIG
+from core.frame_source import FrameSource, Region
+
+
+MAGIC = b"ICREC\x00\x00\x01"
+
+# magic, bloque, x, y, width, height, capturas, posición del índice
+_HEADER = struct.Struct("<8sHiiIIIQ")
+# instante, tipo, tamaño comprimido
+_CHUNK = struct.Struct("<dBI")
+
+KEYFRAME = 0  # Captura completa
+DELTA = 1     # Solo los bloques que cambiaron (tamaño 0 = sin cambios)
+
+INDEX_DTYPE = np.dtype([
+    ("time", "<f8"),    # Segundos desde el inicio de la grabación
+    ("offset", "<u8"),  # Posición de los datos comprimidos en el archivo
+    ("size", "<u4"),    # Tamaño comprimido
+    ("kind", "u1"),     # KEYFRAME o DELTA
+])
+
+
+def _padded_shape(width: int, height: int, tile: int) -> Tuple[int, int, int]:
+    """Forma de una captura agrandada a un múltiplo del bloque."""
+    return (-(-height // tile) * tile, -(-width // tile) * tile, 3)
+
+
+def _crop(frame: np.ndarray, origin: Tuple[int, int], region: Region) -> np.ndarray:
+    """Recorta region (en coordenadas de pantalla) de una captura con esquina en origin."""
+    x, y, width, height = region
+    left, top = x - origin[0], y - origin[1]
+    crop = frame[max(top, 0):top + height, max(left, 0):left + width]
+    if left < 0 or top < 0 or crop.shape[:2] != (height, width):
+        raise ValueError(f"La región {region} está fuera de la grabación")
+    return crop
+
+
+def _tiles(padded: np.ndarray, tile: int) -> np.ndarray:
+    """Vista (filas, columnas, tile, tile, 3) de los bloques de una captura."""
+    rows, cols = padded.shape[0] // tile, padded.shape[1] // tile
+    return padded.reshape(rows, tile, cols, tile, 3).swapaxes(1, 2)
+
+
+class FrameRecorder:
+    """Escribe capturas de una región en un archivo de grabación."""
+    
+    def __init__(
+        self,
+        path: Union[str, Path],
+        region: Region,
+        tile_size: int = None,
+        keyframe_interval: int = None,
+        compression: int = None
+    ):
+        """
+        Crea el archivo de grabación.
+        
+        Args:
+            path: Archivo a escribir (se sobrescribe)
+            region: Región grabada (x, y, width, height); todas las capturas
+                    deben tener su tamaño
+            tile_size: Lado de los bloques que se comparan entre capturas
+            keyframe_interval: Capturas entre dos capturas completas
+            compression: Nivel de zlib (1 = rápido, 9 = más chico)
+        """
+        self.path = Path(path)
+        self.region = tuple(int(v) for v in region)
+        self.tile = tile_size or RECORDING_CONFIG["tile_size"]
+        self.keyframe_interval = keyframe_interval or RECORDING_CONFIG["keyframe_interval"]
+        self.compression = compression if compression is not None else RECORDING_CONFIG["compression"]
+        
+        _, _, width, height = self.region
+        shape = _padded_shape(width, height, self.tile)
+        self._current = np.zeros(shape, dtype=np.uint8)
+        self._previous = np.zeros(shape, dtype=np.uint8)
+        self._diff = np.empty(shape, dtype=bool)
+        
+        self._index = []
+        self._start: Optional[float] = None
+        self.bytes_written = 0
+        
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "wb")
+        self._file.write(self._header(count=0, index_offset=0))
+    
+    @property
+    def frame_count(self) -> int:
+        """Capturas grabadas hasta ahora."""
+        return len(self._index)
+    
+    @property
+    def closed(self) -> bool:
+        return self._file.closed
+    
+    def write(self, frame: np.ndarray, timestamp: float = None) -> int:
+        """
+        Agrega una captura a la grabación.
+        
+        Args:
+            frame: Captura BGR del tamaño de la región
+            timestamp: Instante de la captura (time.perf_counter); por defecto, ahora
+        
+        Returns:
+            Bytes comprimidos escritos para esta captura
+        """
+        _, _, width, height = self.region
+        if frame.shape[:2] != (height, width):
+            raise ValueError(f"La captura {frame.shape[1]}x{frame.shape[0]} no coincide con la región {self.region}")
+        
+        now = timestamp if timestamp is not None else time.perf_counter()
+        if self._start is None:
+            self._start = now
+        
+        self._current[:height, :width] = frame[:, :, :3]
+        
+        if self.frame_count % self.keyframe_interval == 0:
+            kind = KEYFRAME
+            payload = zlib.compress(np.ascontiguousarray(frame[:, :, :3]).data, self.compression)
+        else:
+            kind = DELTA
+            payload = self._delta()
+        
+        self._write_chunk(now - self._start, kind, payload)
+        self._current, self._previous = self._previous, self._current
+        return len(payload)
+    
+    def close(self) -> None:
+        """Escribe el índice y cierra el archivo."""
+        if self._file.closed:
+            return
+        
+        index = np.array(self._index, dtype=INDEX_DTYPE)
+        index_offset = self._file.tell()
+        self._file.write(index.tobytes())
+        self._file.seek(0)
+        self._file.write(self._header(count=len(index), index_offset=index_offset))
+        self._file.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def _delta(self) -> bytes:
+        """Bloques distintos de la captura anterior, comprimidos (b"" si no hay)."""
+        np.not_equal(self._current, self._previous, out=self._diff)
+        changed = np.flatnonzero(_tiles(self._diff, self.tile).any(axis=(2, 3, 4)))
+        if not changed.size:
+            return b""
+        
+        cols = self._current.shape[1] // self.tile
+        tiles = _tiles(self._current, self.tile)[changed // cols, changed % cols]
+        count = np.array([changed.size], dtype="<u4")
+        return zlib.compress(
+            count.tobytes() + changed.astype("<u4").tobytes() + tiles.tobytes(),
+            self.compression
+        )
+    
+    def _write_chunk(self, elapsed: float, kind: int, payload: bytes) -> None:
+        self._file.write(_CHUNK.pack(elapsed, kind, len(payload)))
+        self._index.append((elapsed, self._file.tell(), len(payload), kind))
+        self._file.write(payload)
+        self.bytes_written += _CHUNK.size + len(payload)
+    
+    def _header(self, count: int, index_offset: int) -> bytes:
+        x, y, width, height = self.region
+        return _HEADER.pack(MAGIC, self.tile, x, y, width, height, count, index_offset)
+
+
+class Recording:
+    """Grabación abierta para lectura (con mmap)."""
+    
+    def __init__(self, path: Union[str, Path]):
+        """
+        Abre una grabación.
+        
+        Args:
+            path: Archivo escrito por FrameRecorder
+        """
+        self.path = Path(path)
+        self._file = open(self.path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        if len(self._map) < _HEADER.size:
+            self.close()
+            raise ValueError(f"Grabación vacía o dañada: {self.path}")
+        magic, self.tile, x, y, width, height, count, index_offset = _HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"No es una grabación: {self.path}")
+        
+        self.region: Region = (x, y, width, height)
+        if index_offset:
+            # Copia: un array sobre el mmap impediría cerrarlo
+            self.index = np.frombuffer(self._map, dtype=INDEX_DTYPE, count=count, offset=index_offset).copy()
+        else:
+            self.index = self._scan()  # Grabación sin cerrar: se recorren los bloques
+        
+        if not len(self.index) or self.index["kind"][0] != KEYFRAME:
+            self.close()
+            raise ValueError(f"La grabación no tiene capturas: {self.path}")
+        
+        self._keyframes = np.flatnonzero(self.index["kind"] == KEYFRAME)
+        self._state = np.zeros(_padded_shape(width, height, self.tile), dtype=np.uint8)
+        self._tiles = _tiles(self._state, self.tile)
+        self._position = -1  # Captura que hay en _state
+    
+    def __len__(self) -> int:
+        return len(self.index)
+    
+    @property
+    def timestamps(self) -> np.ndarray:
+        """Instante de cada captura, en segundos desde el inicio."""
+        return self.index["time"]
+    
+    @property
+    def duration(self) -> float:
+        """Duración de la grabación en segundos."""
+        return float(self.index["time"][-1])
+    
+    def frame(self, number: int) -> np.ndarray:
+        """
+        Reconstruye una captura.
+        
+        Avanzar de a una captura solo aplica un bloque; saltar hacia atrás
+        vuelve a la captura completa anterior.
+        
+        Args:
+            number: Número de captura (0 a len - 1)
+        
+        Returns:
+            Captura BGR (height, width, 3); es un buffer interno que cambia
+            con la próxima lectura
+        """
+        if not 0 <= number < len(self.index):
+            raise IndexError(f"Captura fuera de la grabación: {number}")
+        
+        keyframe = int(self._keyframes[np.searchsorted(self._keyframes, number, side="right") - 1])
+        start = self._position + 1 if keyframe <= self._position <= number else keyframe
+        for position in range(start, number + 1):
+            self._apply(position)
+        self._position = number
+        
+        _, _, width, height = self.region
+        return self._state[:height, :width]
+    
+    def __iter__(self) -> Iterator[np.ndarray]:
+        for number in range(len(self.index)):
+            yield self.frame(number)
+    
+    def close(self) -> None:
+        """Cierra el archivo."""
+        if not self._map.closed:
+            self._map.close()
+        self._file.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def _apply(self, position: int) -> None:
+        """Aplica el bloque de una captura sobre _state."""
+        _, offset, size, kind = self.index[position]
+        if not size:
+            return  # Sin cambios
+        
+        data = zlib.decompress(self._map[offset:offset + size])
+        _, _, width, height = self.region
+        if kind == KEYFRAME:
+            self._state[:height, :width] = np.frombuffer(data, dtype=np.uint8).reshape(height, width, 3)
+            return
+        
+        count = int(np.frombuffer(data, dtype="<u4", count=1)[0])
+        changed = np.frombuffer(data, dtype="<u4", count=count, offset=4)
+        tiles = np.frombuffer(data, dtype=np.uint8, offset=4 + 4 * count)
+        cols = self._tiles.shape[1]
+        self._tiles[changed // cols, changed % cols] = tiles.reshape(count, self.tile, self.tile, 3)
+    
+    def _scan(self) -> np.ndarray:
+        """Reconstruye el índice leyendo los encabezados de los bloques."""
+        entries = []
+        offset = _HEADER.size
+        while offset + _CHUNK.size <= len(self._map):
+            elapsed, kind, size = _CHUNK.unpack_from(self._map, offset)
+            offset += _CHUNK.size
+            if offset + size > len(self._map):
+                break  # Último bloque incompleto
+            entries.append((elapsed, offset, size, kind))
+            offset += size
+        return np.array(entries, dtype=INDEX_DTYPE)
+
+
+class RecordingFrameSource(FrameSource):
+    """
+    Fuente que graba todo lo que captura otra fuente.
+    
+    Se usa en lugar de la fuente original: los detectores no notan la
+    diferencia y cada captura queda en el archivo. Siempre se graba la
+    región inicial de la fuente; si un detector pide una región menor
+    (p. ej. al seguir la ROI), se recorta de ella.
+    
+    La compresión corre en un hilo aparte para no demorar la captura: si
+    ese hilo no da abasto y no quedan buffers libres, la captura se entrega
+    igual pero no se graba (se cuenta en frames_dropped).
+    """
+    
+    name = "recording"
+    
+    def __init__(
+        self,
+        source: FrameSource,
+        path: Union[str, Path],
+        queue_size: int = None,
+        **kwargs
+    ):
+        """
+        Inicializa la fuente.
+        
+        Args:
+            source: Fuente que captura la pantalla (con la región a grabar)
+            path: Archivo de grabación a escribir
+            queue_size: Capturas en espera de ser comprimidas
+            **kwargs: Argumentos de FrameRecorder (tile_size, keyframe_interval, compression)
+        """
+        self.source = source
+        self.recorder = FrameRecorder(path, source.region, **kwargs)
+        self.frames_dropped = 0
+        
+        _, _, width, height = self.recorder.region
+        size = queue_size or RECORDING_CONFIG["queue_size"]
+        self._free: Deque[np.ndarray] = deque(
+            np.empty((height, width, 3), dtype=np.uint8) for _ in range(size)
+        )
+        self._pending: Deque[Tuple[np.ndarray, float]] = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._writer = threading.Thread(target=self._write_loop, name="frame-recorder", daemon=True)
+        self._writer.start()
+        
+        super().__init__(source.region)
+    
+    def close(self) -> None:
+        """Termina de escribir las capturas en espera y cierra el archivo."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._writer.join()
+        self.recorder.close()
+        self.source.close()
+    
+    def _capture(self, region: Region, out: np.ndarray) -> None:
+        frame = self.source.grab()
+        timestamp = time.perf_counter()
+        np.copyto(out, _crop(frame, self.recorder.region[:2], region))
+        
+        with self._cond:
+            buffer = self._free.popleft() if self._free else None
+        if buffer is None:
+            self.frames_dropped += 1
+            return
+        
+        np.copyto(buffer, frame)
+        with self._cond:
+            self._pending.append((buffer, timestamp))
+            self._cond.notify()
+    
+    def _write_loop(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._closed)
+                if not self._pending:
+                    return
+                buffer, timestamp = self._pending.popleft()
+            
+            self.recorder.write(buffer, timestamp)
+            with self._cond:
+                self._free.append(buffer)
+    
+    def _screen_region(self) -> Region:
+        return self.recorder.region
+
+
+class ReplayFrameSource(FrameSource):
+    """
+    Fuente que reproduce una grabación.
+    
+    La región configurada se recorta de la región grabada, igual que en
+    SyntheticFrameSource.
+    """
+    
+    name = "replay"
+    
+    def __init__(
+        self,
+        recording: Union[str, Path, Recording],
+        region: Optional[Region] = None,
+        speed: Optional[float] = None,
+        loop: bool = False
+    ):
+        """
+        Inicializa la fuente.
+        
+        Args:
+            recording: Archivo de grabación o Recording ya abierta
+            region: Región a recortar, o None para toda la región grabada
+            speed: None para entregar las capturas lo más rápido posible;
+                   1.0 para respetar los tiempos grabados (2.0 = el doble de rápido)
+            loop: Si volver al principio al terminar; si no, se repite la última
+        """
+        self.recording = recording if isinstance(recording, Recording) else Recording(recording)
+        self.speed = speed
+        self.loop = loop
+        self.index = 0
+        self._started: Optional[float] = None
+        super().__init__(region)
+    
+    @property
+    def exhausted(self) -> bool:
+        """True si ya se entregó la última captura y no hay loop."""
+        return not self.loop and self.index >= len(self.recording)
+    
+    def close(self) -> None:
+        self.recording.close()
+    
+    def _capture(self, region: Region, out: np.ndarray) -> None:
+        count = len(self.recording)
+        number = min(self.index, count - 1)
+        self.index += 1
+        if self.loop and self.index >= count:
+            self.index = 0
+            self._started = None
+        
+        if self.speed:
+            self._wait(float(self.recording.timestamps[number]))
+        frame = self.recording.frame(number)
+        np.copyto(out, _crop(frame, self.recording.region[:2], region))
+    
+    def _wait(self, elapsed: float) -> None:
+        """Duerme hasta el instante de la captura (escalado por speed)."""
+        now = time.perf_counter()
+        if self._started is None:
+            self._started = now - elapsed / self.speed
+            return
+        delay = self._started + elapsed / self.speed - now
+        if delay > 0:
+            time.sleep(delay)
+    
+    def _screen_region(self) -> Region:
+        return self.recording.region
@@ -0,0 +1,117 @@
+"""
+Seguimiento de la región de interés (ROI).
+
+Después de una detección la búsqueda se reduce a un margen alrededor del
+último resultado; con cada fallo la región se agranda, y tras varios fallos
+seguidos se vuelve a la región completa.
+"""
+from typing import Optional, Tuple
+
+from config.settings import DETECTION_CONFIG
+from core.detector import DetectionResult
+
+
+Region = Tuple[int, int, int, int]  # (x, y, width, height)
+
+
+def clip_region(region: Region, bounds: Region) -> Region:
+    """
+    Recorta una región para que quede dentro de otra.
+    
+    Args:
+        region: Región a recortar
+        bounds: Región límite
+    
+    Returns:
+        Intersección de ambas regiones
+    """
+    x, y, width, height = region
+    bx, by, bw, bh = bounds
+    left, top = max(x, bx), max(y, by)
+    right, bottom = min(x + width, bx + bw), min(y + height, by + bh)
+    return (left, top, max(right - left, 1), max(bottom - top, 1))
+
+
+class ROITracker:
+    """Ajusta la región de búsqueda según los últimos resultados."""
+    
+    def __init__(
+        self,
+        full_region: Region,
+        margin: int = None,
+        growth: float = None,
+        max_misses: int = None
+    ):
+        """
+        Inicializa el seguimiento.
+        
+        Args:
+            full_region: Región completa (x, y, width, height), usada al inicio y como límite
+            margin: Píxeles alrededor del último resultado
+            growth: Factor de agrandamiento de la región en cada fallo
+            max_misses: Fallos seguidos antes de volver a la región completa
+        """
+        self.full_region = tuple(full_region)
+        self.margin = margin if margin is not None else DETECTION_CONFIG["roi_margin"]
+        self.growth = growth or DETECTION_CONFIG["roi_growth"]
+        self.max_misses = max_misses or DETECTION_CONFIG["roi_max_misses"]
+        
+        self._region: Region = self.full_region
+        self.misses = 0
+    
+    @property
+    def region(self) -> Region:
+        """Región donde buscar en el próximo escaneo."""
+        return self._region
+    
+    @property
+    def tracking(self) -> bool:
+        """True si la búsqueda está reducida alrededor de un resultado."""
+        return self._region != self.full_region
+    
+    def update(self, result: Optional[DetectionResult]) -> Region:
+        """
+        Actualiza la región con el resultado del último escaneo.
+        
+        Args:
+            result: Resultado de la detección (None cuenta como fallo)
+        
+        Returns:
+            Región para el próximo escaneo
+        """
+        if result is not None and result.found:
+            self.misses = 0
+            self._region = clip_region(
+                (
+                    result.x - self.margin,
+                    result.y - self.margin,
+                    result.width + 2 * self.margin,
+                    result.height + 2 * self.margin,
+                ),
+                self.full_region
+            )
+            return self._region
+        
+        self.misses += 1
+        if self.misses >= self.max_misses or not self.tracking:
+            self.reset()
+            return self._region
+        
+        # Agrandar alrededor del centro actual
+        x, y, width, height = self._region
+        new_width, new_height = int(width * self.growth), int(height * self.growth)
+        self._region = clip_region(
+            (
+                x - (new_width - width) // 2,
+                y - (new_height - height) // 2,
+                new_width,
+                new_height,
+            ),
+            self.full_region
+        )
+        return self._region
+    
+    def reset(self) -> None:
+        """Vuelve a la región completa."""
+        self._region = self.full_region
+        self.misses = 0
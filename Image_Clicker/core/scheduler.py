@@ -0,0 +1,124 @@
+"""
+Planificador adaptativo de escaneos.
+
+Reemplaza el time.sleep fijo entre escaneos: mide cuánto tarda cada ciclo
+(captura + búsqueda) y solo duerme lo que falta para completar el
+presupuesto por ciclo. Mientras la pantalla no cambia, el intervalo crece
+de forma exponencial hasta un máximo; en cuanto hay un cambio vuelve al
+presupuesto mínimo.
+
+wait() duerme con time.sleep; wait_async() es la misma espera para un
+ciclo de asyncio.
+"""
+import asyncio
+import time
+from typing import Optional
+
+from config.settings import BEHAVIOR_CONFIG
+
+
+class AdaptiveScheduler:
+    """Controla el ritmo de un ciclo de escaneo."""
+    
+    # Peso de la última muestra en los promedios móviles
+    SMOOTHING = 0.1
+    
+    def __init__(
+        self,
+        frame_budget: float = None,
+        max_interval: float = None,
+        backoff: float = None
+    ):
+        """
+        Inicializa el planificador.
+        
+        Args:
+            frame_budget: Duración objetivo de cada ciclo en segundos
+            max_interval: Intervalo máximo con la pantalla sin cambios
+            backoff: Factor por el que crece el intervalo en cada ciclo sin cambios
+        """
+        self.frame_budget = frame_budget if frame_budget is not None else BEHAVIOR_CONFIG["scan_interval"]
+        self.max_interval = max(
+            max_interval if max_interval is not None else BEHAVIOR_CONFIG["idle_max_interval"],
+            self.frame_budget
+        )
+        self.backoff = backoff or BEHAVIOR_CONFIG["idle_backoff"]
+        
+        self.interval = self.frame_budget
+        self.cycles = 0
+        self.work_time: Optional[float] = None  # Promedio de captura + búsqueda
+        self.cycle_time: Optional[float] = None  # Promedio del ciclo completo
+        
+        self._cycle_start = time.perf_counter()
+    
+    def start(self) -> None:
+        """Marca el inicio del primer ciclo."""
+        self._cycle_start = time.perf_counter()
+    
+    def wait(self, changed: bool = True) -> float:
+        """
+        Cierra el ciclo actual y duerme hasta el siguiente.
+        
+        Args:
+            changed: Si la pantalla cambió en este ciclo
+        
+        Returns:
+            Segundos dormidos
+        """
+        delay = self._delay(changed)
+        if delay:
+            time.sleep(delay)
+        self._next_cycle()
+        return delay
+    
+    async def wait_async(self, changed: bool = True) -> float:
+        """
+        Como wait(), pero cede el event loop mientras espera.
+        
+        Args:
+            changed: Si la pantalla cambió en este ciclo
+        
+        Returns:
+            Segundos esperados
+        """
+        delay = self._delay(changed)
+        await asyncio.sleep(delay)  # También con 0: deja correr a las otras tareas
+        self._next_cycle()
+        return delay
+    
+    @property
+    def achieved_hz(self) -> float:
+        """Escaneos por segundo logrados (promedio móvil)."""
+        return 1.0 / self.cycle_time if self.cycle_time else 0.0
+    
+    def summary(self) -> str:
+        """Resumen legible para los logs."""
+        work_ms = (self.work_time or 0.0) * 1000
+        return (
+            f"{self.achieved_hz:.1f} escaneos/s, {work_ms:.1f}ms por escaneo, "
+            f"{self.cycles} ciclos"
+        )
+    
+    def _delay(self, changed: bool) -> float:
+        """Cierra el trabajo del ciclo y calcula cuánto falta esperar."""
+        work = time.perf_counter() - self._cycle_start
+        self.work_time = self._average(self.work_time, work)
+        
+        if changed:
+            self.interval = self.frame_budget
+        else:
+            self.interval = min(self.interval * self.backoff, self.max_interval)
+        
+        return max(self.interval - work, 0.0)
+    
+    def _next_cycle(self) -> None:
+        """Registra la duración del ciclo completo y arranca el siguiente."""
+        now = time.perf_counter()
+        self.cycle_time = self._average(self.cycle_time, now - self._cycle_start)
+        self._cycle_start = now
+        self.cycles += 1
+    
+    def _average(self, current: Optional[float], sample: float) -> float:
+        if current is None:
+            return sample
+        return current + self.SMOOTHING * (sample - current)
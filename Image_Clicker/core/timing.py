@@ -0,0 +1,186 @@
+"""
+Medición de latencia por etapa (captura, búsqueda, delay del clic, clic).
+
+Cada etapa guarda sus últimas duraciones en un buffer circular de tamaño
+fijo: registrar una muestra es una asignación en una lista ya reservada,
+así que se puede dejar activado siempre. Los percentiles se calculan solo
+cuando se piden. No usa locks al registrar: con varios hilos escribiendo
+la misma etapa se puede perder alguna muestra, lo que no afecta a los
+percentiles.
+"""
+import threading
+import time
+import numpy as np
+from typing import Dict, List, Optional
+from dataclasses import dataclass
+
+from config.settings import BEHAVIOR_CONFIG
+
+
+# Duraciones por etapa de una operación, en segundos
+StageTimings = Dict[str, float]
+
+
+@dataclass
+class LatencyStats:
+    """Estadísticas de una etapa sobre las últimas muestras (en segundos)."""
+    count: int
+    mean: float
+    p50: float
+    p95: float
+    p99: float
+    max: float
+    
+    def __str__(self) -> str:
+        return (
+            f"p50 {self.p50 * 1000:.2f}ms  p95 {self.p95 * 1000:.2f}ms  "
+            f"p99 {self.p99 * 1000:.2f}ms  máx {self.max * 1000:.2f}ms  (n={self.count})"
+        )
+
+
+class _Ring:
+    """Últimas N duraciones de una etapa."""
+    
+    __slots__ = ("samples", "index", "total")
+    
+    def __init__(self, capacity: int):
+        self.samples: List[float] = [0.0] * capacity
+        self.index = 0
+        self.total = 0  # Muestras registradas desde el último reset
+    
+    def add(self, value: float) -> None:
+        self.samples[self.index] = value
+        self.index = (self.index + 1) % len(self.samples)
+        self.total += 1
+    
+    def values(self) -> List[float]:
+        return self.samples[:min(self.total, len(self.samples))]
+
+
+class LatencyRecorder:
+    """Registro de latencias por etapa con percentiles móviles."""
+    
+    def __init__(self, capacity: int = None, enabled: bool = None):
+        """
+        Inicializa el registro.
+        
+        Args:
+            capacity: Muestras que se conservan por etapa
+            enabled: Si registrar muestras (si no, record no hace nada)
+        """
+        self.capacity = capacity or BEHAVIOR_CONFIG["latency_window"]
+        self.enabled = enabled if enabled is not None else BEHAVIOR_CONFIG["latency_tracking"]
+        self._rings: Dict[str, _Ring] = {}
+        self._lock = threading.Lock()  # Solo para crear etapas nuevas
+    
+    @property
+    def stages(self) -> List[str]:
+        """Etapas con al menos una muestra."""
+        return list(self._rings)
+    
+    def record(self, stage: str, seconds: float) -> None:
+        """
+        Registra la duración de una etapa.
+        
+        Args:
+            stage: Nombre de la etapa ("capture", "match", ...)
+            seconds: Duración en segundos
+        """
+        if not self.enabled:
+            return
+        
+        ring = self._rings.get(stage)
+        if ring is None:
+            with self._lock:
+                ring = self._rings.setdefault(stage, _Ring(self.capacity))
+        ring.add(seconds)
+    
+    def record_all(self, timings: StageTimings) -> None:
+        """Registra todas las etapas de una operación."""
+        for stage, seconds in timings.items():
+            self.record(stage, seconds)
+    
+    def stats(self, stage: str) -> Optional[LatencyStats]:
+        """
+        Calcula las estadísticas de una etapa.
+        
+        Args:
+            stage: Nombre de la etapa
+        
+        Returns:
+            LatencyStats, o None si la etapa no tiene muestras
+        """
+        ring = self._rings.get(stage)
+        if ring is None or not ring.total:
+            return None
+        
+        values = np.asarray(ring.values())
+        p50, p95, p99 = np.percentile(values, (50, 95, 99))
+        return LatencyStats(
+            count=len(values),
+            mean=float(values.mean()),
+            p50=float(p50),
+            p95=float(p95),
+            p99=float(p99),
+            max=float(values.max()),
+        )
+    
+    def summary(self) -> Dict[str, LatencyStats]:
+        """Estadísticas de todas las etapas."""
+        return {
+            stage: stats
+            for stage in self.stages
+            if (stats := self.stats(stage)) is not None
+        }
+    
+    def format_summary(self) -> str:
+        """Resumen en texto, una etapa por línea."""
+        return "\n".join(f"{stage:<15} {stats}" for stage, stats in self.summary().items())
+    
+    def reset(self) -> None:
+        """Descarta todas las muestras."""
+        with self._lock:
+            self._rings.clear()
+
+
+class Stopwatch:
+    """
+    Mide etapas consecutivas de una operación.
+    
+    Uso:
+        watch = Stopwatch()
+        frame = source.grab()
+        watch.lap("capture")
+        result = match(frame)
+        watch.lap("match")
+        watch.timings  # {"capture": ..., "match": ...}
+    """
+    
+    __slots__ = ("started", "timings", "_last")
+    
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.timings: StageTimings = {}
+        self._last = self.started
+    
+    def lap(self, stage: str) -> float:
+        """Cierra una etapa y retorna su duración en segundos."""
+        now = time.perf_counter()
+        elapsed = now - self._last
+        self.timings[stage] = elapsed
+        self._last = now
+        return elapsed
+    
+    @property
+    def elapsed(self) -> float:
+        """Segundos desde que se creó el cronómetro."""
+        return time.perf_counter() - self.started
+
+
+# Registro compartido por detectores, controladores del mouse y automatizaciones
+_default_recorder = LatencyRecorder()
+
+
+def get_latency_recorder() -> LatencyRecorder:
+    """Retorna el registro de latencias compartido."""
+    return _default_recorder
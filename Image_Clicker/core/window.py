@@ -1,10 +1,32 @@
 """
 Módulo para manejo de ventanas de Windows.
+
+Las ventanas se consultan a través de un backend: pygetwindow (el de
+siempre) o FakeWindowBackend, que simula ventanas en memoria para pruebas
+y para Linux. Buscar una ventana por título enumera todas las ventanas del
+sistema; por eso la ventana encontrada queda en caché y después solo se
+lee su posición, que es una sola consulta. WindowWatcher usa esa consulta
+para notar si la ventana se movió o cambió de tamaño y actualizar la
+región de búsqueda de los detectores.
+
+Coordenadas relativas: por defecto se usa el área cliente de la ventana
+(sin bordes ni barra de título). Con WindowFrameSource (core/frame_source.py)
+y MouseController(window=...) las regiones de búsqueda, las condiciones de
+píxeles y las ROI se guardan relativas a esa área, y la posición de la
+ventana se suma solo al capturar y al hacer clic: si la ventana se mueve,
+todo sigue valiendo sin recalcular nada.
 """
-import pygetwindow as gw
-from typing import Optional, Tuple
+import ctypes
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from dataclasses import dataclass
 
+from config.settings import WINDOW_CONFIG
+
+
+Region = Tuple[int, int, int, int]  # (x, y, width, height)
+
 
 @dataclass
 class WindowRegion:
@@ -17,54 +39,329 @@ class WindowRegion:
     def as_tuple(self) -> Tuple[int, int, int, int]:
         """Retorna la región como tupla (x, y, width, height)."""
         return (self.x, self.y, self.width, self.height)
+    
+    def to_screen(self, x: int, y: int) -> Tuple[int, int]:
+        """Convierte un punto relativo a la ventana en coordenadas de pantalla."""
+        return (self.x + x, self.y + y)
+    
+    def to_window(self, x: int, y: int) -> Tuple[int, int]:
+        """Convierte un punto de pantalla en coordenadas relativas a la ventana."""
+        return (x - self.x, y - self.y)
+    
+    def region_to_screen(self, region: Region) -> Region:
+        """Convierte una región relativa a la ventana en coordenadas de pantalla."""
+        x, y, width, height = region
+        return (self.x + x, self.y + y, width, height)
+    
+    def region_to_window(self, region: Region) -> Region:
+        """Convierte una región de pantalla en coordenadas relativas a la ventana."""
+        x, y, width, height = region
+        return (x - self.x, y - self.y, width, height)
+
+
+class WindowBackend:
+    """Interfaz común de los backends de ventanas."""
+    
+    name = "base"
+    
+    def find(self, title: str, partial_match: bool = True) -> Optional[Any]:
+        """Busca una ventana por título (enumera todas las ventanas)."""
+        raise NotImplementedError
+    
+    def title(self, window: Any) -> Optional[str]:
+        """Título actual de la ventana, o None si ya no existe."""
+        raise NotImplementedError
+    
+    def geometry(self, window: Any) -> Optional[WindowRegion]:
+        """Posición y tamaño actuales, o None si la ventana ya no existe."""
+        raise NotImplementedError
+    
+    def client_geometry(self, window: Any) -> Optional[WindowRegion]:
+        """Área cliente (sin bordes ni barra de título) en coordenadas de pantalla."""
+        return self.geometry(window)
+    
+    def is_minimized(self, window: Any) -> bool:
+        raise NotImplementedError
+    
+    def restore(self, window: Any) -> None:
+        raise NotImplementedError
+    
+    def activate(self, window: Any) -> None:
+        raise NotImplementedError
+
+
+class _RECT(ctypes.Structure):
+    _fields_ = [
+        ("left", ctypes.c_int32),
+        ("top", ctypes.c_int32),
+        ("right", ctypes.c_int32),
+        ("bottom", ctypes.c_int32),
+    ]
+
+
+class _POINT(ctypes.Structure):
+    _fields_ = [("x", ctypes.c_int32), ("y", ctypes.c_int32)]
+
+
+class PyGetWindowBackend(WindowBackend):
+    """Ventanas con pygetwindow."""
+    
+    name = "pygetwindow"
+    
+    def __init__(self):
+        import pygetwindow
+        self._gw = pygetwindow
+    
+    def find(self, title: str, partial_match: bool = True) -> Optional[Any]:
+        windows = self._gw.getWindowsWithTitle(title)
+        if not partial_match:
+            windows = [window for window in windows if window.title == title]
+        return windows[0] if windows else None
+    
+    def title(self, window: Any) -> Optional[str]:
+        try:
+            return window.title
+        except Exception:
+            return None
+    
+    def geometry(self, window: Any) -> Optional[WindowRegion]:
+        try:
+            left, top, width, height = window.box  # Una sola consulta del rectángulo
+        except Exception:
+            return None
+        return WindowRegion(x=left, y=top, width=width, height=height)
+    
+    def client_geometry(self, window: Any) -> Optional[WindowRegion]:
+        hwnd = getattr(window, "_hWnd", None)
+        if sys.platform != "win32" or hwnd is None:
+            return self.geometry(window)
+        
+        user32 = ctypes.windll.user32
+        rect = _RECT()
+        corner = _POINT()
+        if not user32.GetClientRect(hwnd, ctypes.byref(rect)):
+            return None
+        if not user32.ClientToScreen(hwnd, ctypes.byref(corner)):
+            return None
+        return WindowRegion(x=corner.x, y=corner.y, width=rect.right, height=rect.bottom)
+    
+    def is_minimized(self, window: Any) -> bool:
+        return window.isMinimized
+    
+    def restore(self, window: Any) -> None:
+        window.restore()
+    
+    def activate(self, window: Any) -> None:
+        window.activate()
+
+
+@dataclass
+class FakeWindow:
+    """Ventana simulada de FakeWindowBackend."""
+    title: str
+    region: WindowRegion
+    client_inset: Tuple[int, int, int, int] = (0, 0, 0, 0)  # Bordes: izquierda, arriba, derecha, abajo
+    minimized: bool = False
+    active: bool = False
+    closed: bool = False
+
+
+class FakeWindowBackend(WindowBackend):
+    """
+    Backend con ventanas en memoria (pruebas y Linux sin ventanas).
+    
+    Las ventanas se mueven con move() o modificando FakeWindow.region, y
+    cuenta cuántas veces se enumeraron las ventanas (find_calls).
+    """
+    
+    name = "fake"
+    
+    def __init__(self, windows: Dict[str, Region] = None):
+        """
+        Inicializa el backend.
+        
+        Args:
+            windows: Ventanas iniciales {título: (x, y, width, height)}
+        """
+        self.windows: List[FakeWindow] = []
+        self.find_calls = 0
+        for title, region in (windows or {}).items():
+            self.add(title, region)
+    
+    def add(
+        self,
+        title: str,
+        region: Region,
+        client_inset: Tuple[int, int, int, int] = (0, 0, 0, 0)
+    ) -> FakeWindow:
+        """
+        Agrega una ventana.
+        
+        Args:
+            title: Título de la ventana
+            region: Región de la ventana completa (x, y, width, height)
+            client_inset: Bordes alrededor del área cliente (izquierda,
+                          arriba, derecha, abajo)
+        
+        Returns:
+            La ventana agregada
+        """
+        window = FakeWindow(title, WindowRegion(*region), client_inset)
+        self.windows.append(window)
+        return window
+    
+    def move(self, title: str, region: Region) -> None:
+        """Mueve o cambia de tamaño la primera ventana con ese título."""
+        self._first(title).region = WindowRegion(*region)
+    
+    def close(self, title: str) -> None:
+        """Cierra la primera ventana con ese título."""
+        window = self._first(title)
+        window.closed = True
+        self.windows.remove(window)
+    
+    def find(self, title: str, partial_match: bool = True) -> Optional[FakeWindow]:
+        self.find_calls += 1
+        for window in self.windows:
+            if window.title == title or (partial_match and title in window.title):
+                return window
+        return None
+    
+    def title(self, window: FakeWindow) -> Optional[str]:
+        return None if window.closed else window.title
+    
+    def geometry(self, window: FakeWindow) -> Optional[WindowRegion]:
+        if window.closed:
+            return None
+        return WindowRegion(*window.region.as_tuple())
+    
+    def client_geometry(self, window: FakeWindow) -> Optional[WindowRegion]:
+        if window.closed:
+            return None
+        left, top, right, bottom = window.client_inset
+        x, y, width, height = window.region.as_tuple()
+        return WindowRegion(x + left, y + top, width - left - right, height - top - bottom)
+    
+    def is_minimized(self, window: FakeWindow) -> bool:
+        return window.minimized
+    
+    def restore(self, window: FakeWindow) -> None:
+        window.minimized = False
+    
+    def activate(self, window: FakeWindow) -> None:
+        window.minimized = False
+        window.active = True
+    
+    def _first(self, title: str) -> FakeWindow:
+        for window in self.windows:
+            if title in window.title:
+                return window
+        raise KeyError(f"No hay una ventana '{title}'")
+
+
+_BACKENDS = {
+    PyGetWindowBackend.name: PyGetWindowBackend,
+    FakeWindowBackend.name: FakeWindowBackend,
+}
+
+_backend: Optional[WindowBackend] = None
+_windows: Dict[str, Any] = {}  # Ventanas ya encontradas, por título
 
 
-def find_window(title: str, partial_match: bool = True) -> Optional[gw.Window]:
+def create_window_backend(backend: str = None) -> WindowBackend:
+    """
+    Crea un backend de ventanas.
+    
+    Args:
+        backend: "pygetwindow" o "fake"
+    
+    Returns:
+        Instancia del backend
+    """
+    backend = backend or WINDOW_CONFIG["backend"]
+    if backend not in _BACKENDS:
+        raise ValueError(f"Backend de ventanas desconocido: {backend}")
+    return _BACKENDS[backend]()
+
+
+def get_window_backend() -> WindowBackend:
+    """Retorna el backend de ventanas compartido (se crea al primer uso)."""
+    global _backend
+    if _backend is None:
+        _backend = create_window_backend()
+    return _backend
+
+
+def set_window_backend(backend: WindowBackend) -> None:
+    """Reemplaza el backend compartido (p. ej. por un FakeWindowBackend) y vacía la caché."""
+    global _backend
+    _backend = backend
+    _windows.clear()
+
+
+def find_window(title: str, partial_match: bool = True) -> Optional[Any]:
     """
     Busca una ventana por su título.
     
     Args:
         title: Título de la ventana a buscar
         partial_match: Si buscar coincidencia parcial
-        
+    
     Returns:
         La ventana encontrada o None
     """
     try:
-        if partial_match:
-            windows = gw.getWindowsWithTitle(title)
-            return windows[0] if windows else None
-        else:
-            return gw.getWindowsWithTitle(title)[0]
-    except (IndexError, Exception):
+        return get_window_backend().find(title, partial_match)
+    except Exception:
         return None
 
 
-def get_window_region(title: str) -> Optional[WindowRegion]:
+def _cached_window(title: str) -> Tuple[Optional[Any], Optional[WindowRegion]]:
+    """
+    Retorna la ventana con ese título y su región, buscándola solo si la
+    de la caché ya no existe o cambió de título.
+    """
+    backend = get_window_backend()
+    window = _windows.get(title)
+    if window is not None:
+        current = backend.title(window)
+        geometry = backend.geometry(window) if current and title in current else None
+        if geometry is not None:
+            return window, geometry
+    
+    window = find_window(title)
+    if window is None:
+        _windows.pop(title, None)
+        return None, None
+    _windows[title] = window
+    return window, backend.geometry(window)
+
+
+def get_window_region(title: str, client: bool = None) -> Optional[WindowRegion]:
     """
     Obtiene la región de una ventana por su título.
     
     Args:
         title: Título de la ventana
-        
+        client: Solo el área cliente, sin bordes ni barra de título
+                (por defecto WINDOW_CONFIG["client_area"])
+    
     Returns:
         WindowRegion con las coordenadas o None si no se encuentra
     """
-    window = find_window(title)
+    client = client if client is not None else WINDOW_CONFIG["client_area"]
+    window, region = _cached_window(title)
     
     if window is None:
         return None
     
     # Asegurarse de que la ventana esté visible
-    if window.isMinimized:
-        window.restore()
+    backend = get_window_backend()
+    if backend.is_minimized(window):
+        backend.restore(window)
+        region = backend.geometry(window)
     
-    return WindowRegion(
-        x=window.left,
-        y=window.top,
-        width=window.width,
-        height=window.height
-    )
+    return backend.client_geometry(window) if client else region
 
 
 def focus_window(title: str) -> bool:
@@ -73,19 +370,187 @@ def focus_window(title: str) -> bool:
     
     Args:
         title: Título de la ventana
-        
+    
     Returns:
         True si se pudo enfocar la ventana
     """
-    window = find_window(title)
+    window, _ = _cached_window(title)
     
     if window is None:
         return False
     
+    backend = get_window_backend()
     try:
-        if window.isMinimized:
-            window.restore()
-        window.activate()
+        if backend.is_minimized(window):
+            backend.restore(window)
+        backend.activate(window)
         return True
     except Exception:
         return False
+
+
+def shift_region(region: Optional[Region], old: WindowRegion, new: WindowRegion) -> Optional[Region]:
+    """
+    Traslada una región de búsqueda cuando la ventana se mueve.
+    
+    Si la región era la ventana completa pasa a ser la ventana nueva; si
+    era una parte, se mueve lo mismo que la ventana y se recorta a ella.
+    
+    Args:
+        region: Región (x, y, width, height), o None (pantalla completa)
+        old: Región anterior de la ventana
+        new: Región nueva de la ventana
+    
+    Returns:
+        Región trasladada
+    """
+    if region is None:
+        return None
+    if tuple(region) == old.as_tuple():
+        return new.as_tuple()
+    
+    x, y, width, height = region
+    x += new.x - old.x
+    y += new.y - old.y
+    left, top = max(x, new.x), max(y, new.y)
+    right = min(x + width, new.x + new.width)
+    bottom = min(y + height, new.y + new.height)
+    return (left, top, max(right - left, 1), max(bottom - top, 1))
+
+
+class WindowWatcher:
+    """
+    Sigue la posición y el tamaño de una ventana.
+    
+    poll() lee el rectángulo de la ventana (ya encontrada) como mucho una
+    vez cada interval segundos y, si cambió, avisa a los suscriptores.
+    Se llama desde el mismo ciclo que busca la imagen, así la región de los
+    detectores nunca cambia en medio de una búsqueda.
+    
+    También es el origen de las coordenadas relativas a la ventana (ver
+    to_screen y to_window): WindowFrameSource y MouseController(window=...)
+    leen region en cada captura y cada clic.
+    """
+    
+    def __init__(
+        self,
+        title: str,
+        backend: WindowBackend = None,
+        interval: float = None,
+        refind_interval: float = None,
+        client: bool = None
+    ):
+        """
+        Inicializa el seguimiento.
+        
+        Args:
+            title: Título (o parte) de la ventana
+            backend: Backend de ventanas (por defecto el compartido)
+            interval: Segundos mínimos entre dos lecturas de la posición
+            refind_interval: Segundos mínimos entre dos búsquedas por título
+                             si la ventana se cerró
+            client: Seguir el área cliente en lugar de la ventana completa
+                    (por defecto WINDOW_CONFIG["client_area"])
+        """
+        self.title = title
+        self.backend = backend or get_window_backend()
+        self.interval = interval if interval is not None else WINDOW_CONFIG["poll_interval"]
+        self.refind_interval = (
+            refind_interval if refind_interval is not None
+            else WINDOW_CONFIG["refind_interval"]
+        )
+        self.client = client if client is not None else WINDOW_CONFIG["client_area"]
+        
+        self.region: Optional[WindowRegion] = None
+        self.changes = 0
+        self._window: Optional[Any] = None
+        self._listeners: List[Callable[[WindowRegion, WindowRegion], None]] = []
+        self._next_poll = 0.0
+        self._next_find = 0.0
+        
+        self.poll(force=True)
+    
+    def subscribe(self, callback: Callable[[WindowRegion, WindowRegion], None]) -> None:
+        """
+        Registra una función a llamar con (región anterior, región nueva)
+        cada vez que la ventana se mueve o cambia de tamaño.
+        """
+        self._listeners.append(callback)
+    
+    def follow(self, target: Any) -> None:
+        """
+        Mantiene la región de target (p. ej. un ImageDetector) alineada con
+        la ventana (ver shift_region).
+        
+        Args:
+            target: Objeto con un atributo region (x, y, width, height)
+        """
+        def update(old: WindowRegion, new: WindowRegion) -> None:
+            target.region = shift_region(target.region, old, new)
+        self.subscribe(update)
+    
+    def to_screen(self, x: int, y: int) -> Tuple[int, int]:
+        """Convierte un punto relativo a la ventana en coordenadas de pantalla."""
+        return self._current().to_screen(x, y)
+    
+    def to_window(self, x: int, y: int) -> Tuple[int, int]:
+        """Convierte un punto de pantalla en coordenadas relativas a la ventana."""
+        return self._current().to_window(x, y)
+    
+    def poll(self, force: bool = False) -> Optional[WindowRegion]:
+        """
+        Lee la posición de la ventana si ya pasó interval desde la última lectura.
+        
+        Args:
+            force: Leerla aunque no haya pasado interval
+        
+        Returns:
+            La región nueva si cambió; None si no cambió, no tocaba leerla,
+            la ventana está minimizada o no se encuentra
+        """
+        now = time.perf_counter()
+        if not force and now < self._next_poll:
+            return None
+        self._next_poll = now + self.interval
+        
+        geometry = self._geometry(now)
+        if geometry is None or geometry == self.region:
+            return None
+        
+        old, self.region = self.region, geometry
+        if old is not None:
+            self.changes += 1
+            for callback in self._listeners:
+                callback(old, geometry)
+        return geometry
+    
+    def _current(self) -> WindowRegion:
+        """Última región conocida (falla si la ventana nunca se encontró)."""
+        if self.region is None:
+            raise RuntimeError(f"No se encontró la ventana '{self.title}'")
+        return self.region
+    
+    def _rect(self, window: Any) -> Optional[WindowRegion]:
+        """Rectángulo seguido: el área cliente o la ventana completa."""
+        if self.client:
+            return self.backend.client_geometry(window)
+        return self.backend.geometry(window)
+    
+    def _geometry(self, now: float) -> Optional[WindowRegion]:
+        """Región actual de la ventana; la busca de nuevo solo si se cerró."""
+        if self._window is not None:
+            geometry = self._rect(self._window)
+            if geometry is not None:
+                return None if self.backend.is_minimized(self._window) else geometry
+            self._window = None
+        
+        if now < self._next_find:
+            return None
+        self._next_find = now + self.refind_interval
+        try:
+            self._window = self.backend.find(self.title)
+        except Exception:
+            self._window = None
+        if self._window is None or self.backend.is_minimized(self._window):
+            return None
+        return self._rect(self._window)
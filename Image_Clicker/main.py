@@ -8,7 +8,12 @@ Uso:
     2. Posiciona el mouse SOBRE (o cerca de) donde aparece el dado
     3. Ejecuta: python main.py
     4. El script buscará en un cuadrado de 300x300px centrado en el mouse
+
+Perfilado (ver utils/profiler.py; salida en profiles/):
+    python main.py --profile             # cProfile
+    python main.py --profile sampling    # muestreo de la pila, menos costo
 """
+import argparse
 import sys
 import time
 from pathlib import Path
@@ -16,25 +21,47 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
 
 from core.detector import ImageDetector
+from core.frame_source import WindowFrameSource
 from core.clicker import MouseController
-from core.window import get_window_region, focus_window
-from config import IMAGES_DIR
+from core.scheduler import AdaptiveScheduler
+from core.window import WindowWatcher, get_window_region, focus_window
+from config import IMAGES_DIR, PROFILING_CONFIG
 from utils import setup_logging, get_logger
-import pyautogui
+from utils.profiler import PROFILE_MODES, ScanProfiler
 
 
 # Configuración
 WINDOW_TITLE = "CorruptionTown"
 IMAGE_NAME = "six.png"
 CONFIDENCE = 0.7
-SCAN_INTERVAL = 0.01  # 10ms - ultra rápido
+SCAN_INTERVAL = 0.01  # 10ms - ultra rápido (presupuesto por escaneo)
+IDLE_MAX_INTERVAL = 2 * SCAN_INTERVAL  # Espera máxima con la pantalla quieta (reacción <= 20ms)
 SEARCH_SIZE = 300  # Tamaño del cuadrado de búsqueda (300x300 píxeles)
 
 
-def main():
+def parse_args(argv=None) -> argparse.Namespace:
+    """Opciones de línea de comandos."""
+    parser = argparse.ArgumentParser(description="Detecta y hace clic en el Golden Die")
+    parser.add_argument(
+        "--profile", nargs="?", const=PROFILING_CONFIG["mode"], choices=PROFILE_MODES,
+        help="Perfilar el ciclo de escaneo (por defecto con PROFILING_CONFIG[\"mode\"])"
+    )
+    parser.add_argument("--profile-output", type=Path, help="Carpeta de los perfiles (por defecto profiles/)")
+    parser.add_argument("--no-tracemalloc", action="store_true", help="No contar asignaciones al perfilar")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
     """Función principal."""
+    args = parse_args(argv)
     setup_logging(level="INFO")
     logger = get_logger("main")
+    profiler = ScanProfiler(
+        enabled=True if args.profile else None,
+        mode=args.profile,
+        output_dir=args.profile_output,
+        trace_memory=False if args.no_tracemalloc else None
+    )
     
     image_path = IMAGES_DIR / IMAGE_NAME
     if not image_path.exists():
@@ -63,60 +90,85 @@ def main():
         logger.info(f"  {i}...")
         time.sleep(1)
     
+    # Coordenadas relativas al área cliente de la ventana: la búsqueda y el
+    # clic siguen valiendo si la ventana se mueve
+    watcher = WindowWatcher(WINDOW_TITLE)
+    watcher.subscribe(lambda old, new: logger.info(f"Ventana movida a ({new.x}, {new.y}) {new.width}x{new.height}"))
+    
+    # Clic rápido: sin delay; el mouse ya queda sobre el dado (hover_ready)
+    clicker = MouseController(fast=True, hover_ready=True, window=watcher)
+    
     # Capturar posición del mouse
-    mouse_pos = pyautogui.position()
+    mouse_x, mouse_y = clicker.get_position()
     
     # Calcular región de búsqueda (cuadrado centrado en el mouse)
     half_size = SEARCH_SIZE // 2
     search_region = (
-        max(region.x, mouse_pos.x - half_size),  # x: centrado en mouse
-        max(region.y, mouse_pos.y - half_size),  # y: centrado en mouse
+        max(0, mouse_x - half_size),  # x: centrado en mouse
+        max(0, mouse_y - half_size),  # y: centrado en mouse
         SEARCH_SIZE,  # ancho: cuadrado
         SEARCH_SIZE   # height: cuadrado
     )
+    clicker.prepare(mouse_x, mouse_y)
     
     logger.info("")
-    logger.info(f"[OK] Posicion capturada: X={mouse_pos.x}, Y={mouse_pos.y}")
+    logger.info(f"[OK] Posicion capturada: X={mouse_x}, Y={mouse_y}")
     logger.info(f"[OK] Buscando en cuadrado: {SEARCH_SIZE}x{SEARCH_SIZE}px")
     logger.info(f"[OK] Area reducida: {SEARCH_SIZE * SEARCH_SIZE:,} pixeles vs {region.width * region.height:,}")
     logger.info("")
     logger.info("Iniciando búsqueda ultrarrápida... (Ctrl+C para cancelar)")
     
-    # Crear detector con región reducida
+    # Crear detector con región reducida (la fuente sigue a la ventana)
     detector = ImageDetector(
         confidence=CONFIDENCE,
-        region=search_region
+        region=search_region,
+        frame_source=WindowFrameSource(watcher)
     )
-    clicker = MouseController()
+    scheduler = AdaptiveScheduler(frame_budget=SCAN_INTERVAL, max_interval=IDLE_MAX_INTERVAL)
     
     attempts = 0
+    elapsed = 0.0  # ms hasta el clic
+    center = None  # Punto del clic; se escribe en el log fuera del escaneo perfilado
     start_time = time.time()
+    scheduler.start()
     
     try:
-        while attempts < 1000:
-            attempts += 1
-            
-            result = detector.detect(image_path)
-            
-            if result.found:
-                elapsed = (time.time() - start_time) * 1000  # ms
-                center = result.center
-                
-                logger.info("")
-                logger.info(f"*** ENCONTRADO! En {elapsed:.1f}ms (intento {attempts})")
-                logger.info(f"    Posicion: ({center[0]}, {center[1]})")
-                
-                # CLIC INMEDIATO
-                clicker.click(center[0], center[1])
-                logger.info("    [OK] CLIC REALIZADO")
-                
-                return 0
-            
-            time.sleep(SCAN_INTERVAL)
-        
-        logger.warning(f"No encontrado después de {attempts} intentos")
-        return 1
-        
+        with profiler:
+            while attempts < 1000:
+                attempts += 1
+
+                with profiler.scan() as scan:
+                    result = detector.detect(image_path)
+                    scan.update(result.timings)
+
+                    if result.found:
+                        elapsed = (time.time() - start_time) * 1000  # ms
+                        center = result.center
+
+                        # CLIC INMEDIATO (los mensajes se escriben después)
+                        clicker.click(center[0], center[1])
+                        scan.update(clicker.last_timings)
+                        scan.found = True
+
+                if center is not None:
+                    logger.info("")
+                    logger.info(f"*** ENCONTRADO! En {elapsed:.1f}ms (intento {attempts})")
+                    logger.info(f"    Posicion: ({center[0]}, {center[1]})")
+                    logger.info("    [OK] CLIC REALIZADO")
+                    logger.info(f"    Confianza: {result.confidence:.3f}")
+                    stages = {**result.timings, **clicker.last_timings}
+                    logger.info("    Etapas: " + ", ".join(f"{k} {v * 1000:.1f}ms" for k, v in stages.items()))
+                    logger.info(f"    Ritmo: {scheduler.summary()}")
+                    return 0
+
+                # Dormir solo lo que falta del presupuesto; más si la pantalla no cambia
+                change = detector.last_change
+                scheduler.wait(changed=change is None or change.changed)
+
+            logger.warning(f"No encontrado después de {attempts} intentos")
+            logger.info(f"Ritmo: {scheduler.summary()}")
+            return 1
+
     except KeyboardInterrupt:
         logger.info("\nCancelado")
         return 1
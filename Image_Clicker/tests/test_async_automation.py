@@ -0,0 +1,85 @@
+"""
+Pruebas de AsyncImageClickAutomation sin pantalla (SyntheticFrameSource y
+RecordingInputBackend).
+
+Uso:
+    python -m pytest tests
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import cv2
+import numpy as np
+import pytest
+
+from core.async_automation import AsyncImageClickAutomation
+from core.clicker import MouseController
+from core.detector import ImageDetector
+from core.frame_source import SyntheticFrameSource
+from core.input_backend import RecordingInputBackend
+from core.scheduler import AdaptiveScheduler
+
+
+TARGET_AT = (120, 90)  # Esquina del objetivo en la pantalla sintética
+
+
+@pytest.fixture
+def scene(tmp_path):
+    """Template y capturas: 5 sin el objetivo (con ruido distinto) y una con él."""
+    rng = np.random.default_rng(9)
+    target = rng.integers(0, 256, (24, 24, 3), dtype=np.uint8)
+    template_path = tmp_path / "target.png"
+    cv2.imwrite(str(template_path), target)
+    
+    frames = [rng.integers(0, 40, (200, 240, 3), dtype=np.uint8) for _ in range(6)]
+    x, y = TARGET_AT
+    frames[-1][y:y + 24, x:x + 24] = target
+    return template_path, frames
+
+
+def _automation(frames, backend: RecordingInputBackend, **detector_args) -> AsyncImageClickAutomation:
+    detector = ImageDetector(
+        confidence=0.9, frame_source=SyntheticFrameSource(frames, loop=False), **detector_args
+    )
+    clicker = MouseController(backend=backend, fast=True, hover_ready=False)
+    return AsyncImageClickAutomation(detector, clicker, scan_interval=0.01)
+
+
+def test_find_and_click(scene):
+    template_path, frames = scene
+    backend = RecordingInputBackend()
+    
+    async def run():
+        async with _automation(frames, backend, change_gate=False) as automation:
+            return await automation.find_and_click(template_path, timeout=5.0)
+    
+    result = asyncio.run(run())
+    assert result.success
+    assert result.attempts == len(frames)
+    assert result.clicked_at == (TARGET_AT[0] + 12, TARGET_AT[1] + 12)
+    assert [(event.x, event.y) for event in backend.clicks] == [result.clicked_at]
+
+
+def test_backs_off_while_screen_is_static(scene):
+    template_path, frames = scene
+    
+    async def run(change_gate):
+        async with _automation(frames[:1], RecordingInputBackend(), change_gate=change_gate) as automation:
+            assert await automation.wait_for(template_path, timeout=0.5) is None
+            return automation.ticks
+    
+    # Sin cambios el intervalo crece hasta idle_max_interval (0.1s), como en el modo síncrono
+    static, paced = asyncio.run(run(True)), asyncio.run(run(False))
+    assert static < 15 < paced
+
+
+def test_scheduler_wait_async():
+    scheduler = AdaptiveScheduler(frame_budget=0.01, max_interval=0.04, backoff=2.0)
+    delays = [asyncio.run(scheduler.wait_async(changed=False)) for _ in range(3)]
+    
+    assert scheduler.cycles == 3
+    assert scheduler.interval == pytest.approx(0.04)
+    assert delays[0] < delays[1] <= 0.04
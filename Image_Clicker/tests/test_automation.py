@@ -0,0 +1,73 @@
+"""
+Pruebas de ImageClickAutomation sin pantalla (SyntheticFrameSource y
+RecordingInputBackend).
+
+Uso:
+    python -m pytest tests
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import cv2
+import numpy as np
+import pytest
+
+from core.automation import ImageClickAutomation
+from core.clicker import MouseController
+from core.detector import ImageDetector
+from core.frame_source import SyntheticFrameSource
+from core.input_backend import RecordingInputBackend
+
+
+TARGET_AT = (120, 90)  # Esquina del objetivo en la pantalla sintética
+
+
+@pytest.fixture
+def scene(tmp_path):
+    """Template y capturas: 8 sin el objetivo (con ruido distinto) y una con él."""
+    rng = np.random.default_rng(9)
+    target = rng.integers(0, 256, (24, 24, 3), dtype=np.uint8)
+    template_path = tmp_path / "target.png"
+    cv2.imwrite(str(template_path), target)
+    
+    frames = [rng.integers(0, 40, (200, 240, 3), dtype=np.uint8) for _ in range(9)]
+    x, y = TARGET_AT
+    frames[-1][y:y + 24, x:x + 24] = target
+    return template_path, frames
+
+
+def _automation(frames, backend: RecordingInputBackend) -> ImageClickAutomation:
+    detector = ImageDetector(confidence=0.9, frame_source=SyntheticFrameSource(frames, loop=False))
+    clicker = MouseController(backend=backend, fast=True, hover_ready=True)
+    return ImageClickAutomation(detector, clicker, scan_interval=0.001, max_retries=len(frames))
+
+
+def test_find_and_click(scene):
+    template_path, frames = scene
+    backend = RecordingInputBackend()
+    result = _automation(frames, backend).find_and_click(template_path)
+    
+    assert result.success
+    assert result.attempts == len(frames)
+    assert result.clicked_at == (TARGET_AT[0] + 12, TARGET_AT[1] + 12)
+    assert [(event.x, event.y) for event in backend.clicks] == [result.clicked_at]
+    assert "detect_to_click" in result.timings[-1]
+
+
+def test_continuous_prepares_once_per_target(scene):
+    template_path, frames = scene
+    backend = RecordingInputBackend()
+    automation = _automation(frames, backend)
+    
+    prepared = []
+    prepare = automation.clicker.prepare
+    automation.clicker.prepare = lambda x, y: prepared.append((x, y)) or prepare(x, y)
+    
+    clicks = automation.find_and_click_continuous(template_path, stop_after_clicks=1, track_roi=False)
+    
+    assert clicks == 1
+    assert prepared == [(120, 100)]  # Centro de la región, una sola vez en toda la sesión
+    moves = [(event.x, event.y) for event in backend.events if event.kind == "move"]
+    assert moves == [(120, 100), (TARGET_AT[0] + 12, TARGET_AT[1] + 12)]
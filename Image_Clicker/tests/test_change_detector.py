@@ -0,0 +1,95 @@
+"""
+Pruebas de FrameChangeDetector y del salteo de capturas sin cambios.
+
+Uso:
+    python -m pytest tests
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import cv2
+import numpy as np
+
+from core.change_detector import FrameChangeDetector
+from core.detector import ImageDetector
+from core.frame_source import SyntheticFrameSource
+
+
+def _target(size: int = 24) -> np.ndarray:
+    """Imagen con textura para que la correlación tenga un único máximo."""
+    rng = np.random.default_rng(7)
+    return rng.integers(0, 200, (size, size, 3), dtype=np.uint8)
+
+
+def test_gradual_change_accumulates():
+    """Pasos menores al umbral se suman hasta que el bloque cuenta como cambiado."""
+    gate = FrameChangeDetector(tile_size=16, threshold=4)
+    frame = np.zeros((64, 64), dtype=np.uint8)
+    assert gate.check(frame).changed
+    
+    changes = []
+    for value in range(1, 11):
+        frame = np.full((64, 64), value, dtype=np.uint8)
+        changes.append(gate.check(frame).changed)
+    assert changes[:4] == [False] * 4
+    assert changes[4]
+
+
+def test_small_change_inside_tile():
+    """Un cambio de pocos píxeles no se diluye en el resto del bloque."""
+    gate = FrameChangeDetector(tile_size=16, threshold=4)
+    frame = np.zeros((64, 64, 3), dtype=np.uint8)
+    gate.check(frame)
+    
+    frame = frame.copy()
+    frame[20:23, 40:43] = 30
+    change = gate.check(frame)
+    assert change.changed
+    assert change.dirty == (32, 16, 16, 16)
+
+
+def test_detector_finds_target_fading_in(tmp_path):
+    """Un objetivo que aparece de a poco termina encontrándose con el salteo activo."""
+    target = _target()
+    template_path = tmp_path / "target.png"
+    cv2.imwrite(str(template_path), target)
+    
+    background = np.full((200, 200, 3), 30, dtype=np.uint8)
+    frames = []
+    for step in range(60):
+        frame = background.copy()
+        alpha = step / 59
+        frame[80:104, 80:104] = (background[:24, :24] * (1 - alpha) + target * alpha).astype(np.uint8)
+        frames.append(frame)
+    
+    detector = ImageDetector(
+        confidence=0.9,
+        frame_source=SyntheticFrameSource(frames, loop=False),
+        change_gate=True
+    )
+    results = [detector.detect(template_path) for _ in range(len(frames) + 4)]
+    
+    assert results[-1].found
+    assert (results[-1].x, results[-1].y) == (80, 80)
+
+
+def test_detector_reuses_only_misses(tmp_path):
+    """Con la captura quieta se saltea una ausencia, pero un acierto se vuelve a buscar."""
+    target = _target()
+    template_path = tmp_path / "target.png"
+    cv2.imwrite(str(template_path), target)
+    
+    empty = np.full((200, 200, 3), 30, dtype=np.uint8)
+    with_target = empty.copy()
+    with_target[80:104, 80:104] = target
+    
+    detector = ImageDetector(confidence=0.9, frame_source=SyntheticFrameSource([empty]), change_gate=True)
+    assert not any(detector.detect(template_path).found for _ in range(3))
+    assert detector.change_gate.frames_skipped == 2
+    
+    detector = ImageDetector(confidence=0.9, frame_source=SyntheticFrameSource([with_target]), change_gate=True)
+    assert all(detector.detect(template_path).found for _ in range(3))
+    assert detector.change_gate.frames_skipped == 0
+    assert detector.change_gate.frames_matched == 3
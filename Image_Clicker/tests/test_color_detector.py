@@ -0,0 +1,70 @@
+"""
+Pruebas de ColorBlobDetector y CascadeDetector (core/color_detector.py).
+
+Uso:
+    python -m pytest tests
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import cv2
+import numpy as np
+import pytest
+
+from core.color_detector import CascadeDetector, ColorBlobDetector
+from core.frame_source import SyntheticFrameSource
+
+
+@pytest.fixture
+def scene(tmp_path):
+    """Fondo gris y una imagen dorada con textura en (120, 60)."""
+    rng = np.random.default_rng(9)
+    target = np.zeros((24, 24, 3), dtype=np.uint8)
+    target[:] = (0, 180, 230)
+    target[::3, ::3] = rng.integers(0, 120, (8, 8, 3), dtype=np.uint8)
+    template_path = tmp_path / "golden.png"
+    cv2.imwrite(str(template_path), target)
+    
+    empty = np.full((160, 240, 3), 90, dtype=np.uint8)
+    with_target = empty.copy()
+    with_target[60:84, 120:144] = target
+    return template_path, empty, with_target
+
+
+def cascade(template_path, frames, **kwargs):
+    return CascadeDetector(
+        ColorBlobDetector.from_image(template_path, downscale=1),
+        confidence=0.9,
+        frame_source=SyntheticFrameSource(frames),
+        **kwargs
+    )
+
+
+def test_finds_target_around_blob(scene):
+    template_path, _, with_target = scene
+    result = cascade(template_path, [with_target], change_gate=False).detect(template_path)
+    assert result.found and (result.x, result.y) == (120, 60)
+
+
+def test_honors_change_gate(scene):
+    template_path, empty, _ = scene
+    detector = cascade(template_path, [empty], change_gate=True)
+    assert not any(detector.detect(template_path).found for _ in range(3))
+    
+    # Solo la primera captura llega al filtro de color; las iguales se saltean
+    assert detector.change_gate.frames_skipped == 2
+    assert detector.frames_skipped == 1
+
+
+def test_clone_keeps_cascade(scene):
+    template_path, _, with_target = scene
+    detector = cascade(template_path, [with_target], change_gate=True)
+    copy = detector.clone()
+    
+    assert isinstance(copy, CascadeDetector)
+    assert copy.change_gate is None and copy.engine is not detector.engine
+    assert copy.color is not detector.color
+    assert np.array_equal(copy.color.lower, detector.color.lower)
+    assert copy.match_frame(with_target, template_path).found
@@ -0,0 +1,61 @@
+"""
+Pruebas de FeatureDetector (core/feature_detector.py).
+
+Uso:
+    python -m pytest tests
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import cv2
+import numpy as np
+import pytest
+
+from core.detector import TemplateCache, get_template_cache
+from core.feature_detector import FeatureDetector, Features
+
+
+@pytest.fixture
+def target(tmp_path):
+    rng = np.random.default_rng(3)
+    image = cv2.GaussianBlur(rng.integers(0, 256, (80, 80, 3), dtype=np.uint8), (3, 3), 0)
+    path = tmp_path / "target.png"
+    cv2.imwrite(str(path), image)
+    detector = FeatureDetector(region=(0, 0, 320, 240))
+    return detector, detector.load(path)
+
+
+def warped_match(detector, template, homography):
+    """Empareja la imagen con sus propios puntos transformados por homography."""
+    needle = detector.template_features(template)
+    points = cv2.perspectiveTransform(needle.points.reshape(-1, 1, 2), homography)
+    frame = Features(points=points.reshape(-1, 2).astype(np.float32), descriptors=needle.descriptors)
+    return detector._match(template, frame)
+
+
+def test_uses_shared_template_cache():
+    assert FeatureDetector().templates is get_template_cache()
+    cache = TemplateCache()
+    assert FeatureDetector(templates=cache).templates is cache
+
+
+def test_finds_translated_target(target):
+    detector, template = target
+    result = warped_match(detector, template, np.array([[1, 0, 100], [0, 1, 50], [0, 0, 1]], float))
+    assert result.found
+    assert (result.x, result.y, result.width, result.height) == (100, 50, 80, 80)
+
+
+def test_rejects_tiny_box(target):
+    detector, template = target
+    result = warped_match(detector, template, np.array([[0.1, 0, 100], [0, 0.1, 50], [0, 0, 1]], float))
+    assert not result.found
+
+
+def test_rejects_non_convex_box(target):
+    detector, template = target
+    # La mitad derecha de la imagen cruza el horizonte: la caja queda cruzada
+    result = warped_match(detector, template, np.array([[1, 0, 0], [0, 1, 0], [-2 / 80, 0, 1]], float))
+    assert not result.found
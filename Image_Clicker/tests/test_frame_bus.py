@@ -0,0 +1,101 @@
+"""
+Pruebas del bus de capturas en un solo proceso (core/frame_bus.py).
+
+Uso:
+    python -m pytest tests
+"""
+import os
+import sys
+import time
+from itertools import count
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+import pytest
+
+from core.frame_bus import BusFrameSource, FrameBus
+
+
+REGION = (10, 20, 64, 48)
+_names = count()
+
+
+@pytest.fixture
+def bus():
+    bus = FrameBus.create(REGION, name=f"icbus_test_{os.getpid()}_{next(_names)}", slots=3)
+    yield bus
+    bus.close()
+
+
+def _frame(value: int) -> np.ndarray:
+    frame = np.full((REGION[3], REGION[2], 3), value, dtype=np.uint8)
+    frame[value % REGION[3], :, 0] = 255  # Distinta de las demás también en una fila
+    return frame
+
+
+def test_publish_and_read(bus):
+    assert bus.read() is None
+    
+    for value in range(1, 6):
+        assert bus.publish(_frame(value), timestamp=float(value)) == value
+    
+    frame = bus.read()
+    assert frame.number == bus.latest == 5
+    assert frame.timestamp == 5.0
+    assert np.array_equal(frame.image, _frame(5))
+    assert bus.read(after=5) is None
+
+
+def test_view_valid_for_slots_minus_one_publications(bus):
+    bus.publish(_frame(1))
+    frame = bus.read()
+    
+    bus.publish(_frame(2))
+    bus.publish(_frame(3))
+    assert bus.valid(frame)
+    assert np.array_equal(frame.image, _frame(1))
+    
+    bus.publish(_frame(4))  # Vuelve al mismo slot
+    assert not bus.valid(frame)
+
+
+def test_read_gives_up_while_slot_is_being_written(bus):
+    bus.publish(_frame(1))
+    slot = bus.latest % bus.slots
+    bus._table["seq"][slot] += 1  # Como si el productor estuviera escribiendo ese slot
+    
+    start = time.perf_counter()
+    assert bus.read() is None
+    assert time.perf_counter() - start < 0.5
+    
+    bus._table["seq"][slot] += 1
+    assert bus.read().number == 1
+
+
+def test_source_crops_and_counts_missed(bus):
+    source = BusFrameSource(bus, region=(20, 30, 16, 8), timeout=0.01)
+    copying = BusFrameSource(bus, region=(20, 30, 16, 8), copy=True, timeout=0.01)
+    
+    bus.publish(_frame(1))
+    assert np.array_equal(source.grab(), _frame(1)[10:18, 10:26])
+    
+    for value in range(2, 5):
+        bus.publish(_frame(value))
+    view = source.grab()
+    copy = copying.grab()
+    assert np.array_equal(view, _frame(4)[10:18, 10:26])
+    assert np.array_equal(copy, view)
+    assert source.frames_missed == 2
+    
+    # Sin capturas nuevas se repite la última
+    assert source.grab() is not None and source.last.number == 4
+    
+    for value in range(5, 8):
+        bus.publish(_frame(value))
+    assert not source.valid() and copying.valid()
+    assert np.array_equal(copy, _frame(4)[10:18, 10:26])
+    
+    with pytest.raises(ValueError):
+        source.set_region((0, 0, 16, 8))
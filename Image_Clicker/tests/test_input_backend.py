@@ -0,0 +1,85 @@
+"""
+Pruebas de MouseController con RecordingInputBackend (core/input_backend.py).
+
+Uso:
+    python -m pytest tests
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+
+from config.settings import BEHAVIOR_CONFIG
+from core.clicker import ClickType, MouseController
+from core.input_backend import RecordingInputBackend, Win32InputBackend, create_input_backend
+from core.window import FakeWindowBackend, WindowWatcher
+
+
+def _kinds(backend: RecordingInputBackend):
+    return [(event.kind, event.x, event.y, event.button) for event in backend.events]
+
+
+def test_default_backend_is_pyautogui():
+    # win32 (SendInput) y auto hay que pedirlos: cambian el failsafe de pyautogui
+    assert BEHAVIOR_CONFIG["input_backend"] == "pyautogui"
+
+
+def test_create_input_backend():
+    assert isinstance(create_input_backend("record"), RecordingInputBackend)
+    with pytest.raises(ValueError):
+        create_input_backend("teclado")
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Solo fuera de Windows")
+def test_win32_backend_needs_windows():
+    with pytest.raises(OSError):
+        Win32InputBackend()
+
+
+def test_click_moves_and_clicks():
+    backend = RecordingInputBackend()
+    clicker = MouseController(backend=backend, fast=True)
+    
+    assert clicker.click(100, 200)
+    assert clicker.click(100, 200, click_type=ClickType.RIGHT)
+    assert clicker.click(50, 60, click_type=ClickType.DOUBLE)
+    
+    assert _kinds(backend) == [
+        ("move", 100, 200, None), ("press", 100, 200, "left"), ("release", 100, 200, "left"),
+        ("press", 100, 200, "right"), ("release", 100, 200, "right"),  # Ya estaba ahí
+        ("move", 50, 60, None),
+        ("press", 50, 60, "left"), ("release", 50, 60, "left"),
+        ("press", 50, 60, "left"), ("release", 50, 60, "left"),
+    ]
+    assert len(backend.clicks) == 4
+    assert set(clicker.last_timings) == {"click_delay", "click_dispatch"}
+
+
+def test_hover_ready_clicks_without_moving():
+    backend = RecordingInputBackend()
+    clicker = MouseController(backend=backend, fast=True, hover_ready=True)
+    
+    assert clicker.prepare(300, 400)
+    assert clicker.prepare(300, 400)  # Ya está ahí: no se mueve de nuevo
+    backend.clear()
+    
+    clicker.click(300, 400)
+    assert [event.kind for event in backend.events] == ["press", "release"]
+    
+    assert not MouseController(backend=RecordingInputBackend(), hover_ready=False).prepare(1, 1)
+
+
+def test_coordinates_relative_to_window():
+    windows = FakeWindowBackend({"Juego": (100, 50, 640, 480)})
+    watcher = WindowWatcher("Juego", backend=windows, interval=0, client=False)
+    backend = RecordingInputBackend(position=(110, 70))
+    clicker = MouseController(backend=backend, fast=True, window=watcher)
+    
+    assert clicker.get_position() == (10, 20)
+    clicker.click(10, 20)
+    windows.move("Juego", (300, 200, 640, 480))
+    clicker.click(10, 20)
+    
+    assert [(event.x, event.y) for event in backend.clicks] == [(110, 70), (310, 220)]
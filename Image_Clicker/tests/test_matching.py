@@ -0,0 +1,80 @@
+"""
+Pruebas de los máximos locales y la supresión de no máximos (core/matching.py).
+
+Uso:
+    python -m pytest tests
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from core.matching import local_maxima, non_max_suppression
+
+
+def _score_map(peaks, shape=(100, 100)) -> np.ndarray:
+    """Mapa de puntajes con un cono alrededor de cada pico {(x, y): puntaje}."""
+    ys, xs = np.mgrid[:shape[0], :shape[1]]
+    score_map = np.zeros(shape, dtype=np.float32)
+    for (x, y), score in peaks.items():
+        cone = score - 0.02 * np.hypot(xs - x, ys - y)
+        np.maximum(score_map, cone.astype(np.float32), out=score_map)
+    return score_map
+
+
+def test_local_maxima_keeps_one_point_per_peak():
+    score_map = _score_map({(20, 30): 0.95, (70, 60): 0.9, (50, 10): 0.5})
+    xs, ys, scores = local_maxima(score_map, 0.8)
+    
+    found = sorted((x, y, round(float(score), 2)) for x, y, score in zip(xs, ys, scores))
+    assert found == [(20, 30, 0.95), (70, 60, 0.9)]
+
+
+def test_local_maxima_below_threshold():
+    xs, ys, scores = local_maxima(_score_map({(20, 30): 0.6}), 0.8)
+    assert xs.size == ys.size == scores.size == 0
+
+
+def test_nms_suppresses_overlaps_and_orders_by_score():
+    # Cajas de 10x10: la 1 se superpone casi toda con la 0; la 2 está lejos
+    xs = np.array([10, 11, 50, 13])
+    ys = np.array([10, 10, 50, 40])
+    scores = np.array([0.8, 0.9, 0.85, 0.7], dtype=np.float32)
+    
+    keep = non_max_suppression(xs, ys, scores, 10, 10, iou=0.3, max_results=None)
+    assert keep.tolist() == [1, 2, 3]
+
+
+def test_nms_iou_threshold():
+    # Desplazamiento de 5 px en x: intersección 50, IoU = 50 / 150 = 0.33
+    xs = np.array([0, 5])
+    ys = np.array([0, 0])
+    scores = np.array([0.9, 0.8], dtype=np.float32)
+    
+    assert non_max_suppression(xs, ys, scores, 10, 10, iou=0.3).tolist() == [0]
+    assert non_max_suppression(xs, ys, scores, 10, 10, iou=0.4).tolist() == [0, 1]
+
+
+def test_nms_max_results():
+    xs = np.array([0, 100, 200, 300])
+    ys = np.zeros(4, dtype=int)
+    scores = np.array([0.7, 0.9, 0.8, 0.95], dtype=np.float32)
+    
+    keep = non_max_suppression(xs, ys, scores, 10, 10, iou=0.3, max_results=2)
+    assert keep.tolist() == [3, 1]
+
+
+def test_nms_ties_keep_input_order():
+    xs = np.array([0, 100, 200])
+    ys = np.zeros(3, dtype=int)
+    scores = np.full(3, 0.9, dtype=np.float32)
+    
+    assert non_max_suppression(xs, ys, scores, 10, 10, iou=0.3).tolist() == [0, 1, 2]
+
+
+def test_nms_empty():
+    empty = np.empty(0, dtype=np.intp)
+    keep = non_max_suppression(empty, empty, np.empty(0, dtype=np.float32), 10, 10)
+    assert keep.size == 0
@@ -0,0 +1,56 @@
+"""
+Pruebas de ParallelDetector (core/parallel_detector.py).
+
+Uso:
+    python -m pytest tests
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import cv2
+import numpy as np
+import pytest
+
+from core.parallel_detector import ParallelDetector, split_tiles
+
+
+@pytest.fixture
+def scene(tmp_path):
+    rng = np.random.default_rng(5)
+    frame = rng.integers(0, 256, (240, 320, 3), dtype=np.uint8)
+    template_path = tmp_path / "target.png"
+    cv2.imwrite(str(template_path), frame[150:182, 200:232])
+    return frame, template_path
+
+
+def test_split_tiles_cover_every_position():
+    tiles = split_tiles(320, 240, (32, 32), 4)
+    covered = np.zeros((240 - 31, 320 - 31), dtype=bool)
+    for x, y, width, height in tiles:
+        covered[y:y + height - 31, x:x + width - 31] = True
+    assert covered.all()
+
+
+def test_finds_target_in_workers(scene):
+    frame, template_path = scene
+    with ParallelDetector(workers=2, min_area=0, confidence=0.9, change_gate=False) as detector:
+        result = detector.match_frame(frame, template_path, (10, 20))
+        assert detector.running
+    assert result.found and (result.x, result.y) == (210, 170)
+
+
+def test_dead_worker_raises_clear_error(scene):
+    frame, template_path = scene
+    with ParallelDetector(workers=2, min_area=0, confidence=0.9, change_gate=False) as detector:
+        detector.start()
+        detector._processes[0].kill()
+        detector._processes[0].join()
+        
+        with pytest.raises(RuntimeError, match="terminó inesperadamente"):
+            detector.match_frame(frame, template_path, (0, 0))
+        assert not detector.running
+        
+        # La próxima búsqueda vuelve a arrancar los procesos
+        assert detector.match_frame(frame, template_path, (0, 0)).found
@@ -0,0 +1,138 @@
+"""
+Pruebas de las reglas de píxeles compiladas (core/pixel_rules.py).
+
+Uso:
+    python -m pytest tests
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+import pytest
+
+from core.frame_source import SyntheticFrameSource
+from core.pixel_detector import PixelCondition, PixelDetector
+from core.pixel_rules import (
+    RULE_ALL, RULE_ANY, RULE_K_OF_N, RULE_WEIGHTED, PixelRuleSet, cached_hsv_table, parse_conditions
+)
+
+
+RED = (220, 20, 30)  # RGB
+GREEN = (20, 200, 40)
+BLUE = (10, 30, 210)
+
+
+def _frame(pixels) -> np.ndarray:
+    """Captura negra de 20x20 con algunos píxeles pintados {(x, y): RGB}."""
+    frame = np.zeros((20, 20, 3), dtype=np.uint8)
+    for (x, y), rgb in pixels.items():
+        frame[y, x] = rgb[::-1]
+    return frame
+
+
+def test_parse_conditions_positional_and_keywords():
+    code = """
+PIXEL_CONDITIONS = [
+    PixelCondition(1, 2, (220, 20, 30), 15),
+    detector.PixelCondition(x=5, y=6, expected_color=(20, 200, 40), weight=2.0),
+    PixelCondition(3, 4, (10, 30, 210), hsv_range=((100, 50, 50), (130, 255, 255))),
+    print("no es una condición"),
+]
+"""
+    conditions = parse_conditions(code)
+    
+    assert [(c.x, c.y) for c in conditions] == [(1, 2), (5, 6), (3, 4)]
+    assert conditions[0].tolerance == 15
+    assert conditions[1].weight == 2.0
+    assert conditions[2].hsv_range == ((100, 50, 50), (130, 255, 255))
+
+
+def test_parse_conditions_does_not_execute_code():
+    with pytest.raises(ValueError):
+        parse_conditions("import os\nos.remove('x')")
+    with pytest.raises(ValueError):
+        parse_conditions("PixelCondition(1, 2, tuple([1, 2, 3]))")
+
+
+def test_rule_modes():
+    conditions = [
+        PixelCondition(1, 1, RED, weight=1.0),
+        PixelCondition(2, 2, GREEN, weight=1.0),
+        PixelCondition(3, 3, BLUE, weight=3.0),
+    ]
+    frame = _frame({(1, 1): RED, (3, 3): BLUE})  # GREEN no está
+    
+    results = {
+        mode: PixelRuleSet(conditions, mode=mode, k=2).evaluate(frame)
+        for mode in (RULE_ALL, RULE_ANY, RULE_K_OF_N, RULE_WEIGHTED)
+    }
+    
+    assert results[RULE_ALL].mask.tolist() == [True, False, True]
+    assert not results[RULE_ALL].matched
+    assert results[RULE_ANY].matched and results[RULE_ANY].first == 0
+    assert results[RULE_K_OF_N].matched
+    assert results[RULE_WEIGHTED].score == 4.0 and results[RULE_WEIGHTED].matched
+    assert not PixelRuleSet(conditions, mode=RULE_K_OF_N, k=3).evaluate(frame).matched
+
+
+def test_tolerance_and_origin():
+    rules = PixelRuleSet([PixelCondition(101, 51, RED, tolerance=(5, 5, 5))])
+    near = _frame({(1, 1): (224, 16, 34)})
+    far = _frame({(1, 1): (230, 20, 30)})
+    
+    assert rules.evaluate(near, origin=(100, 50)).matched
+    assert not rules.evaluate(far, origin=(100, 50)).matched
+
+
+def test_hsv_range_wraps_around_hue():
+    # El rojo está en los dos extremos del tono (170-10)
+    red_range = ((170, 100, 100), (10, 255, 255))
+    conditions = [
+        PixelCondition(1, 1, RED, tolerance=255, hsv_range=red_range),
+        PixelCondition(2, 2, BLUE, tolerance=255, hsv_range=red_range),
+    ]
+    frame = _frame({(1, 1): RED, (2, 2): BLUE})
+    
+    assert PixelRuleSet(conditions, mode=RULE_ANY).evaluate(frame).mask.tolist() == [True, False]
+    assert conditions[0].matches(RED)
+    assert not conditions[1].matches(BLUE)
+
+
+def test_vectorized_matches_per_condition():
+    rng = np.random.default_rng(3)
+    frame = rng.integers(0, 256, (20, 20, 3), dtype=np.uint8)
+    conditions = [
+        PixelCondition(
+            int(x), int(y), tuple(int(v) for v in frame[y, x][::-1] + rng.integers(-20, 21, 3)),
+            tolerance=12, hsv_range=((0, 0, 0), (179, 255, 255)) if x % 2 else None
+        )
+        for x, y in rng.integers(0, 20, (50, 2))
+    ]
+    
+    mask = PixelRuleSet(conditions, mode=RULE_ANY).evaluate(frame).mask
+    expected = [c.matches(tuple(int(v) for v in frame[c.y, c.x][::-1])) for c in conditions]
+    assert mask.tolist() == expected
+
+
+def test_cached_hsv_table_is_shared():
+    table = cached_hsv_table(([170, 100, 100], [10, 255, 255]))
+    assert table is cached_hsv_table(((170, 100, 100), (10, 255, 255)))
+    assert not table.flags.writeable
+
+
+def test_check_uses_rule_mode_by_default():
+    conditions = [PixelCondition(1, 1, RED), PixelCondition(2, 2, GREEN)]
+    source = SyntheticFrameSource([_frame({(2, 2): GREEN})])
+    
+    detector = PixelDetector(conditions, frame_source=source)
+    assert detector.check() is None  # Modo "all" por defecto
+    assert detector.check(require_all=True) is None
+    assert detector.check(require_all=False) == (2, 2)
+    
+    detector = PixelDetector(PixelRuleSet(conditions, mode=RULE_ANY), frame_source=source)
+    assert detector.check() == (2, 2)
+    
+    source = SyntheticFrameSource([_frame({(1, 1): RED, (2, 2): GREEN})])
+    assert PixelDetector(conditions, frame_source=source).check() == (1, 1)
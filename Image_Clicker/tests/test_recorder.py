@@ -0,0 +1,99 @@
+"""
+Pruebas de ida y vuelta de las grabaciones (core/recorder.py).
+
+Uso:
+    python -m pytest tests
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+import pytest
+
+from core.recorder import _HEADER, MAGIC, FrameRecorder, Recording, ReplayFrameSource
+
+
+REGION = (100, 200, 50, 37)  # Ni el ancho ni el alto son múltiplos del bloque
+
+
+def _frames(count: int = 23):
+    """Capturas con un cuadrado que se mueve, algunas repetidas (delta vacío)."""
+    rng = np.random.default_rng(11)
+    frame = rng.integers(0, 256, (REGION[3], REGION[2], 3), dtype=np.uint8)
+    frames = []
+    for number in range(count):
+        frame = frame.copy()
+        if number % 4 != 3:
+            x, y = (3 * number) % 45, (2 * number) % 33
+            frame[y:y + 4, x:x + 5] = rng.integers(0, 256, (4, 5, 3), dtype=np.uint8)
+        frames.append(frame)
+    return frames
+
+
+def _record(path: Path, frames) -> None:
+    with FrameRecorder(path, REGION, tile_size=16, keyframe_interval=5) as recorder:
+        for number, frame in enumerate(frames):
+            recorder.write(frame, timestamp=number * 0.01)
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / "session.icrec"
+    frames = _frames()
+    _record(path, frames)
+    
+    with Recording(path) as recording:
+        assert len(recording) == len(frames)
+        assert recording.region == REGION
+        assert recording.duration == pytest.approx(0.22)
+        for expected, frame in zip(frames, recording):
+            assert frame.shape == expected.shape
+            assert np.array_equal(frame, expected)
+
+
+def test_random_access(tmp_path):
+    path = tmp_path / "session.icrec"
+    frames = _frames()
+    _record(path, frames)
+    
+    with Recording(path) as recording:
+        # Adelante, atrás (vuelve a la captura completa anterior) y la misma otra vez
+        for number in (17, 3, 4, 22, 0, 12, 12, 11, 6):
+            assert np.array_equal(recording.frame(number), frames[number])
+        with pytest.raises(IndexError):
+            recording.frame(len(frames))
+
+
+def test_truncated_recording_without_index(tmp_path):
+    path = tmp_path / "session.icrec"
+    frames = _frames()
+    _record(path, frames)
+    
+    # Como si el programa se hubiera cortado: sin índice, con el último bloque a medias
+    data = bytearray(path.read_bytes())
+    _, tile, x, y, width, height, count, index_offset = _HEADER.unpack_from(data)
+    with Recording(path) as recording:
+        last_offset = int(recording.index["offset"][-1])
+    data[:_HEADER.size] = _HEADER.pack(MAGIC, tile, x, y, width, height, 0, 0)
+    truncated = tmp_path / "truncated.icrec"
+    truncated.write_bytes(bytes(data[:last_offset + 3]))
+    
+    with Recording(truncated) as recording:
+        assert len(recording) == len(frames) - 1
+        for number in (len(frames) - 2, 0, 9):
+            assert np.array_equal(recording.frame(number), frames[number])
+
+
+def test_replay_source_crops_region(tmp_path):
+    path = tmp_path / "session.icrec"
+    frames = _frames(8)
+    _record(path, frames)
+    
+    source = ReplayFrameSource(path, region=(110, 205, 20, 30))
+    try:
+        for expected in frames:
+            assert np.array_equal(source.grab(), expected[5:35, 10:30])
+        assert source.exhausted
+    finally:
+        source.close()
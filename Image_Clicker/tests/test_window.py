@@ -0,0 +1,176 @@
+"""
+Pruebas del seguimiento de ventanas con FakeWindowBackend (core/window.py).
+
+Uso:
+    python -m pytest tests
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+import pytest
+
+from core.frame_source import SyntheticFrameSource, WindowFrameSource
+from core.window import (
+    FakeWindowBackend, WindowRegion, WindowWatcher, focus_window, get_window_region, set_window_backend,
+    shift_region
+)
+
+
+@pytest.fixture
+def backend():
+    backend = FakeWindowBackend()
+    backend.add("CorruptionTown - Steam", (100, 50, 800, 600), client_inset=(8, 30, 8, 8))
+    set_window_backend(backend)
+    yield backend
+    set_window_backend(None)
+
+
+def test_window_lookup_is_cached(backend):
+    for _ in range(100):
+        region = get_window_region("CorruptionTown", client=False)
+    assert region == WindowRegion(100, 50, 800, 600)
+    assert backend.find_calls == 1
+    
+    assert get_window_region("CorruptionTown", client=True) == WindowRegion(108, 80, 784, 562)
+    assert focus_window("CorruptionTown")
+    assert backend.find_calls == 1
+
+
+def test_cached_window_follows_moves_and_refinds_when_closed(backend):
+    get_window_region("CorruptionTown", client=False)
+    backend.move("CorruptionTown", (300, 200, 640, 480))
+    assert get_window_region("CorruptionTown", client=False) == WindowRegion(300, 200, 640, 480)
+    assert backend.find_calls == 1
+    
+    backend.close("CorruptionTown")
+    assert get_window_region("CorruptionTown") is None
+    backend.add("CorruptionTown", (0, 0, 320, 240))
+    assert get_window_region("CorruptionTown", client=False) == WindowRegion(0, 0, 320, 240)
+    assert get_window_region("Otra ventana") is None
+
+
+def test_minimized_window_is_restored(backend):
+    backend.windows[0].minimized = True
+    assert get_window_region("CorruptionTown", client=False) is not None
+    assert not backend.windows[0].minimized
+
+
+def test_watcher_notifies_moves(backend):
+    watcher = WindowWatcher("CorruptionTown", backend=backend, interval=0, client=False)
+    changes = []
+    watcher.subscribe(lambda old, new: changes.append((old.as_tuple(), new.as_tuple())))
+    
+    assert watcher.region == WindowRegion(100, 50, 800, 600)
+    assert watcher.poll() is None  # Sin cambios
+    
+    backend.move("CorruptionTown", (120, 60, 800, 600))
+    assert watcher.poll() == WindowRegion(120, 60, 800, 600)
+    assert changes == [((100, 50, 800, 600), (120, 60, 800, 600))]
+    assert watcher.changes == 1
+    assert backend.find_calls == 1
+
+
+def test_watcher_poll_interval(backend):
+    watcher = WindowWatcher("CorruptionTown", backend=backend, interval=60, client=False)
+    backend.move("CorruptionTown", (0, 0, 800, 600))
+    
+    assert watcher.poll() is None  # Todavía no toca leerla
+    assert watcher.poll(force=True) == WindowRegion(0, 0, 800, 600)
+
+
+def test_watcher_ignores_minimized_and_throttles_refind(backend):
+    watcher = WindowWatcher("CorruptionTown", backend=backend, interval=0, refind_interval=60)
+    client = watcher.region
+    
+    backend.windows[0].minimized = True
+    backend.move("CorruptionTown", (0, 0, 800, 600))
+    assert watcher.poll() is None
+    assert watcher.region == client
+    backend.windows[0].minimized = False
+    
+    backend.close("CorruptionTown")
+    assert watcher.poll() is None
+    calls = backend.find_calls
+    backend.add("CorruptionTown", (10, 10, 400, 300))
+    for _ in range(10):
+        assert watcher.poll() is None  # Se vuelve a buscar recién después de refind_interval
+    assert backend.find_calls == calls
+
+
+def test_watcher_client_area_and_follow(backend):
+    watcher = WindowWatcher("CorruptionTown", backend=backend, interval=0, client=True)
+    assert watcher.region == WindowRegion(108, 80, 784, 562)
+    assert watcher.to_screen(10, 20) == (118, 100)
+    assert watcher.to_window(118, 100) == (10, 20)
+    
+    class Target:
+        region = (208, 180, 100, 100)
+    
+    target = Target()
+    watcher.follow(target)
+    backend.move("CorruptionTown", (150, 70, 800, 600))
+    watcher.poll()
+    assert target.region == (258, 200, 100, 100)
+
+
+def test_region_conversions():
+    window = WindowRegion(100, 50, 800, 600)
+    assert window.to_screen(10, 20) == (110, 70)
+    assert window.to_window(110, 70) == (10, 20)
+    assert window.region_to_screen((10, 20, 30, 40)) == (110, 70, 30, 40)
+    assert window.region_to_window((110, 70, 30, 40)) == (10, 20, 30, 40)
+
+
+def test_shift_region():
+    old = WindowRegion(100, 50, 800, 600)
+    
+    # La ventana completa pasa a ser la ventana nueva
+    assert shift_region(old.as_tuple(), old, WindowRegion(0, 0, 640, 480)) == (0, 0, 640, 480)
+    assert shift_region(None, old, WindowRegion(0, 0, 640, 480)) is None
+    
+    # Una parte se mueve con la ventana
+    assert shift_region((200, 150, 50, 50), old, WindowRegion(150, 80, 800, 600)) == (250, 180, 50, 50)
+    
+    # Y se recorta si la ventana se achica
+    assert shift_region((800, 550, 100, 100), old, WindowRegion(100, 50, 750, 560)) == (800, 550, 50, 60)
+
+
+def _screen() -> np.ndarray:
+    """Pantalla de 400x300 donde cada píxel codifica su posición."""
+    ys, xs = np.mgrid[:300, :400]
+    return np.dstack([xs % 256, ys % 256, (xs // 256) * 16 + ys // 256]).astype(np.uint8)
+
+
+def test_window_frame_source_follows_window(backend):
+    backend.move("CorruptionTown", (50, 40, 200, 150))
+    backend.windows[0].client_inset = (0, 0, 0, 0)
+    watcher = WindowWatcher("CorruptionTown", backend=backend, interval=0)
+    screen = _screen()
+    source = WindowFrameSource(watcher, region=(10, 20, 30, 40), source=SyntheticFrameSource([screen]))
+    
+    assert np.array_equal(source.grab(), screen[60:100, 60:90])
+    assert source.region == (10, 20, 30, 40)
+    
+    backend.move("CorruptionTown", (150, 100, 200, 150))
+    assert np.array_equal(source.grab(), screen[120:160, 160:190])
+    assert source.region == (10, 20, 30, 40)
+
+
+def test_window_frame_source_clips_when_window_shrinks(backend):
+    backend.move("CorruptionTown", (50, 40, 200, 150))
+    backend.windows[0].client_inset = (0, 0, 0, 0)
+    watcher = WindowWatcher("CorruptionTown", backend=backend, interval=0)
+    screen = _screen()
+    source = WindowFrameSource(watcher, region=(150, 100, 40, 40), source=SyntheticFrameSource([screen]))
+    
+    backend.move("CorruptionTown", (50, 40, 170, 120))
+    frame = source.grab()
+    assert frame.shape == (40, 40, 3)
+    assert np.array_equal(frame[:20, :20], screen[140:160, 200:220])
+    assert not frame[20:].any() and not frame[:, 20:].any()
+    
+    backend.move("CorruptionTown", (50, 40, 100, 80))  # La región quedó toda afuera
+    assert not source.grab().any()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Captura la ventana del juego y publica cada captura en el bus de capturas,
+para que main.py, identify_pixels.py y otras herramientas lean la misma
+captura en lugar de capturar la pantalla cada una por su cuenta.
+
+Los lectores usan el bus con CAPTURE_CONFIG["backend"] = "bus" (o con
+BusFrameSource directamente).
+
+Uso:
+    python tools/frame_bus.py
+    python tools/frame_bus.py --interval 0.005 --slots 4
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config.settings import CAPTURE_CONFIG
+from core.frame_bus import FrameBus
+from core.frame_source import create_frame_source
+from core.window import get_window_region, focus_window
+
+
+WINDOW_TITLE = "CorruptionTown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Publica la ventana del juego en el bus de capturas")
+    parser.add_argument("--interval", type=float, default=0.01, help="Segundos entre capturas")
+    parser.add_argument("--name", default=CAPTURE_CONFIG["bus_name"], help="Nombre del bus")
+    parser.add_argument("--slots", type=int, default=CAPTURE_CONFIG["bus_slots"], help="Capturas en el bus")
+    parser.add_argument("--backend", default=None, help="Fuente de captura (mss, pyautogui o auto)")
+    args = parser.parse_args()
+    
+    region = get_window_region(WINDOW_TITLE)
+    if region is None:
+        print(f"Error: No se encontró '{WINDOW_TITLE}'")
+        return 1
+    
+    focus_window(WINDOW_TITLE)
+    time.sleep(0.2)
+    
+    backend = args.backend or CAPTURE_CONFIG["backend"]
+    if backend == "bus":
+        backend = "auto"  # El productor captura la pantalla
+    
+    print(f"Ventana encontrada: {region.width}x{region.height}")
+    print(f"Publicando en el bus '{args.name}' cada {args.interval * 1000:.0f}ms (Ctrl+C para terminar)...")
+    
+    source = create_frame_source(backend, region=region.as_tuple())
+    bus = FrameBus.create(region.as_tuple(), name=args.name, slots=args.slots)
+    start = time.perf_counter()
+    try:
+        while True:
+            tick = time.perf_counter()
+            bus.capture(source)
+            delay = args.interval - (time.perf_counter() - tick)
+            if delay > 0:
+                time.sleep(delay)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        published = bus.latest
+        bus.close()
+        source.close()
+    
+    elapsed = time.perf_counter() - start
+    print()
+    print(f"Capturas publicadas: {published} ({published / max(elapsed, 1e-9):.1f}/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
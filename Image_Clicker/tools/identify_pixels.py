@@ -10,7 +10,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from core.pixel_detector import PixelDetector
-from core.window import get_window_region, focus_window
+from core.window import WindowWatcher, get_window_region, focus_window
 import pyautogui
 import keyboard
 
@@ -34,6 +34,9 @@ def main():
     time.sleep(0.2)
     
     print(f"Ventana encontrada: {region.width}x{region.height}")
+    
+    # Las posiciones se guardan relativas al área cliente de la ventana
+    watcher = WindowWatcher(WINDOW_TITLE)
     print()
     print("INSTRUCCIONES:")
     print("1. Mueve el mouse sobre el área donde aparece el dado (6)")
@@ -54,7 +57,7 @@ def main():
             break
             
         if keyboard.is_pressed('space'):
-            x, y, color = PixelDetector.get_mouse_position_and_color()
+            x, y, color = PixelDetector.get_mouse_position_and_color(window=watcher)
             pixels.append((x, y, color))
             print(f"✓ Píxel {len(pixels)}: pos=({x}, {y}), color=RGB{color}")
             time.sleep(0.3)  # Evitar múltiples capturas
@@ -68,11 +71,17 @@ def main():
     print("=" * 60)
     print("\nCódigo generado para main.py:\n")
     print("# Píxeles a monitorear (copiar esto al main.py)")
+    print("# Coordenadas relativas al área cliente de la ventana: usar con")
+    print("# PixelDetector(PIXEL_CONDITIONS, frame_source=WindowFrameSource(watcher, region=...))")
     print("PIXEL_CONDITIONS = [")
     for x, y, color in pixels:
         print(f"    PixelCondition(x={x}, y={y}, expected_color={color}, tolerance=15),")
     print("]")
     print()
+    print("# Para reglas k-de-n o ponderadas (ver core/pixel_rules.py):")
+    print("# rules = PixelRuleSet(PIXEL_CONDITIONS, mode=\"k_of_n\", k=...)")
+    print("# o PixelRuleSet.from_file(\"archivo_con_este_codigo.py\", ...)")
+    print()
     
     return 0
 
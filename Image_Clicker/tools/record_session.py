@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Graba la ventana del juego para ajustar la detección sin tenerlo abierto.
+La grabación se reproduce con tools/replay_session.py.
+
+Uso:
+    python tools/record_session.py --seconds 60
+    python tools/record_session.py --output recordings/dado.icrec --interval 0.02
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config.settings import RECORDINGS_DIR
+from core.frame_source import create_frame_source
+from core.recorder import RecordingFrameSource
+from core.window import get_window_region, focus_window
+
+
+WINDOW_TITLE = "CorruptionTown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Graba la ventana del juego")
+    parser.add_argument("--seconds", type=float, default=30.0, help="Duración de la grabación")
+    parser.add_argument("--interval", type=float, default=0.01, help="Segundos entre capturas")
+    parser.add_argument("--output", type=Path, help="Archivo a escribir (por defecto en recordings/)")
+    args = parser.parse_args()
+    
+    region = get_window_region(WINDOW_TITLE)
+    if region is None:
+        print(f"Error: No se encontró '{WINDOW_TITLE}'")
+        return 1
+    
+    focus_window(WINDOW_TITLE)
+    time.sleep(0.2)
+    
+    output = args.output or RECORDINGS_DIR / time.strftime("sesion_%Y%m%d_%H%M%S.icrec")
+    print(f"Ventana encontrada: {region.width}x{region.height}")
+    print(f"Grabando {args.seconds:.0f}s en {output} (Ctrl+C para terminar antes)...")
+    
+    source = RecordingFrameSource(create_frame_source(region=region.as_tuple()), output)
+    end = time.perf_counter() + args.seconds
+    try:
+        while time.perf_counter() < end:
+            source.grab()
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        source.close()
+    
+    recorder = source.recorder
+    print()
+    print(f"Capturas: {recorder.frame_count} (sin grabar por falta de tiempo: {source.frames_dropped})")
+    print(f"Tamaño: {recorder.bytes_written / 1e6:.1f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Reproduce una grabación de tools/record_session.py por el detector y
+muestra cuántas capturas coinciden y cuánto tarda cada búsqueda, para
+comparar valores de confianza, regiones de búsqueda o reglas de píxeles.
+
+Uso:
+    python tools/replay_session.py recordings/sesion.icrec --confidence 0.6 0.7 0.8
+    python tools/replay_session.py recordings/sesion.icrec --region 800 400 300 300
+    python tools/replay_session.py recordings/sesion.icrec --pixels pixeles.py --mode k_of_n --k 3
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import IMAGES_DIR
+from core.detector import ImageDetector
+from core.pixel_rules import PixelRuleSet, RULE_ALL, RULE_MODES
+from core.recorder import Recording, ReplayFrameSource
+
+
+def measure(source: ReplayFrameSource, scan, count: int):
+    """
+    Corre scan(frame, origin) sobre cada captura de la grabación.
+    
+    La lectura de la grabación no se cuenta en el tiempo.
+    
+    Returns:
+        (capturas donde scan retornó True, tiempos en ms ordenados)
+    """
+    hits = 0
+    times = []
+    for _ in range(count):
+        frame = source.grab()
+        start = time.perf_counter()
+        found = scan(frame, source.region[:2])
+        times.append((time.perf_counter() - start) * 1000)
+        hits += bool(found)
+    return hits, sorted(times)
+
+
+def report(label: str, hits: int, times, count: int) -> None:
+    p99 = times[min(len(times) - 1, int(len(times) * 0.99))]
+    print(
+        f"{label:<24} {hits:>6}/{count:<6} "
+        f"{statistics.median(times):>8.2f} {p99:>8.2f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reproduce una grabación por el detector")
+    parser.add_argument("recording", type=Path, help="Archivo .icrec")
+    parser.add_argument("--image", default="six.png", help="Imagen a buscar (en images/)")
+    parser.add_argument("--confidence", type=float, nargs="+", default=[0.7])
+    parser.add_argument("--region", type=int, nargs=4, metavar=("X", "Y", "W", "H"),
+                        help="Región de búsqueda (por defecto, toda la grabación)")
+    parser.add_argument("--speed", type=float, help="1.0 = al ritmo grabado; por defecto, lo más rápido posible")
+    parser.add_argument("--pixels", type=Path, help="Archivo con PixelCondition(...) (ver identify_pixels.py)")
+    parser.add_argument("--mode", default=RULE_ALL, choices=RULE_MODES, help="Modo de las reglas de píxeles")
+    parser.add_argument("--k", type=int, help="Mínimo de píxeles (modo k_of_n)")
+    args = parser.parse_args()
+    
+    with Recording(args.recording) as recording:
+        count = len(recording)
+        x, y, width, height = recording.region
+        print(f"Grabación: {count} capturas, {recording.duration:.1f}s, región {width}x{height} en ({x}, {y})")
+    
+    print()
+    print(f"{'prueba':<24} {'coinciden':>13} {'p50 ms':>8} {'p99 ms':>8}")
+    
+    for confidence in args.confidence:
+        with ReplayFrameSource(args.recording, region=args.region, speed=args.speed) as source:
+            detector = ImageDetector(confidence=confidence, frame_source=source)
+            image = detector.load(IMAGES_DIR / args.image)
+            hits, times = measure(source, lambda frame, origin: detector.match_frame(frame, image, origin).found, count)
+        report(f"{args.image} @ {confidence}", hits, times, count)
+    
+    if args.pixels:
+        rules = PixelRuleSet.from_file(args.pixels, mode=args.mode, k=args.k)
+        with ReplayFrameSource(args.recording, region=rules.bounds, speed=args.speed) as source:
+            hits, times = measure(source, lambda frame, origin: rules.evaluate(frame, origin).matched, count)
+        report(f"píxeles ({args.mode})", hits, times, count)
+    
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,7 @@
 """
 Utilidades del proyecto.
 """
-from utils.logger import setup_logging, get_logger
+from utils.logger import setup_logging, shutdown_logging, get_logger
+from utils.profiler import ScanProfiler
 
-__all__ = ["setup_logging", "get_logger"]
+__all__ = ["setup_logging", "shutdown_logging", "get_logger", "ScanProfiler"]
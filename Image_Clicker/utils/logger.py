@@ -1,17 +1,105 @@
 """
 Utilidades de logging para el proyecto.
+
+En modo asíncrono (LOGGING_CONFIG["async"]) los mensajes pasan por una cola
+acotada y un hilo aparte los formatea y escribe, así el ciclo de
+captura-búsqueda-clic nunca espera a la consola ni al archivo, ni siquiera
+en nivel DEBUG. Para que el formateo también quede fuera del ciclo, los
+mensajes frecuentes usan argumentos en lugar de f-strings:
+
+    logger.debug("Intento %d/%d", intento, maximo)
 """
+import atexit
 import logging
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional, Tuple
 
 from config.settings import LOGGING_CONFIG, LOGS_DIR
 
 
+DROP_POLICIES = ("newest", "oldest")
+
+_listener: Optional["DrainingQueueListener"] = None
+_queue_handler: Optional["BoundedQueueHandler"] = None
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    QueueHandler que nunca bloquea a quien escribe el log.
+    
+    Con la cola llena descarta un mensaje según la política ("newest" descarta
+    el que llega, "oldest" el más viejo de la cola) y lo cuenta. Los mensajes
+    DEBUG o menores se muestrean por línea de código: de cada `debug_sample`
+    mensajes de un mismo sitio solo se encola uno.
+    
+    El registro se encola sin formatear; el mensaje se arma en el hilo del
+    listener. Los argumentos mutables (arrays, listas) se leen en ese momento.
+    """
+    
+    def __init__(self, log_queue: queue.Queue, drop_policy: str = "newest", debug_sample: int = 1):
+        """
+        Args:
+            log_queue: Cola acotada compartida con el QueueListener
+            drop_policy: "newest" u "oldest", qué mensaje descartar con la cola llena
+            debug_sample: Encolar 1 de cada N mensajes DEBUG por sitio (1 = todos)
+        """
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f"Política de descarte desconocida: {drop_policy} (usar {', '.join(DROP_POLICIES)})")
+        super().__init__(log_queue)
+        self.drop_policy = drop_policy
+        self.debug_sample = max(1, int(debug_sample))
+        self.dropped = 0
+        self.sampled_out = 0
+        self._sites: Dict[Tuple[str, int], int] = {}
+    
+    def emit(self, record: logging.LogRecord) -> None:
+        if record.levelno <= logging.DEBUG and self.debug_sample > 1:
+            site = (record.pathname, record.lineno)
+            seen = self._sites.get(site, 0)
+            self._sites[site] = seen + 1
+            if seen % self.debug_sample:
+                self.sampled_out += 1
+                return
+        super().emit(record)
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Sin formatear: QueueHandler.prepare llamaría a format() en este hilo
+        return record
+    
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+            return
+        except queue.Full:
+            pass
+        
+        if self.drop_policy == "oldest":
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                pass
+            try:
+                self.queue.put_nowait(record)
+            except queue.Full:
+                pass
+        self.dropped += 1
+
+
+class DrainingQueueListener(QueueListener):
+    """QueueListener cuya marca de fin espera lugar en la cola si está llena."""
+    
+    def enqueue_sentinel(self) -> None:
+        # QueueListener usa put_nowait, que falla con la cola acotada llena
+        self.queue.put(self._sentinel)
+
+
 def setup_logging(
     level: str = None,
-    log_file: Optional[Path] = None
+    log_file: Optional[Path] = None,
+    async_mode: bool = None
 ) -> None:
     """
     Configura el sistema de logging.
@@ -19,9 +107,11 @@ def setup_logging(
     Args:
         level: Nivel de logging (DEBUG, INFO, WARNING, ERROR)
         log_file: Archivo donde guardar los logs
+        async_mode: Escribir los logs desde un hilo aparte con una cola acotada
     """
     level = level or LOGGING_CONFIG["level"]
     log_level = getattr(logging, level.upper(), logging.INFO)
+    async_mode = LOGGING_CONFIG["async"] if async_mode is None else async_mode
     
     # Formato del log
     formatter = logging.Formatter(
@@ -33,12 +123,7 @@ def setup_logging(
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setFormatter(formatter)
     console_handler.setLevel(log_level)
-    
-    # Configurar logger raíz
-    root_logger = logging.getLogger()
-    root_logger.setLevel(log_level)
-    root_logger.handlers.clear()
-    root_logger.addHandler(console_handler)
+    handlers = [console_handler]
     
     # Handler para archivo si está habilitado
     if LOGGING_CONFIG["file_logging"] or log_file:
@@ -48,7 +133,57 @@ def setup_logging(
         file_handler = logging.FileHandler(log_file, encoding='utf-8')
         file_handler.setFormatter(formatter)
         file_handler.setLevel(log_level)
-        root_logger.addHandler(file_handler)
+        handlers.append(file_handler)
+    
+    # Configurar logger raíz
+    shutdown_logging()
+    root_logger = logging.getLogger()
+    root_logger.setLevel(log_level)
+    root_logger.handlers.clear()
+    
+    if not async_mode:
+        for handler in handlers:
+            root_logger.addHandler(handler)
+        return
+    
+    global _listener, _queue_handler
+    _queue_handler = BoundedQueueHandler(
+        queue.Queue(maxsize=LOGGING_CONFIG["queue_size"]),
+        drop_policy=LOGGING_CONFIG["drop_policy"],
+        debug_sample=LOGGING_CONFIG["debug_sample"]
+    )
+    root_logger.addHandler(_queue_handler)
+    _listener = DrainingQueueListener(_queue_handler.queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """
+    Detiene el hilo de logging asíncrono, escribiendo lo que quede en la cola.
+    
+    Se llama sola al salir del programa; no hace nada en modo síncrono.
+    """
+    global _listener, _queue_handler
+    if _listener is None:
+        return
+    
+    listener, handler = _listener, _queue_handler
+    _listener = _queue_handler = None
+    logging.getLogger().removeHandler(handler)
+    listener.stop()
+    
+    if handler.dropped or handler.sampled_out:
+        record = logging.LogRecord(
+            __name__, logging.WARNING, __file__, 0,
+            "Logging: %d mensajes descartados (cola llena), %d DEBUG omitidos por muestreo",
+            (handler.dropped, handler.sampled_out), None
+        )
+        listener.handle(record)
+    for target in listener.handlers:
+        target.flush()
+
+
+atexit.register(shutdown_logging)
 
 
 def get_logger(name: str) -> logging.Logger:
@@ -0,0 +1,397 @@
+"""
+Perfilado del ciclo de escaneo.
+
+ScanProfiler envuelve cada escaneo (captura, búsqueda y clic, sin la espera
+entre escaneos) y al terminar escribe en profiles/:
+
+    <nombre>.prof    estadísticas de cProfile (modo "cprofile"; se abre con
+                     pstats o snakeviz)
+    <nombre>.folded  pilas en formato "colapsado" (una pila por línea con su
+                     peso), para flamegraph.pl, speedscope o inferno
+    <nombre>.csv     tiempos por etapa, asignaciones y memoria de cada escaneo
+    <nombre>.txt     resumen: funciones más costosas y sitios que más asignan
+
+Modos:
+    cprofile  registra cada llamada (exacto, pero agrega costo a cada una);
+              el .folded se reconstruye del grafo de llamadas, así que los
+              tiempos de una función llamada desde varios lugares se reparten
+              en proporción
+    sampling  un hilo toma la pila del hilo principal cada sample_interval
+              segundos (costo bajo y pilas reales; las funciones muy cortas
+              pueden no aparecer)
+
+Se activa con python main.py --profile [cprofile|sampling] o con
+PROFILING_CONFIG["enabled"]; desactivado, scan() no hace nada.
+"""
+import cProfile
+import csv
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from config.settings import PROFILING_CONFIG, PROFILES_DIR
+from utils.logger import get_logger
+
+
+PROFILE_MODES = ("cprofile", "sampling")
+
+
+@dataclass
+class ScanRecord:
+    """Mediciones de un escaneo."""
+    index: int
+    timings: Dict[str, float] = field(default_factory=dict)  # Segundos por etapa
+    found: bool = False
+    elapsed: float = 0.0      # Segundos del escaneo completo
+    blocks: int = 0           # Bloques de memoria nuevos que siguen vivos al terminar
+    allocated: int = 0        # Bytes nuevos que siguen vivos al terminar
+    peak: int = 0             # Pico de memoria durante el escaneo, sobre el inicio
+    
+    def update(self, timings: Dict[str, float]) -> None:
+        """Agrega tiempos por etapa (p. ej. DetectionResult.timings)."""
+        self.timings.update(timings)
+
+
+def _frame_label(code) -> str:
+    """Nombre de un cuadro de pila: función (archivo:línea)."""
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _stats_label(func: Tuple[str, int, str]) -> str:
+    """Nombre de una función de pstats, con el mismo formato que _frame_label."""
+    filename, line, name = func
+    if filename == "~":
+        return name  # Funciones de C, p. ej. <built-in method cv2.matchTemplate>
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+def folded_from_stats(stats: pstats.Stats, unit: float = 1e-6) -> Dict[str, int]:
+    """
+    Convierte estadísticas de cProfile en pilas colapsadas.
+    
+    cProfile guarda quién llama a quién pero no las pilas completas: el
+    tiempo de cada función se reparte entre sus llamadores en proporción
+    al tiempo acumulado de cada llamada.
+    
+    Args:
+        stats: Estadísticas de cProfile
+        unit: Segundos por unidad de peso (por defecto microsegundos)
+    
+    Returns:
+        {"raíz;...;función": peso}
+    """
+    entries = stats.stats
+    callees: Dict[tuple, List[Tuple[tuple, float]]] = {}
+    for func, (_, _, _, _, callers) in entries.items():
+        for caller, (_, _, _, cumulative) in callers.items():
+            callees.setdefault(caller, []).append((func, cumulative))
+    
+    folded: Counter = Counter()
+    
+    def walk(func: tuple, budget: float, path: Tuple[str, ...], seen: frozenset) -> None:
+        _, _, own, cumulative, _ = entries[func]
+        if cumulative <= 0 or budget < unit:
+            return
+        ratio = budget / cumulative
+        path = path + (_stats_label(func),)
+        folded[";".join(path)] += int(own * ratio / unit)
+        for callee, edge in callees.get(func, ()):
+            if callee not in seen and callee in entries:
+                walk(callee, edge * ratio, path, seen | {callee})
+    
+    # Las raíces son las llamadas hechas dentro del escaneo (sin las del perfilador)
+    roots = [func for func, entry in entries.items() if not entry[4] and func[0] != __file__]
+    for root in roots:
+        walk(root, entries[root][3], (), frozenset({root}))
+    return {stack: weight for stack, weight in folded.items() if weight > 0}
+
+
+class _StackSampler(threading.Thread):
+    """Hilo que toma la pila de otro hilo mientras active está encendido."""
+    
+    def __init__(self, thread_id: int, interval: float):
+        super().__init__(name="scan-profiler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.active = threading.Event()
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._finished = threading.Event()
+    
+    def run(self) -> None:
+        while not self._finished.is_set():
+            self.active.wait(0.1)
+            if self._finished.is_set() or not self.active.is_set():
+                continue
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                self.stacks[";".join(reversed(stack))] += 1
+                self.samples += 1
+            time.sleep(self.interval)
+    
+    def stop(self) -> None:
+        self._finished.set()
+        self.active.set()
+        self.join()
+
+
+class ScanProfiler:
+    """
+    Perfila los escaneos de un ciclo de detección.
+    
+    Uso:
+        with ScanProfiler(enabled=True) as profiler:
+            while ...:
+                with profiler.scan() as scan:
+                    result = detector.detect(image)
+                    scan.update(result.timings)
+                    scan.found = result.found
+                scheduler.wait(...)
+    """
+    
+    def __init__(
+        self,
+        enabled: bool = None,
+        mode: str = None,
+        output_dir: Path = None,
+        name: str = None,
+        sample_interval: float = None,
+        trace_memory: bool = None
+    ):
+        """
+        Inicializa el perfilador (no mide nada hasta start()).
+        
+        Args:
+            enabled: Perfilar; si es False, scan() no hace nada
+            mode: "cprofile" o "sampling"
+            output_dir: Carpeta de los archivos de salida
+            name: Nombre base de los archivos (por defecto, fecha y hora)
+            sample_interval: Segundos entre muestras del modo sampling
+            trace_memory: Contar asignaciones por escaneo con tracemalloc
+        """
+        self.enabled = enabled if enabled is not None else PROFILING_CONFIG["enabled"]
+        self.mode = mode or PROFILING_CONFIG["mode"]
+        if self.mode not in PROFILE_MODES:
+            raise ValueError(f"Modo de perfilado desconocido: {self.mode}")
+        self.output_dir = Path(output_dir or PROFILES_DIR)
+        self.name = name or time.strftime("profile_%Y%m%d_%H%M%S")
+        self.sample_interval = sample_interval or PROFILING_CONFIG["sample_interval"]
+        self.trace_memory = (
+            trace_memory if trace_memory is not None
+            else PROFILING_CONFIG["tracemalloc"]
+        )
+        self.logger = get_logger(__name__)
+        
+        self.records: List[ScanRecord] = []
+        self.outputs: List[Path] = []
+        self._profile: Optional[cProfile.Profile] = None
+        self._sampler: Optional[_StackSampler] = None
+        self._allocation_sites: Counter = Counter()
+        self._baseline = 0  # Memoria trazada al empezar el escaneo actual
+        self._switch_interval: Optional[float] = None
+        self._started_tracemalloc = False
+        self._running = False
+    
+    def start(self) -> None:
+        """Prepara el perfilador elegido (y tracemalloc)."""
+        if not self.enabled or self._running:
+            return
+        self._running = True
+        
+        if self.mode == "cprofile":
+            self._profile = cProfile.Profile()
+        else:
+            self._sampler = _StackSampler(threading.get_ident(), self.sample_interval)
+            self._sampler.start()
+            # El hilo de muestreo necesita el GIL para leer la pila: sin esto
+            # solo lo obtendría cada 5ms o cuando el código suelta el GIL
+            self._switch_interval = sys.getswitchinterval()
+            sys.setswitchinterval(min(self._switch_interval, self.sample_interval))
+        
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start(PROFILING_CONFIG["tracemalloc_frames"])
+            self._started_tracemalloc = True
+        
+        self.logger.info(f"Perfilado activado ({self.mode}); salida en {self.output_dir}")
+    
+    def stop(self) -> List[Path]:
+        """
+        Detiene el perfilado y escribe los archivos de salida.
+        
+        Returns:
+            Rutas de los archivos escritos
+        """
+        if not self._running:
+            return self.outputs
+        self._running = False
+        
+        if self._sampler is not None:
+            self._sampler.stop()
+            sys.setswitchinterval(self._switch_interval)
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.outputs = self._write()
+        for path in self.outputs:
+            self.logger.info(f"Perfil escrito: {path}")
+        return self.outputs
+    
+    def __enter__(self) -> "ScanProfiler":
+        self.start()
+        return self
+    
+    def __exit__(self, *exc) -> None:
+        self.stop()
+    
+    def scan(self) -> "_Scan":
+        """Contexto que mide un escaneo (no hace nada si está desactivado)."""
+        return _Scan(self if self._running else None, len(self.records))
+    
+    def _begin(self) -> Optional[tracemalloc.Snapshot]:
+        snapshot = None
+        if self.trace_memory:
+            snapshot = tracemalloc.take_snapshot()
+            tracemalloc.reset_peak()
+            self._baseline = tracemalloc.get_traced_memory()[0]
+        if self._profile is not None:
+            self._profile.enable()
+        elif self._sampler is not None:
+            self._sampler.active.set()
+        return snapshot
+    
+    def _end(self, record: ScanRecord, before: Optional[tracemalloc.Snapshot]) -> None:
+        if self._profile is not None:
+            self._profile.disable()
+        elif self._sampler is not None:
+            self._sampler.active.clear()
+        
+        if before is not None:
+            _, peak = tracemalloc.get_traced_memory()
+            after = tracemalloc.take_snapshot()
+            ignore = [
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, __file__),
+            ]
+            key = "traceback" if PROFILING_CONFIG["tracemalloc_frames"] > 1 else "lineno"
+            for stat in after.filter_traces(ignore).compare_to(before.filter_traces(ignore), key):
+                if stat.count_diff > 0:
+                    record.blocks += stat.count_diff
+                    record.allocated += max(stat.size_diff, 0)
+                    self._allocation_sites[str(stat.traceback)] += stat.count_diff
+            record.peak = max(peak - self._baseline, 0)
+        
+        self.records.append(record)
+    
+    def _write(self) -> List[Path]:
+        """Escribe los archivos de salida."""
+        base = self.output_dir / self.name
+        outputs = []
+        
+        if self._profile is not None:
+            stats = pstats.Stats(self._profile)
+            stats.dump_stats(f"{base}.prof")
+            outputs.append(Path(f"{base}.prof"))
+            folded = folded_from_stats(stats)
+        else:
+            folded = dict(self._sampler.stacks)
+        
+        with open(f"{base}.folded", "w", encoding="utf-8") as f:
+            for stack, weight in sorted(folded.items()):
+                f.write(f"{stack} {weight}\n")
+        outputs.append(Path(f"{base}.folded"))
+        
+        stages = sorted({stage for record in self.records for stage in record.timings})
+        with open(f"{base}.csv", "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(
+                ["scan", "found", "elapsed_ms"] + [f"{stage}_ms" for stage in stages]
+                + ["blocks", "allocated_bytes", "peak_bytes"]
+            )
+            for record in self.records:
+                writer.writerow(
+                    [record.index, int(record.found), f"{record.elapsed * 1000:.3f}"]
+                    + [
+                        f"{record.timings[stage] * 1000:.3f}" if stage in record.timings else ""
+                        for stage in stages
+                    ]
+                    + [record.blocks, record.allocated, record.peak]
+                )
+        outputs.append(Path(f"{base}.csv"))
+        
+        with open(f"{base}.txt", "w", encoding="utf-8") as f:
+            f.write(self._summary())
+        outputs.append(Path(f"{base}.txt"))
+        return outputs
+    
+    def _summary(self) -> str:
+        """Resumen legible del perfil."""
+        top = PROFILING_CONFIG["top"]
+        out = io.StringIO()
+        scans = len(self.records)
+        out.write(f"Escaneos: {scans} (encontrada en {sum(r.found for r in self.records)})\n")
+        if scans:
+            elapsed = sorted(record.elapsed for record in self.records)
+            out.write(
+                f"Escaneo: p50 {elapsed[scans // 2] * 1000:.2f}ms  "
+                f"máx {elapsed[-1] * 1000:.2f}ms\n"
+            )
+        if self.trace_memory and scans:
+            blocks = sorted(record.blocks for record in self.records)
+            peak = max(record.peak for record in self.records)
+            out.write(
+                f"Bloques nuevos por escaneo: p50 {blocks[scans // 2]}  máx {blocks[-1]}  "
+                f"(pico {peak / 1024:.1f} KB)\n"
+            )
+        
+        if self._profile is not None:
+            out.write(f"\nFunciones por tiempo acumulado (top {top}):\n")
+            pstats.Stats(self._profile, stream=out).sort_stats("cumulative").print_stats(top)
+        elif self._sampler is not None:
+            out.write(f"\nMuestras: {self._sampler.samples}\n")
+            leaves: Counter = Counter()
+            for stack, count in self._sampler.stacks.items():
+                leaves[stack.rsplit(";", 1)[-1]] += count
+            out.write(f"\nFunciones por muestras propias (top {top}):\n")
+            for label, count in leaves.most_common(top):
+                out.write(f"  {count:>7}  {count / max(self._sampler.samples, 1):6.1%}  {label}\n")
+        
+        if self._allocation_sites:
+            out.write(f"\nSitios con más bloques nuevos (top {top}):\n")
+            for site, count in self._allocation_sites.most_common(top):
+                out.write(f"  {count:>7}  {site}\n")
+        return out.getvalue()
+
+
+class _Scan:
+    """Contexto de ScanProfiler.scan(); sin perfilador solo guarda el registro."""
+    
+    __slots__ = ("profiler", "record", "_snapshot", "_started")
+    
+    def __init__(self, profiler: Optional[ScanProfiler], index: int):
+        self.profiler = profiler
+        self.record = ScanRecord(index)
+    
+    def __enter__(self) -> ScanRecord:
+        if self.profiler is not None:
+            self._snapshot = self.profiler._begin()
+        self._started = time.perf_counter()
+        return self.record
+    
+    def __exit__(self, *exc) -> None:
+        self.record.elapsed = time.perf_counter() - self._started
+        if self.profiler is not None:
+            self.profiler._end(self.record, self._snapshot)